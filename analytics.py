@@ -0,0 +1,167 @@
+"""
+Analytics Module
+Answers aggregate questions about the job data directly from SQL, so common
+analysis intents do not need a Gemini round trip.
+"""
+import re
+import logging
+
+import db
+from skills import canonicalize_skill
+
+logger = logging.getLogger(__name__)
+
+SKILLS_QUESTION_RE = re.compile(
+    r'\b(top|most|common|popular|in[- ]demand|required|requested|frequent|important)\b.*\bskills?\b'
+    r'|\bskills?\b.*\b(most|common|popular|in[- ]demand|required|requested|frequent)\b'
+    r'|\bskills?\b.*\b(go(es)? with|pair(s|ed)? with|along with|alongside|besides)\b',
+    re.IGNORECASE
+)
+SALARY_INTENT_RE = re.compile(r'\b(salar(y|ies)|pay|compensation|earn(ings)?|wages?)\b', re.IGNORECASE)
+
+# "Pay" and "earn" only ask for salary figures in these phrasings;
+# "jobs that pay for relocation" and "companies that earn praise" do not
+_PAY_VERB = r'(pays?|paid|paying|earns?|earning|makes?|making)'
+SALARY_QUESTION_RE = re.compile(
+    r'\b(salar(y|ies)|compensation|wages?|earnings)\b'
+    r'|\bpay\s+(ranges?|scales?|rates?|bands?|levels?)\b'
+    r'|\b(average|median|typical|highest|lowest|top|best|better|well)[- ](pay|paid|paying)\b'
+    rf'|\b{_PAY_VERB}\s+(the\s+)?(most|best|more|less|least|well|better)\b'
+    rf'|\bhow much\b.*\b{_PAY_VERB}\b'
+    rf'|\b{_PAY_VERB}(\s+(in|at)\s+[\w ,.]+|\s+(per|a|an)\s+(year|hour))?\s*[?.!]?\s*$',
+    re.IGNORECASE
+)
+
+# Phrases that choose how salary statistics are broken down
+SALARY_GROUPINGS = [
+    (re.compile(r'\b(by|per|each|across|which|where)\s+(location|city|cities|state|region)s?\b', re.IGNORECASE), 'location'),
+    (re.compile(r'\b(by|per|each|across|which)\s+(title|role|position|job)s?\b', re.IGNORECASE), 'title'),
+    (re.compile(r'\b(by|per|each|across|which)\s+compan(y|ies)\b', re.IGNORECASE), 'company'),
+]
+
+# Number of groups spelled out in a grouped answer
+TOP_GROUPS = 5
+
+# Number of skills listed in a top-skills answer
+TOP_SKILLS = 8
+
+
+def _money(value):
+    """Format a salary figure as whole dollars."""
+    return f"${value:,.0f}"
+
+
+def is_salary_question(user_query, parsed_filters):
+    """
+    Return True if the query asks about salaries rather than for a list of jobs.
+    
+    The parsed intent must be about pay and the query itself must ask for
+    salary figures, so a passing "pay" or "earn" is not enough.
+    """
+    intent = (parsed_filters or {}).get('intent') or ''
+    return bool(SALARY_INTENT_RE.search(intent) and SALARY_QUESTION_RE.search(user_query or ''))
+
+
+def salary_grouping(user_query, parsed_filters):
+    """Pick the column to group salary statistics by, or None for one overall figure."""
+    text = f"{user_query or ''} {(parsed_filters or {}).get('intent') or ''}"
+    for pattern, column in SALARY_GROUPINGS:
+        if pattern.search(text):
+            return column
+    return None
+
+
+def answer_salary_question(user_query, parsed_filters):
+    """
+    Summarize salaries for the matching jobs using SQL aggregates.
+    
+    Args:
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+        
+    Returns:
+        str: Answer text, or None if no matching job has salary data
+    """
+    overall = db.salary_stats(parsed_filters)
+    if not overall:
+        return None
+    
+    stats = overall[0]
+    noun = 'job' if stats['job_count'] == 1 else 'jobs'
+    answer = (f"Salaries for {stats['job_count']} matching {noun} range from {_money(stats['min_pay'])} "
+              f"to {_money(stats['max_pay'])}, with a median of {_money(stats['median_pay'])} "
+              f"(average {_money(stats['avg_pay'])}).")
+    
+    group_by = salary_grouping(user_query, parsed_filters)
+    if group_by:
+        groups = db.salary_stats(parsed_filters, group_by=group_by, limit=TOP_GROUPS)
+        listed = ', '.join(
+            f"{g['group']} ({_money(g['median_pay'])}, {g['job_count']} {'job' if g['job_count'] == 1 else 'jobs'})"
+            for g in groups
+        )
+        answer += f" Highest median by {group_by}: {listed}."
+    
+    return answer
+
+
+def is_skills_question(user_query, parsed_filters):
+    """Return True if the query asks which skills are most common, overall or alongside a skill."""
+    intent = (parsed_filters or {}).get('intent') or ''
+    return bool(SKILLS_QUESTION_RE.search(intent) or SKILLS_QUESTION_RE.search(user_query or ''))
+
+
+def answer_skills_question(user_query, parsed_filters):
+    """
+    List the most common skills among the matching jobs from the skills tables.
+    
+    Skills named in the question keep filtering the jobs ("What skills go
+    with Kubernetes?" counts the Kubernetes jobs) but are left out of the
+    list, since every matching job has them.
+    
+    Args:
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+        
+    Returns:
+        str: Answer text, or None if no matching job has skills recorded
+    """
+    filters = parsed_filters or {}
+    skills = filters.get('skills') or []
+    asked = {canonicalize_skill(s) for s in ([skills] if isinstance(skills, str) else skills)} - {None, ''}
+    top = [s for s in db.top_skills(filters, limit=TOP_SKILLS + len(asked))
+           if canonicalize_skill(s['skill']) not in asked][:TOP_SKILLS]
+    if not top:
+        return None
+    
+    job_count = db.count_jobs(filters)
+    noun = 'job' if job_count == 1 else 'jobs'
+    listed = ', '.join(f"{s['skill']} ({s['job_count']})" for s in top)
+    if asked:
+        return (f"Skills most often requested alongside {', '.join(sorted(asked))} "
+                f"across {job_count} matching {noun}: {listed}.")
+    return f"Most requested skills across {job_count} matching {noun}: {listed}."
+
+
+def answer_locally(user_query, parsed_filters):
+    """
+    Answer the query from SQL aggregates when its intent allows it.
+    
+    Args:
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+        
+    Returns:
+        str: Answer text, or None if the query needs Gemini
+    """
+    if is_skills_question(user_query, parsed_filters):
+        answer = answer_skills_question(user_query, parsed_filters)
+        if answer:
+            logger.info(f"Answered skills question from the skill counts: '{user_query}'")
+            return answer
+    
+    if is_salary_question(user_query, parsed_filters):
+        answer = answer_salary_question(user_query, parsed_filters)
+        if answer:
+            logger.info(f"Answered salary question from SQL aggregates: '{user_query}'")
+            return answer
+    return None
@@ -1,11 +1,26 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+import time
+
+# Start of worker boot, for the boot time reported in logs and /api/metrics
+_boot_started = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
 import os
+import json
+import queue
 import logging
+import threading
 from dotenv import load_dotenv
 import db
 import gemini_service
 import auth
 import job_parser
+import job_import
+import analytics
+import query_parser
+import llm_client
+import singleflight
+import task_queue
+import vector_index
 
 # Load environment variables
 load_dotenv()
@@ -31,9 +46,20 @@ else:
     )
     logger = logging.getLogger(__name__)
 
-# Initialize database on startup
+# Check the schema version on startup (migrates only if the database is behind)
 db.init_db()
 
+# Gemini models are resolved in the background, so boot never waits on Gemini
+gemini_service.gemini_model.warm_up()
+job_parser.job_parser_model.warm_up()
+vector_index.warm_up()
+
+# Coalesces identical concurrent /api/analyze and /api/analyze/stream requests
+analyze_flight = singleflight.SingleFlight('analyze')
+
+BOOT_SECONDS = round(time.perf_counter() - _boot_started, 3)
+logger.info(f"App initialized in {BOOT_SECONDS}s (pid {os.getpid()})")
+
 @app.route('/')
 def index():
     """Home page with greeting and demo data button."""
@@ -43,16 +69,69 @@ def index():
 
 @app.route('/demo')
 def demo():
-    """Display all demo job data."""
+    """Display one page of demo job data."""
     logger.info("Demo page accessed")
     try:
-        jobs = db.get_all_jobs()
+        cursor = request.args.get('cursor')
+        jobs, next_cursor = db.get_jobs_page(cursor=cursor)
         logger.info(f"Successfully retrieved {len(jobs)} jobs from database")
-        return render_template('analysis_page.html', jobs=jobs, is_demo=True)
+        return render_template('analysis_page.html', jobs=jobs, next_cursor=next_cursor,
+                               page_size=db.JOBS_PAGE_SIZE, is_demo=True)
+    except ValueError as e:
+        logger.warning(f"Bad page cursor on demo page: {str(e)}")
+        return render_template('error.html', message='Invalid page link'), 400
     except Exception as e:
         logger.error(f"Error loading demo data: {str(e)}", exc_info=True)
         return render_template('error.html', message='Error loading job data'), 500
 
+def _analysis_key(query):
+    """Single-flight key of an analysis: the data version and the query as the query cache folds it."""
+    return f"{db.get_data_version()}:{gemini_service.normalize_query(query)}"
+
+def _run_analysis(query):
+    """Parse, filter and analyze one query; returns the (body, status) of /api/analyze."""
+    # Parse the query using Gemini
+    logger.info("Parsing natural language query with Gemini...")
+    parsed_filters = gemini_service.parse_query(query)
+    
+    if 'error' in parsed_filters:
+        logger.error(f"Error parsing query: {parsed_filters['error']}")
+        return {'error': parsed_filters['error']}, 500
+    
+    logger.info(f"Parsed filters: {parsed_filters}")
+    
+    # Full-text filter in SQL
+    job_count = db.count_jobs(parsed_filters)
+    logger.info(f"After filtering: {job_count} jobs match the criteria")
+    
+    # Aggregate questions (e.g. salaries) are answered in SQL; the rest go to Gemini
+    similar_jobs = False
+    analysis = analytics.answer_locally(query, parsed_filters)
+    if analysis is None:
+        # Only the jobs most similar to the query are analyzed
+        filtered_jobs, similar_jobs = vector_index.jobs_for_analysis(
+            query, parsed_filters, job_count, gemini_service.analysis_row_limit(job_count))
+        logger.info(f"Analyzing {len(filtered_jobs)} {'similar' if similar_jobs else 'top-ranked'} jobs with Gemini...")
+        analysis = gemini_service.analyze_jobs(filtered_jobs, query, parsed_filters,
+                                               len(filtered_jobs) if similar_jobs else job_count)
+    
+    logger.info(f"Analysis completed successfully for query: '{query}'")
+    
+    # Only the first page of matches is sent; the rest come from /api/jobs
+    page_jobs, next_cursor = db.get_jobs_page(filters=parsed_filters)
+    if similar_jobs:
+        page_jobs, next_cursor = filtered_jobs[:db.JOBS_PAGE_SIZE], None
+    
+    return {
+        'success': True,
+        'analysis': analysis,
+        'job_count': job_count,
+        'filtered_jobs': page_jobs,
+        'next_cursor': next_cursor,
+        'similar_jobs': similar_jobs,
+        'filters': parsed_filters
+    }, 200
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_query():
     """API endpoint to analyze job postings based on natural language query."""
@@ -66,42 +145,217 @@ def analyze_query():
             logger.warning("Empty query submitted")
             return jsonify({'error': 'Query cannot be empty'}), 400
         
-        # Parse the query using Gemini
-        logger.info("Parsing natural language query with Gemini...")
-        parsed_filters = gemini_service.parse_query(query)
-        
-        if 'error' in parsed_filters:
-            logger.error(f"Error parsing query: {parsed_filters['error']}")
-            return jsonify({'error': parsed_filters['error']}), 500
-        
-        logger.info(f"Parsed filters: {parsed_filters}")
-        
-        # Get all jobs
-        all_jobs = db.get_all_jobs()
-        logger.info(f"Retrieved {len(all_jobs)} total jobs from database")
-        
-        # Filter jobs based on parsed criteria
-        filtered_jobs = gemini_service.filter_jobs(all_jobs, parsed_filters)
-        logger.info(f"After filtering: {len(filtered_jobs)} jobs match the criteria")
-        
-        # Use Gemini to analyze the filtered jobs
-        logger.info("Analyzing filtered jobs with Gemini...")
-        analysis = gemini_service.analyze_jobs(filtered_jobs, query, parsed_filters)
-        
-        logger.info(f"Analysis completed successfully for query: '{query}'")
-        
-        return jsonify({
-            'success': True,
-            'analysis': analysis,
-            'job_count': len(filtered_jobs),
-            'filtered_jobs': filtered_jobs,
-            'filters': parsed_filters
-        }), 200
+        # Identical queries in flight (in any worker) share one run; only
+        # successful responses are handed to the duplicates
+        body, status = analyze_flight.do(_analysis_key(query), lambda: _run_analysis(query),
+                                         share=lambda result: result[1] == 200)
+        return jsonify(body), status
         
     except Exception as e:
         logger.error(f"Error processing analysis query: {str(e)}", exc_info=True)
         return jsonify({'error': 'Analysis failed: ' + str(e)}), 500
 
+def _sse_event(event, data):
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_analysis(query, emit):
+    """
+    Run an analysis for /api/analyze/stream, passing each SSE message to
+    ``emit`` as soon as it is ready.
+    
+    Returns:
+        tuple: The (body, status) _run_analysis() would return, so the result
+        can be shared with duplicate requests on either route
+    """
+    parsed_filters = gemini_service.parse_query(query)
+    if 'error' in parsed_filters:
+        logger.error(f"Error parsing query: {parsed_filters['error']}")
+        return {'error': parsed_filters['error']}, 500
+    emit(_sse_event('filters', {'filters': parsed_filters}))
+    
+    job_count = db.count_jobs(parsed_filters)
+    page_jobs, next_cursor = db.get_jobs_page(filters=parsed_filters)
+    emit(_sse_event('jobs', {
+        'job_count': job_count,
+        'filtered_jobs': page_jobs,
+        'next_cursor': next_cursor
+    }))
+    
+    similar_jobs = False
+    analysis = analytics.answer_locally(query, parsed_filters)
+    if analysis is not None:
+        emit(_sse_event('analysis', {'text': analysis}))
+    else:
+        filtered_jobs, similar_jobs = vector_index.jobs_for_analysis(
+            query, parsed_filters, job_count, gemini_service.analysis_row_limit(job_count))
+        if similar_jobs:
+            page_jobs, next_cursor = filtered_jobs[:db.JOBS_PAGE_SIZE], None
+            emit(_sse_event('similar', {'filtered_jobs': page_jobs}))
+        chunks = []
+        for chunk in gemini_service.analyze_jobs_stream(filtered_jobs, query, parsed_filters,
+                                                        len(filtered_jobs) if similar_jobs else job_count):
+            chunks.append(chunk)
+            emit(_sse_event('analysis', {'text': chunk}))
+        analysis = ''.join(chunks)
+    
+    return {
+        'success': True,
+        'analysis': analysis,
+        'job_count': job_count,
+        'filtered_jobs': page_jobs,
+        'next_cursor': next_cursor,
+        'similar_jobs': similar_jobs,
+        'filters': parsed_filters
+    }, 200
+
+def _replay_analysis(body, emit):
+    """Send an analysis another request produced as the events of /api/analyze/stream."""
+    emit(_sse_event('filters', {'filters': body['filters']}))
+    emit(_sse_event('jobs', {
+        'job_count': body['job_count'],
+        'filtered_jobs': [] if body['similar_jobs'] else body['filtered_jobs'],
+        'next_cursor': body['next_cursor']
+    }))
+    if body['similar_jobs']:
+        emit(_sse_event('similar', {'filtered_jobs': body['filtered_jobs']}))
+    emit(_sse_event('analysis', {'text': body['analysis']}))
+
+class _ClientGone(Exception):
+    """Raised by a stream's emit() once its client has disconnected."""
+
+def _coalesced_stream(query, emit):
+    """
+    Stream an analysis, or the result of an identical one in flight, then None.
+    
+    Runs on its own thread: it stops at the next event once ``emit`` raises
+    _ClientGone, and closes the thread's database connection when done.
+    """
+    led = []
+    def lead():
+        led.append(True)
+        try:
+            return _stream_analysis(query, emit)
+        except _ClientGone:
+            # Not shared, so requests waiting on this one run the analysis themselves
+            return {'error': 'Client disconnected'}, 499
+    try:
+        body, status = analyze_flight.do(_analysis_key(query), lead,
+                                         share=lambda result: result[1] == 200)
+        if status != 200:
+            emit(_sse_event('error', {'error': body['error']}))
+        else:
+            if not led:
+                _replay_analysis(body, emit)
+            logger.info(f"Streaming analysis completed for query: '{query}'")
+            emit(_sse_event('done', {}))
+    except _ClientGone:
+        logger.info(f"Client disconnected, stopped streaming analysis for query: '{query}'")
+    except Exception as e:
+        logger.error(f"Error streaming analysis query: {str(e)}", exc_info=True)
+        try:
+            emit(_sse_event('error', {'error': 'Analysis failed: ' + str(e)}))
+        except _ClientGone:
+            pass
+    finally:
+        db.close_connection()
+        emit(None)
+
+@app.route('/api/analyze/stream')
+def analyze_query_stream():
+    """Streaming variant of /api/analyze using Server-Sent Events.
+    
+    Query parameters:
+        query: natural language query
+    
+    Events, in order: `filters` (parsed filters), `jobs` (job_count, first
+    page of matches and next_cursor), `similar` (the nearest jobs, only when
+    nothing matched), any number of `analysis` chunks ({"text": ...}), then
+    `done`. A failure at any point sends `error`.
+    """
+    query = request.args.get('query', '').strip()
+    logger.info(f"Streaming analysis query submitted: '{query}'")
+    
+    if not query:
+        logger.warning("Empty query submitted")
+        return jsonify({'error': 'Query cannot be empty'}), 400
+    
+    def generate():
+        # The analysis runs on its own thread so it can lead a single-flight
+        # call while its events stream out; a duplicate replays the result
+        events = queue.Queue()
+        disconnected = threading.Event()
+        
+        def emit(event):
+            if event is not None and disconnected.is_set():
+                raise _ClientGone()
+            events.put(event)
+        
+        threading.Thread(target=_coalesced_stream, args=(query, emit),
+                         name='analyze-stream', daemon=True).start()
+        try:
+            while (event := events.get()) is not None:
+                yield event
+        finally:
+            # Set on GeneratorExit too, when the client goes away mid-stream
+            disconnected.set()
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Tell Nginx not to buffer the stream
+        'X-Accel-Buffering': 'no'
+    })
+
+# Parsed filter keys whose values must be strings; skills may also be a list and salary_range a number
+TEXT_FILTERS = ('location', 'job_title', 'seniority', 'intent')
+
+def _check_filters(filters):
+    """
+    Reject filters whose values db cannot match on, e.g. {"location": 5}.
+    
+    Raises:
+        ValueError: If a value has the wrong type
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be a JSON object")
+    for key in TEXT_FILTERS:
+        if filters.get(key) is not None and not isinstance(filters[key], str):
+            raise ValueError(f"filters.{key} must be a string")
+    skills = filters.get('skills')
+    if skills is not None and not isinstance(skills, str) and not (
+            isinstance(skills, list) and all(isinstance(s, str) for s in skills)):
+        raise ValueError("filters.skills must be a string or a list of strings")
+    salary_range = filters.get('salary_range')
+    if salary_range is not None and (isinstance(salary_range, bool)
+                                     or not isinstance(salary_range, (str, int, float))):
+        raise ValueError("filters.salary_range must be a string or a number")
+
+@app.route('/api/jobs')
+def list_jobs():
+    """API endpoint returning one keyset-paginated page of jobs.
+    
+    Query parameters:
+        cursor: next_cursor from the previous page (omit for the first page)
+        limit: page size (default JOBS_PAGE_SIZE, max MAX_PAGE_SIZE)
+        filters: optional JSON object of parsed filters, as returned by /api/analyze
+    """
+    try:
+        cursor = request.args.get('cursor') or None
+        limit = request.args.get('limit', db.JOBS_PAGE_SIZE, type=int)
+        filters = json.loads(request.args['filters']) if request.args.get('filters') else None
+        if filters is not None:
+            _check_filters(filters)
+        
+        jobs, next_cursor = db.get_jobs_page(filters=filters, cursor=cursor, page_size=limit)
+        return jsonify({'jobs': jobs, 'next_cursor': next_cursor}), 200
+        
+    except ValueError as e:
+        logger.warning(f"Bad job page request: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error listing jobs: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Failed to load jobs'}), 500
+
 @app.route('/data')
 def data_options():
     """Display options for querying or adding data."""
@@ -126,7 +380,11 @@ def add_job():
 
 @app.route('/jobs/parse', methods=['POST'])
 def parse_job():
-    """Parse a job posting using AI."""
+    """Queue a job posting for AI parsing.
+
+    Returns 202 with a task id and status_url to poll, or 200 with the job
+    straight away if this posting was parsed before.
+    """
     is_authenticated = auth.is_authenticated(session)
     if not is_authenticated:
         logger.warning("Unauthenticated user tried to parse job")
@@ -144,30 +402,112 @@ def parse_job():
             logger.warning(f"Job text too short: {len(job_text)} characters")
             return jsonify({'error': 'too_short', 'message': 'Job posting must be at least 50 characters'}), 400
         
-        logger.info(f"Parsing job posting ({len(job_text)} chars) by user: {session.get('user_id')}")
-        
-        # Parse the job posting
-        parsed_job = job_parser.parse_job_posting(job_text)
-        
-        if 'error' in parsed_job:
-            logger.error(f"Error parsing job: {parsed_job}")
-            return jsonify(parsed_job), 500
+        user_id = session.get('user_id')
         
-        # Validate the parsed data
-        if not job_parser.validate_job_data(parsed_job):
-            logger.warning(f"Parsed job data validation failed: {parsed_job}")
-            return jsonify({
-                'error': 'validation_failed',
-                'message': 'Could not extract all required job fields. Please try a more detailed posting.'
-            }), 400
+        # A posting parsed before is answered at once; anything else goes to the queue
+        parsed_job = job_parser.cached_parse(job_text)
+        if parsed_job is not None and job_parser.validate_job_data(parsed_job):
+            logger.info(f"✓ Job parse served from cache: {parsed_job.get('title')}")
+            return jsonify(parsed_job), 200
         
-        logger.info(f"✓ Job parsing successful: {parsed_job.get('title')}")
-        return jsonify(parsed_job), 200
+        task_id = task_queue.enqueue_parse(job_text, user_id=user_id)
+        return jsonify({
+            'task_id': task_id,
+            'status': 'queued',
+            'status_url': url_for('parse_job_status', task_id=task_id)
+        }), 202
         
     except Exception as e:
-        logger.error(f"Error parsing job: {str(e)}", exc_info=True)
+        logger.error(f"Error queuing job parse: {str(e)}", exc_info=True)
         return jsonify({'error': 'parsing_error', 'message': 'Failed to parse job posting'}), 500
 
+@app.route('/jobs/parse/<int:task_id>')
+def parse_job_status(task_id):
+    """Status of a queued job parse: queued, running, done (with the job) or failed."""
+    is_authenticated = auth.is_authenticated(session)
+    if not is_authenticated:
+        return jsonify({'error': 'unauthorized', 'message': 'Please log in first'}), 401
+    
+    try:
+        status = task_queue.get_status(task_id, user_id=session.get('user_id'))
+        if status is None:
+            return jsonify({'error': 'not_found', 'message': 'Parse task not found'}), 404
+        return jsonify(status), 200
+        
+    except Exception as e:
+        logger.error(f"Error reading parse task {task_id}: {str(e)}", exc_info=True)
+        return jsonify({'error': 'status_error', 'message': 'Failed to read parse status'}), 500
+
+@app.route('/jobs/parse/batch', methods=['POST'])
+def parse_jobs_batch():
+    """Parse many job postings, streaming one NDJSON line per posting.
+
+    Body: {"jobTexts": [...]}. Each line is {"index": n, "job": {...}} or
+    {"index": n, "error": ..., "message": ...}, in completion order; the
+    last line is {"done": true, "count": n, "seconds": s, "postings_per_sec": r}.
+    """
+    is_authenticated = auth.is_authenticated(session)
+    if not is_authenticated:
+        logger.warning("Unauthenticated user tried to batch parse jobs")
+        return jsonify({'error': 'unauthorized', 'message': 'Please log in first'}), 401
+
+    data = request.get_json(silent=True) or {}
+    job_texts = data.get('jobTexts')
+    if not isinstance(job_texts, list) or not job_texts:
+        return jsonify({'error': 'empty', 'message': 'Send a non-empty jobTexts array'}), 400
+    if len(job_texts) > job_parser.BATCH_MAX_POSTINGS:
+        return jsonify({
+            'error': 'too_many',
+            'message': f"At most {job_parser.BATCH_MAX_POSTINGS} postings per batch"
+        }), 400
+
+    user_id = session.get('user_id')
+    logger.info(f"Batch parsing {len(job_texts)} job postings by user: {user_id}")
+
+    def generate():
+        started = time.perf_counter()
+        texts, positions = [], []
+        for index, text in enumerate(job_texts):
+            text = text.strip() if isinstance(text, str) else ''
+            if len(text) < 50:
+                yield json.dumps({'index': index, 'error': 'too_short',
+                                  'message': 'Job posting must be at least 50 characters'}) + '\n'
+            else:
+                positions.append(index)
+                texts.append(text)
+
+        try:
+            for i, parsed_job in job_parser.parse_job_postings(texts):
+                line = {'index': positions[i]}
+                if 'error' in parsed_job:
+                    line.update(parsed_job)
+                elif not job_parser.validate_job_data(parsed_job):
+                    line.update({
+                        'error': 'validation_failed',
+                        'message': 'Could not extract all required job fields. Please try a more detailed posting.'
+                    })
+                else:
+                    line['job'] = parsed_job
+                yield json.dumps(line) + '\n'
+        except Exception as e:
+            logger.error(f"Error batch parsing jobs: {str(e)}", exc_info=True)
+            yield json.dumps({'error': 'parsing_error', 'message': 'Failed to parse job postings'}) + '\n'
+            return
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"✓ Batch parsed {len(job_texts)} postings in {elapsed:.1f}s")
+        yield json.dumps({
+            'done': True,
+            'count': len(job_texts),
+            'seconds': round(elapsed, 3),
+            'postings_per_sec': round(len(job_texts) / elapsed, 3) if elapsed else None
+        }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/jobs/review')
 def review_job():
     """Show the job review/edit form."""
@@ -225,6 +565,53 @@ def save_job():
         logger.error(f"Error saving job: {str(e)}", exc_info=True)
         return jsonify({'error': 'save_error', 'message': 'Failed to save job'}), 500
 
+@app.route('/jobs/import', methods=['POST'])
+def import_jobs():
+    """Bulk import job postings from a CSV or NDJSON upload.
+    
+    Accepts either a raw request body (Content-Type text/csv or
+    application/x-ndjson, or ?format=csv|ndjson) or a multipart upload in a
+    'file' field. The body is parsed as it streams in and saved in batches.
+    """
+    is_authenticated = auth.is_authenticated(session)
+    if not is_authenticated:
+        logger.warning("Unauthenticated user tried to import jobs")
+        return jsonify({'error': 'unauthorized', 'message': 'Please log in first'}), 401
+    
+    try:
+        user_id = session.get('user_id')
+        fmt = request.args.get('format')
+        
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({'error': 'missing_file', 'message': "Upload the feed in a 'file' field"}), 400
+            fmt = fmt or job_import.detect_format(upload.filename, upload.mimetype)
+            stream = upload.stream
+        else:
+            fmt = fmt or job_import.detect_format(content_type=request.mimetype)
+            stream = request.stream
+        
+        if fmt not in job_import.FORMATS:
+            logger.warning(f"Job import with unknown format: {request.mimetype}")
+            return jsonify({
+                'error': 'unsupported_format',
+                'message': 'Send CSV or NDJSON (set Content-Type or ?format=csv|ndjson)'
+            }), 400
+        
+        logger.info(f"Importing {fmt} job feed by user: {user_id}")
+        stats = job_import.import_jobs(job_import.open_text_stream(stream), fmt, user_id=user_id)
+        
+        logger.info(f"✓ Imported {stats['imported']} jobs at {stats['rows_per_sec']} rows/sec")
+        return jsonify({'success': True, **stats}), 200
+        
+    except ValueError as e:
+        logger.warning(f"Malformed job feed: {str(e)}")
+        return jsonify({'error': 'invalid_feed', 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error importing jobs: {str(e)}", exc_info=True)
+        return jsonify({'error': 'import_error', 'message': 'Failed to import jobs'}), 500
+
 @app.route('/my-jobs')
 def my_jobs():
     """Display all jobs created by the authenticated user."""
@@ -237,12 +624,17 @@ def my_jobs():
         user_id = session.get('user_id')
         logger.info(f"My jobs page accessed by user: {user_id}")
         
-        # Get user's jobs from database
-        jobs = db.get_user_jobs(user_id)
+        # Get one page of the user's jobs from database
+        cursor = request.args.get('cursor')
+        jobs, next_cursor = db.get_user_jobs_page(user_id, cursor=cursor)
         logger.info(f"Retrieved {len(jobs)} jobs for user: {user_id}")
         
-        return render_template('jobs.html', jobs=jobs, is_authenticated=is_authenticated, user_jobs=True)
+        return render_template('jobs.html', jobs=jobs, next_cursor=next_cursor, is_first_page=not cursor,
+                               is_authenticated=is_authenticated, user_jobs=True)
         
+    except ValueError as e:
+        logger.warning(f"Bad page cursor on my-jobs page: {str(e)}")
+        return render_template('error.html', message='Invalid page link'), 400
     except Exception as e:
         logger.error(f"Error loading user jobs: {str(e)}", exc_info=True)
         return render_template('error.html', message='Error loading your jobs'), 500
@@ -268,6 +660,28 @@ def health():
     logger.debug("Health check endpoint called")
     return 'OK', 200
 
+@app.route('/api/metrics')
+def metrics():
+    """Per-worker cache and performance counters, for sizing and monitoring."""
+    return jsonify({
+        'pid': os.getpid(),
+        'boot_seconds': BOOT_SECONDS,
+        'gemini_models': {
+            'gemini_service': gemini_service.gemini_model.stats(),
+            'job_parser': job_parser.job_parser_model.stats(),
+        },
+        'job_cache': db.cache_stats(),
+        'query_parse_cache': gemini_service.query_cache.stats(),
+        'analysis_cache': gemini_service.analysis_cache.stats(),
+        'local_query_parser': query_parser.stats(),
+        'llm': llm_client.stats(),
+        'vector_index': vector_index.index.stats(),
+        'analyze_singleflight': analyze_flight.stats(),
+        'job_parser': job_parser.stats(),
+        'job_parse_cache': job_parser.parse_cache.stats(),
+        'parse_queue': db.task_counts(),
+    }), 200
+
 @app.errorhandler(404)
 def not_found(error):
     logger.warning(f"404 error: {request.path}")
@@ -379,5 +793,8 @@ def auth_status():
 if __name__ == '__main__':
     # Note: In production, use Gunicorn instead of Flask's development server
     # gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app
+    # The development server works the parse queue itself; production runs
+    # python -m task_queue worker under supervisor
+    task_queue.start_worker_threads()
     logger.info("Starting Flask application on 0.0.0.0:8000")
     app.run(host='0.0.0.0', port=8000, debug=False)
@@ -0,0 +1,70 @@
+"""
+Benchmark: worker boot time, with Gemini reachable or not.
+
+Imports the app in fresh interpreter processes (as each gunicorn worker
+does) and reports the BOOT_SECONDS it measured, plus total wall time. The
+"unreachable" run points the Gemini client at a blackhole proxy, so a boot
+that still waited on model discovery would show up as a timeout there.
+
+Usage:
+    python benchmarks/bench_boot.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_SNIPPET = "import app; print(app.BOOT_SECONDS)"
+
+# Non-routable address: connections hang until they time out
+UNREACHABLE_PROXY = 'http://10.255.255.1:9'
+
+
+def boot_once(env):
+    """Import the app in a new process; return (reported boot seconds, wall seconds)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', BOOT_SNIPPET], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"app import failed:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1]), wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.mkdtemp(prefix='jobs-bench-')
+    base_env = dict(
+        os.environ,
+        JOBS_DB_PATH=os.path.join(tmpdir, 'jobs.db'),
+        GEMINI_MODEL_CACHE_PATH=os.path.join(tmpdir, 'gemini_models.json'),
+        GEMINI_API_KEY=os.environ.get('GEMINI_API_KEY', 'bench-invalid-key'),
+        GEMINI_JOB_PARSER_API_KEY=os.environ.get('GEMINI_JOB_PARSER_API_KEY', 'bench-invalid-key'),
+    )
+    scenarios = {
+        'gemini reachable': base_env,
+        'gemini unreachable': dict(base_env, HTTPS_PROXY=UNREACHABLE_PROXY, https_proxy=UNREACHABLE_PROXY,
+                                   GRPC_PROXY=UNREACHABLE_PROXY),
+    }
+
+    # First import creates and migrates the database; keep it out of the numbers
+    boot_once(base_env)
+
+    for name, env in scenarios.items():
+        reported, wall = zip(*(boot_once(env) for _ in range(args.runs)))
+        print(f"{name:<20} boot {statistics.median(reported) * 1000:7.1f} ms (median), "
+              f"process wall {statistics.median(wall) * 1000:7.1f} ms over {args.runs} runs")
+
+
+if __name__ == '__main__':
+    main()
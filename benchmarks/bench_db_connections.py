@@ -0,0 +1,120 @@
+"""
+Benchmark: pooled per-worker SQLite connections vs. connect-per-call.
+
+Drives /demo and a filtered /api/jobs page through Flask's test client and
+reports requests/sec, first with the legacy behaviour (a fresh sqlite3.connect per
+db call on a rollback-journal database) and then with the warm, WAL-mode
+connections from db.get_connection(). Any response other than 200 stops the
+run, so a broken route cannot pass for a fast one.
+
+Usage:
+    python benchmarks/bench_db_connections.py [--seconds 5] [--threads 4] [--extra-jobs 500]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Point the app at a throwaway database before anything imports db
+_tmpdir = tempfile.mkdtemp(prefix='jobs-bench-')
+os.environ['JOBS_DB_PATH'] = os.path.join(_tmpdir, 'jobs.db')
+
+import db  # noqa: E402
+from app import app  # noqa: E402
+
+
+def legacy_connection():
+    """Emulate the old db.py: a brand-new connection for every call."""
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def seed(extra_jobs):
+    """Pad the demo data so /demo does a realistic amount of work."""
+    template = db.DEMO_JOBS[0]
+    for i in range(extra_jobs):
+        db.save_job(
+            title=f"{template['title']} #{i}",
+            company=template['company'],
+            location=template['location'],
+            pay=template['pay'],
+            description=template['description'],
+            user_id='bench-user',
+        )
+
+
+def run(paths, seconds, threads):
+    """Hit ``paths`` round-robin from ``threads`` clients for ``seconds``."""
+    counts = [0] * threads
+    failures = []
+    deadline = time.perf_counter() + seconds
+
+    def worker(slot):
+        client = app.test_client()
+        i = 0
+        while time.perf_counter() < deadline and not failures:
+            path = paths[i % len(paths)]
+            status = client.get(path).status_code
+            if status != 200:
+                failures.append((path, status))
+                break
+            counts[slot] += 1
+            i += 1
+        db.close_connection()
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    if failures:
+        path, status = failures[0]
+        raise SystemExit(f"GET {path} returned {status}")
+    return sum(counts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--extra-jobs', type=int, default=500)
+    args = parser.parse_args()
+
+    seed(args.extra_jobs)
+    filters = json.dumps({'location': 'Remote'})
+    scenarios = {
+        '/demo': ['/demo'],
+        '/api/jobs': [f'/api/jobs?filters={filters}'],
+    }
+
+    # Baseline: rollback journal, connect per call
+    db.close_connection()
+    raw = sqlite3.connect(db.DB_PATH)
+    raw.execute('PRAGMA journal_mode=DELETE')
+    raw.close()
+
+    pooled_get_connection = db.get_connection
+    db.get_connection = legacy_connection
+    before = {name: run(paths, args.seconds, args.threads) for name, paths in scenarios.items()}
+
+    # Pooled: warm per-thread connections in WAL mode
+    db.get_connection = pooled_get_connection
+    after = {name: run(paths, args.seconds, args.threads) for name, paths in scenarios.items()}
+
+    print(f"{'route':<12} {'before req/s':>14} {'after req/s':>14} {'speedup':>9}")
+    for name in scenarios:
+        print(f"{name:<12} {before[name]:>14.1f} {after[name]:>14.1f} {after[name] / before[name]:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
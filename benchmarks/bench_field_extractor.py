@@ -0,0 +1,228 @@
+"""
+Benchmark: local field extraction vs. reference parses.
+
+Runs field_extractor over two corpora, each posting with an "expected"
+parse in job_parser's output format:
+
+- benchmarks/data/job_postings.jsonl, the postings the rules were tuned on
+- benchmarks/data/job_postings_holdout.jsonl, held out from tuning
+
+The shipped references are written by hand to the Gemini prompt's rules;
+--record replaces them with live Gemini output. For each corpus it reports
+how often the rules fill each field and how often what they fill matches
+the reference, how many postings skip Gemini and whether the skipped
+ones were right on every field, and how much shorter the system prompt is
+for the rest. Gemini is only skipped with LOCAL_EXTRACT_SKIP_LLM=1.
+
+Title, company and location match case-insensitively and pay must be
+equal. Skills are compared as canonical sets (precision and recall).
+Descriptions are summaries, so only their word overlap with the reference
+is shown. The run fails if, on the held-out corpus, the exactly compared
+fields fall below --min-accuracy or a skipped posting gets any of them
+wrong or misses a reference skill.
+
+--record re-parses every posting with Gemini (full prompt, no cleanup or
+local extraction) and rewrites the "expected" parses; it needs
+GEMINI_JOB_PARSER_API_KEY.
+
+Before scoring, skills.extract_skills() must find no skill in PROSE_NEGATIVES,
+plain sentences whose words double as skill names or aliases.
+
+Usage:
+    python benchmarks/bench_field_extractor.py [--postings PATH ...] [--min-accuracy 0.9] [--verbose]
+    python benchmarks/bench_field_extractor.py --record
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Throwaway database, and no persisted parse cache, before anything imports db
+_tmpdir = tempfile.mkdtemp(prefix='jobs-bench-')
+os.environ['JOBS_DB_PATH'] = os.path.join(_tmpdir, 'jobs.db')
+os.environ['JOB_PARSE_CACHE_PERSIST'] = '0'
+
+import db  # noqa: E402
+import field_extractor  # noqa: E402
+import job_parser  # noqa: E402
+import posting_cleaner  # noqa: E402
+from skills import extract_skills, parse_skills  # noqa: E402
+
+TUNING_POSTINGS = os.path.join(ROOT, 'benchmarks', 'data', 'job_postings.jsonl')
+HOLDOUT_POSTINGS = os.path.join(ROOT, 'benchmarks', 'data', 'job_postings_holdout.jsonl')
+
+EXACT_FIELDS = ('title', 'company', 'location', 'pay')
+
+# Prose in which no skill is named, although its words are skill names or aliases
+PROSE_NEGATIVES = [
+    "Please express interest by Friday and we will be in touch.",
+    "You will work with the rest of the team on customer escalations.",
+    "Each node in the graph represents a warehouse.",
+    "Spring hiring starts in March.",
+    "We value team unity and a swift response to customers.",
+    "Go beyond the basics to spark curiosity in every guest.",
+    "Send your js, ts or py files with the application.",
+    "A tf of 0.3 and an ml of saline were recorded.",
+    "Rust on the equipment must be reported to the shift lead.",
+]
+
+
+def load_postings(path):
+    """Read postings, one JSON object per line."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def same(field, got, expected):
+    """Whether an extracted value matches the reference."""
+    if field == 'pay':
+        return got == expected if got is None or expected is None else float(got) == float(expected)
+    return ' '.join(str(got).split()).lower() == ' '.join(str(expected or '').split()).lower()
+
+
+def word_overlap(got, expected):
+    """F1 of the word sets of two texts."""
+    got_words = set(re.findall(r'\w+', got.lower()))
+    expected_words = set(re.findall(r'\w+', (expected or '').lower()))
+    common = len(got_words & expected_words)
+    if not common:
+        return 0.0
+    precision, recall = common / len(got_words), common / len(expected_words)
+    return 2 * precision * recall / (precision + recall)
+
+
+def record(postings, path):
+    """Replace each posting's expected parse with a fresh Gemini parse."""
+    posting_cleaner.POSTING_CLEANUP_ENABLED = False
+    field_extractor.LOCAL_EXTRACT_ENABLED = False
+    for posting in postings:
+        parsed = job_parser.parse_job_posting(posting['text'])
+        if 'error' in parsed:
+            raise SystemExit(f"Gemini parse of {posting['id']} failed: {parsed}")
+        posting['expected'] = {field: parsed.get(field) for field in job_parser.FIELDS}
+    with open(path, 'w', encoding='utf-8') as f:
+        for posting in postings:
+            f.write(json.dumps(posting) + '\n')
+    print(f"Recorded {len(postings)} Gemini parses to {path}")
+
+
+def evaluate(postings, verbose=False):
+    """
+    Print extraction results for one corpus.
+
+    Returns:
+        tuple: (share of filled title/company/location/pay values that
+        match, number of postings that skip Gemini with any of them wrong
+        or a skill missing)
+    """
+    filled = {field: 0 for field in job_parser.FIELDS}
+    correct = {field: 0 for field in EXACT_FIELDS}
+    skill_precision, skill_recall, overlaps, timings = [], [], [], []
+    skipped = skipped_wrong = partial = 0
+    full_prompt = len(job_parser.SYSTEM_PROMPT)
+    prompt_chars = []
+    for posting in postings:
+        expected = posting['expected']
+        text = posting_cleaner.clean_posting(posting['text'])['text']
+        started = time.perf_counter()
+        local = field_extractor.extract_fields(text)
+        timings.append((time.perf_counter() - started) * 1000)
+
+        for field, value in local.items():
+            filled[field] += 1
+            if field in EXACT_FIELDS:
+                if same(field, value, expected.get(field)):
+                    correct[field] += 1
+                elif verbose:
+                    print(f"{posting['id']}: {field} {value!r}, expected {expected.get(field)!r}")
+        if 'skills' in local:
+            got, want = set(parse_skills(local['skills'])), set(parse_skills(expected.get('skills')))
+            skill_precision.append(len(got & want) / len(got))
+            skill_recall.append(len(got & want) / len(want) if want else 1.0)
+        if 'description' in local:
+            overlaps.append(word_overlap(local['description'], expected.get('description')))
+
+        if job_parser.extract_locally(text)[1]:
+            skipped += 1
+            wrong = [field for field in EXACT_FIELDS if not same(field, local.get(field), expected.get(field))]
+            if set(parse_skills(expected.get('skills'))) - set(parse_skills(local.get('skills'))):
+                wrong.append('skills')
+            if wrong:
+                skipped_wrong += 1
+                print(f"{posting['id']}: skipped Gemini with {', '.join(wrong)} wrong")
+        else:
+            prompt_chars.append(len(job_parser.fields_prompt(local)))
+            if local:
+                partial += 1
+
+    total = len(postings)
+    print(f"{total} postings; extraction took {statistics.mean(timings):.2f}ms on average\n")
+    print(f"{'field':<12} {'filled':>8} {'correct':>9}")
+    for field in job_parser.FIELDS:
+        if field in EXACT_FIELDS:
+            accuracy = f"{correct[field]}/{filled[field]}" if filled[field] else '-'
+        elif field == 'skills' and skill_precision:
+            accuracy = (f"precision {statistics.mean(skill_precision):.0%}, "
+                        f"recall {statistics.mean(skill_recall):.0%}")
+        elif field == 'description' and overlaps:
+            accuracy = f"word overlap {statistics.mean(overlaps):.0%}"
+        else:
+            accuracy = '-'
+        print(f"{field:<12} {filled[field]:>3}/{total:<4} {accuracy:>9}")
+
+    print(f"\nGemini skipped: {skipped}/{total} postings, {skipped - skipped_wrong} with "
+          f"title/company/location/pay and skills all right")
+    if prompt_chars:
+        print(f"Gemini asked for some fields only: {partial}/{total - skipped}; system prompt "
+              f"{full_prompt} -> {statistics.mean(prompt_chars):.0f} chars on average")
+
+    checked = sum(filled[field] for field in EXACT_FIELDS)
+    accuracy = sum(correct.values()) / checked if checked else 1.0
+    print(f"Title/company/location/pay accuracy: {accuracy:.0%} of {checked} filled values")
+    return accuracy, skipped_wrong
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--postings', nargs='+', default=[TUNING_POSTINGS, HOLDOUT_POSTINGS],
+                        help='corpora to evaluate; the last one is held out and gated')
+    parser.add_argument('--min-accuracy', type=float, default=0.9,
+                        help='least share of filled title/company/location/pay values that must match')
+    parser.add_argument('--record', action='store_true', help='re-record the expected parses with Gemini')
+    parser.add_argument('--verbose', action='store_true', help='print every mismatch')
+    args = parser.parse_args(argv)
+
+    false_skills = [(text, extract_skills(text)) for text in PROSE_NEGATIVES]
+    false_skills = [(text, found) for text, found in false_skills if found]
+    for text, found in false_skills:
+        print(f"False skills {', '.join(found)} in: {text!r}")
+    if false_skills:
+        raise SystemExit(f"extract_skills() found skills in {len(false_skills)} plain sentence(s)")
+    print(f"No skills found in {len(PROSE_NEGATIVES)} plain sentences")
+
+    db.migrate()
+    if args.record:
+        for path in args.postings:
+            record(load_postings(path), path)
+        return
+
+    for path in args.postings:
+        print(f"\n== {os.path.relpath(path, ROOT)} ==")
+        accuracy, skipped_wrong = evaluate(load_postings(path), args.verbose)
+
+    if accuracy < args.min_accuracy:
+        raise SystemExit(f"Held-out title/company/location/pay accuracy {accuracy:.0%} "
+                         f"is below {args.min_accuracy:.0%}")
+    if skipped_wrong:
+        raise SystemExit(f"{skipped_wrong} held-out posting(s) skipped Gemini with a wrong field or missing skills")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: prompt size of job postings before and after posting_cleaner.
+
+Cleans every posting in benchmarks/data/job_postings.jsonl (real-world-sized
+postings in HTML, LinkedIn-paste, markdown and plain-text form, each with a
+reference parse) and reports characters and estimated prompt tokens before
+and after, cleanup time, and whether the facts the parser needs survived:
+the title, company, pay and city must still appear in the cleaned text,
+along with every expected skill that appeared in the original. The run
+fails if a title, company or pay is lost.
+
+Usage:
+    python benchmarks/bench_posting_cleanup.py [--postings PATH] [--budget 1200] [--repeat 50] [--verbose]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import posting_cleaner  # noqa: E402
+
+DEFAULT_POSTINGS = os.path.join(ROOT, 'benchmarks', 'data', 'job_postings.jsonl')
+
+
+def load_postings(path):
+    """Read postings, one JSON object per line."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def pay_forms(pay):
+    """Ways a pay figure is written in a posting: 165000, 165,000, 165k."""
+    if not pay:
+        return []
+    forms = [str(pay), f'{pay:,}']
+    if pay >= 1000 and pay % 1000 == 0:
+        forms.append(f'{pay // 1000}k')
+    return forms
+
+
+def missing_facts(posting, text):
+    """
+    Expected facts absent from ``text``.
+
+    Returns:
+        tuple: (critical facts lost, skills lost, skills present in the original)
+    """
+    expected = posting['expected']
+    original = posting['text'].lower()
+    lowered = text.lower()
+    critical = []
+    for field in ('title', 'company'):
+        if expected[field].lower() not in lowered:
+            critical.append(field)
+    if expected['pay'] and not any(form.lower() in lowered for form in pay_forms(expected['pay'])):
+        critical.append('pay')
+    city = expected['location'].split(',')[0].split(' - ')[0].lower()
+    if city not in lowered:
+        critical.append('location')
+
+    skills = [s.strip() for s in expected['skills'].split(',')]
+    present = [s for s in skills if re.search(rf'(?<!\w){re.escape(s.lower())}(?!\w)', original)]
+    lost = [s for s in present if not re.search(rf'(?<!\w){re.escape(s.lower())}(?!\w)', lowered)]
+    return critical, lost, present
+
+
+def best_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--postings', default=DEFAULT_POSTINGS)
+    parser.add_argument('--budget', type=int, default=posting_cleaner.POSTING_TOKEN_BUDGET,
+                        help='token budget per posting')
+    parser.add_argument('--repeat', type=int, default=50, help='timing iterations per posting')
+    parser.add_argument('--verbose', action='store_true', help='print every cleaned posting')
+    args = parser.parse_args(argv)
+
+    postings = load_postings(args.postings)
+    print(f"{len(postings)} postings, token budget {args.budget} "
+          f"(~{posting_cleaner.POSTING_CHARS_PER_TOKEN:g} chars/token)")
+    print(f"{'posting':<28} {'format':<9} {'chars':>13} {'tokens':>11} {'saved':>6} {'ms':>6}  lost")
+
+    reductions, timings = [], []
+    tokens_in = tokens_out = skills_present = skills_lost = 0
+    failures = []
+    for posting in postings:
+        report = posting_cleaner.clean_posting(posting['text'], token_budget=args.budget)
+        ms = best_ms(lambda: posting_cleaner.clean_posting(posting['text'], token_budget=args.budget), args.repeat)
+        critical, lost, present = missing_facts(posting, report['text'])
+        reduction = 1 - report['chars_out'] / report['chars_in']
+        reductions.append(reduction)
+        timings.append(ms)
+        tokens_in += report['tokens_in']
+        tokens_out += report['tokens_out']
+        skills_present += len(present)
+        skills_lost += len(lost)
+        if critical:
+            failures.append((posting['id'], critical))
+        print(f"{posting['id']:<28} {posting['format']:<9} {report['chars_in']:>6}->{report['chars_out']:<6} "
+              f"{report['tokens_in']:>5}->{report['tokens_out']:<5} {reduction:>6.0%} {ms:>6.2f}  "
+              f"{', '.join(critical + lost) or '-'}")
+        if args.verbose:
+            print(report['text'])
+            print('-' * 80)
+
+    print(f"\nEstimated prompt tokens: {tokens_in} -> {tokens_out} "
+          f"({1 - tokens_out / tokens_in:.0%} fewer); median reduction {statistics.median(reductions):.0%}")
+    print(f"Cleanup time: mean {statistics.mean(timings):.2f}ms, max {max(timings):.2f}ms per posting")
+    print(f"Skills kept: {skills_present - skills_lost}/{skills_present} of those in the original text")
+    if failures:
+        raise SystemExit(f"Lost title, company, pay or location: {failures}")
+    print("Title, company, pay and location kept in every posting")
+
+
+if __name__ == '__main__':
+    main()
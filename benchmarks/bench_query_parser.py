@@ -0,0 +1,131 @@
+"""
+Benchmark: local rule-based query parsing vs. the recorded query set.
+
+Runs query_parser over benchmarks/data/recorded_queries.jsonl (queries with
+reference parses recorded from Gemini) against the demo database, and
+reports the fraction of queries that would skip Gemini, per-field accuracy
+of the queries parsed locally, and parse latency.
+
+It also checks analytics.is_salary_question() on SALARY_QUESTIONS, parsed
+locally, and fails if any is answered the wrong way: questions that only
+mention pay or earning in passing must not get the salary summary.
+
+Usage:
+    python benchmarks/bench_query_parser.py [--queries PATH] [--min-confidence 0.85] [--verbose]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Point the parser at a throwaway demo database before anything imports db
+_tmpdir = tempfile.mkdtemp(prefix='jobs-bench-')
+os.environ['JOBS_DB_PATH'] = os.path.join(_tmpdir, 'jobs.db')
+
+import analytics  # noqa: E402
+import db  # noqa: E402
+import query_parser  # noqa: E402
+from salary import parse_salary_range  # noqa: E402
+from skills import canonicalize_skill  # noqa: E402
+
+DEFAULT_QUERIES = os.path.join(ROOT, 'benchmarks', 'data', 'recorded_queries.jsonl')
+
+FIELDS = ('job_title', 'location', 'skills', 'seniority', 'salary_range')
+
+# (query, whether it asks for salary figures)
+SALARY_QUESTIONS = [
+    ("salaries for data scientist", True),
+    ("what do data engineers earn in Austin, TX?", True),
+    ("how much does a devops engineer make", True),
+    ("which companies pay the most", True),
+    ("average pay for data analysts", True),
+    ("highest paying python jobs", True),
+    ("which jobs pay for relocation?", False),
+    ("companies that earn praise for culture", False),
+    ("which jobs pay relocation bonuses", False),
+    ("jobs that make an impact", False),
+]
+
+
+def normalize_field(field, value):
+    """Put a filter value in a form where equivalent parses compare equal."""
+    if field == 'skills':
+        return sorted({canonicalize_skill(s) for s in (value or []) if canonicalize_skill(s)})
+    if field == 'salary_range':
+        return parse_salary_range(value)
+    return (value or '').strip().lower() or None
+
+
+def load_queries(path):
+    """Read recorded queries, one JSON object per line."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', default=DEFAULT_QUERIES)
+    parser.add_argument('--min-confidence', type=float, default=query_parser.LOCAL_PARSE_MIN_CONFIDENCE)
+    parser.add_argument('--repeat', type=int, default=200, help='timing iterations per query')
+    parser.add_argument('--verbose', action='store_true', help='print every mismatch')
+    args = parser.parse_args(argv)
+
+    db.migrate()
+    records = load_queries(args.queries)
+
+    local = 0
+    exact = 0
+    field_hits = dict.fromkeys(FIELDS, 0)
+    mismatches = []
+    for record in records:
+        filters, confidence = query_parser.parse_locally(record['query'])
+        if confidence < args.min_confidence:
+            continue
+        local += 1
+        wrong = [f for f in FIELDS
+                 if normalize_field(f, filters.get(f)) != normalize_field(f, record['expected'].get(f))]
+        for field in FIELDS:
+            field_hits[field] += field not in wrong
+        exact += not wrong
+        if wrong:
+            mismatches.append((record['query'], confidence, wrong, filters))
+
+    timings = []
+    for record in records:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            query_parser.parse_locally(record['query'])
+        timings.append((time.perf_counter() - start) / args.repeat * 1e6)
+
+    print(f"Queries:               {len(records)}")
+    print(f"Parsed locally:        {local} ({local / len(records):.1%} of traffic skips Gemini)")
+    if local:
+        print(f"Exact match (local):   {exact / local:.1%}")
+        for field in FIELDS:
+            print(f"  {field:<20} {field_hits[field] / local:.1%}")
+    print(f"Local parse latency:   mean {statistics.mean(timings):.0f} us, "
+          f"max {max(timings):.0f} us per query")
+    if args.verbose:
+        for query, confidence, wrong, filters in mismatches:
+            print(f"\n  {query!r} (confidence {confidence:.2f}) wrong: {', '.join(wrong)}")
+            print(f"    got {filters}")
+
+    wrong_salary = []
+    for query, expected in SALARY_QUESTIONS:
+        filters, _ = query_parser.parse_locally(query)
+        if analytics.is_salary_question(query, filters) != expected:
+            wrong_salary.append(query)
+    print(f"Salary questions:      {len(SALARY_QUESTIONS) - len(wrong_salary)}/{len(SALARY_QUESTIONS)} "
+          f"told apart from passing mentions of pay")
+    if wrong_salary:
+        raise SystemExit(f"is_salary_question() got these wrong: {wrong_salary}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Cache Module
+Small in-process caches shared by the request handlers of one worker, plus a
+tiered cache that can also persist entries in SQLite for every worker.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Returned by LRUCache.get() when a key is absent
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded cache that evicts the least recently used entry.
+    
+    Entries optionally expire ``ttl`` seconds after they were stored. Hit,
+    miss and eviction counters are kept so the cache can be sized from
+    production traffic (see stats()).
+    """
+    
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=MISSING):
+        """Return the cached value for ``key`` (marking it recently used), or ``default``."""
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the oldest entries if full."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def pop(self, key, default=None):
+        """Remove ``key`` and return its value, or ``default`` if absent."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+    
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def stats(self):
+        """
+        Return the cache counters.
+        
+        Returns:
+            dict: size, maxsize, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class TieredCache:
+    """
+    LRU cache in front of an optional shared SQLite store (the kv_cache table).
+    
+    Lookups try this worker's memory first, then SQLite, so an entry stored by
+    one gunicorn worker - or before a restart - is served by all of them.
+    Values must be JSON-serializable when persistence is on. SQLite errors are
+    logged and treated as misses; the cache never fails a request.
+    """
+    
+    # Trim the persistent store back to persist_maxsize once every N writes
+    PRUNE_EVERY = 50
+    
+    def __init__(self, namespace, maxsize=256, ttl=None, persist=False, persist_maxsize=10000):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.persist = persist
+        self.persist_maxsize = persist_maxsize
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.persistent_hits = 0
+        self.persistent_misses = 0
+    
+    def get(self, key, default=MISSING):
+        """Return the value for ``key`` from memory or SQLite, or ``default``."""
+        value = self._memory.get(key)
+        if value is not MISSING or not self.persist:
+            return default if value is MISSING else value
+        
+        # Imported here because db itself imports this module
+        import db
+        try:
+            value = db.kv_get(self.namespace, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache read failed for '{self.namespace}': {str(e)}")
+            value = MISSING
+        
+        with self._lock:
+            if value is MISSING:
+                self.persistent_misses += 1
+                return default
+            self.persistent_hits += 1
+        self._memory.set(key, value)
+        return value
+    
+    def set(self, key, value):
+        """Store ``value`` in memory and, when persistence is on, in SQLite."""
+        self._memory.set(key, value)
+        if not self.persist:
+            return
+        
+        import db
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        try:
+            db.kv_set(self.namespace, key, value, ttl=self.ttl)
+            if prune:
+                db.kv_prune(self.namespace, self.persist_maxsize)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache write failed for '{self.namespace}': {str(e)}")
+    
+    def clear(self):
+        """Drop every entry from memory and the persistent store."""
+        self._memory.clear()
+        if self.persist:
+            import db
+            try:
+                db.kv_delete(self.namespace)
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache clear failed for '{self.namespace}': {str(e)}")
+    
+    def stats(self):
+        """
+        Return memory and persistent-store counters.
+        
+        Returns:
+            dict: LRU counters plus persistent_hits/persistent_misses and the
+            overall hit_rate across both tiers
+        """
+        stats = self._memory.stats()
+        with self._lock:
+            stats['persistent'] = self.persist
+            stats['persistent_hits'] = self.persistent_hits
+            stats['persistent_misses'] = self.persistent_misses
+        lookups = stats['hits'] + stats['misses']
+        served = stats['hits'] + stats['persistent_hits']
+        stats['hit_rate'] = round(served / lookups, 4) if lookups else 0.0
+        return stats
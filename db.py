@@ -1,8 +1,92 @@
 import sqlite3
 import os
+import re
+import json
+import base64
+import binascii
+import sys
+import argparse
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
 
-DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'jobs.db')
+from cache import LRUCache, MISSING
+from salary import normalize_pay, parse_salary_range
+from skills import skills_for_job, UNKNOWN_SKILLS
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+DB_PATH = os.getenv('JOBS_DB_PATH', os.path.join(os.path.dirname(__file__), 'data', 'jobs.db'))
+
+# Connection tuning, applied once when a worker thread opens its connection
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5.0'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(64 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '16384'))
+
+# Maximum number of matching rows returned by find_jobs() for one analysis
+ANALYZE_ROW_LIMIT = int(os.getenv('ANALYZE_ROW_LIMIT', '200'))
+
+# Default and maximum number of jobs per page for keyset-paginated listings
+JOBS_PAGE_SIZE = int(os.getenv('JOBS_PAGE_SIZE', '12'))
+MAX_PAGE_SIZE = 100
+
+# Rows per transaction for save_jobs_bulk()
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '1000'))
+
+# Columns salary_stats() can group by, and the maximum number of groups returned
+SALARY_GROUP_COLUMNS = ('location', 'title', 'company')
+SALARY_STATS_GROUP_LIMIT = 20
+
+# Entries in the per-worker read-through cache of job queries (0 disables it)
+JOB_CACHE_SIZE = int(os.getenv('JOB_CACHE_SIZE', '512'))
+
+# Default number of skills returned by top_skills()
+TOP_SKILLS_LIMIT = 10
+
+# Entries kept in the job_changes log; the pruning trigger (migration 14) has
+# this value built in, and a reader that falls further behind rebuilds in full
+JOB_CHANGES_RETAIN = 100000
+
+# Tokens as the jobs_fts tokenizer sees them (word characters plus '+' and '#')
+FTS_TOKEN_RE = re.compile(r'[\w+#]+')
+
+# BM25 ordering with per-column weights: title, company, location, description, skills
+FTS_RANK = 'bm25(jobs_fts, 5.0, 1.0, 2.0, 1.0, 3.0)'
+
+# Words ignored when turning a free-text search into FTS terms
+FTS_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'for', 'from', 'in', 'is', 'job', 'jobs',
+    'me', 'of', 'on', 'or', 'show', 'the', 'to', 'what', 'which', 'with',
+}
+
+# Title keywords that identify a seniority level; 'mid' is anything in neither list
+SENIORITY_TITLE_KEYWORDS = {
+    'senior': ['senior', 'sr.', 'lead', 'principal', 'staff'],
+    'junior': ['junior', 'jr.', 'entry', 'associate', 'intern'],
+}
+
+# Read-through cache for job reads. Entries are only valid for the jobs_version
+# they were loaded at; a write in any worker bumps the counter (see migration 9),
+# and the next read in every other worker notices and drops the cache.
+_job_cache = LRUCache(maxsize=JOB_CACHE_SIZE)
+_job_cache_version = None
+_job_cache_lock = threading.Lock()
+_job_cache_invalidations = 0
+
+# One warm connection per (process, thread). SQLite connections must not be
+# shared across threads or carried over a fork, so each gunicorn worker thread
+# lazily opens its own and keeps it for the life of the process.
+_local = threading.local()
+
+# Connections inherited from the parent process are parked here instead of
+# being closed, because closing them in the child can corrupt the parent's
+# locks on the database file.
+_inherited_connections = []
 
 # Demo job data - hardcoded for all users
 DEMO_JOBS = [
@@ -208,16 +292,80 @@ DEMO_JOBS = [
     },
 ]
 
-def init_db():
-    """Initialize SQLite database with demo jobs."""
+def _open_connection():
+    """Open a new SQLite connection and apply the per-connection PRAGMAs."""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(DB_PATH)
+
+    conn = sqlite3.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT)
     conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    # Create jobs table if not exists
-    cursor.execute('''
+
+    # WAL lets readers in other workers proceed while /jobs/save is writing;
+    # NORMAL sync is durable across application crashes in WAL mode.
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+    return conn
+
+
+def get_connection():
+    """
+    Return the warm connection for the current process and thread.
+
+    The connection is opened on first use and reused afterwards. Use
+    ``with conn:`` around writes so they commit (or roll back) as a unit.
+
+    Returns:
+        sqlite3.Connection: Connection with ``sqlite3.Row`` row factory
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'pid', None) == os.getpid():
+        return conn
+
+    if conn is not None:
+        # Opened by the parent before a fork - never touch it from here
+        _inherited_connections.append(conn)
+
+    conn = _open_connection()
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def close_connection():
+    """Close the current thread's connection, if it has one."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'pid', None) == os.getpid():
+        conn.close()
+    _local.conn = None
+    _local.pid = None
+
+
+def _reset_after_fork():
+    """Drop connections inherited from the parent process in a forked child."""
+    global _local
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        _inherited_connections.append(conn)
+    _local = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# ===== Schema Migrations =====
+#
+# Each migration runs exactly once, inside its own transaction, and records its
+# number in schema_version. Migrations must not commit on their own (no
+# ``with conn:``) so that a failure rolls the whole step back. Append new
+# migrations to MIGRATIONS - never renumber or edit one that has shipped.
+
+def _migration_001_create_jobs(conn):
+    """Create the jobs table, adding columns missing from pre-migration databases."""
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS jobs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
@@ -233,90 +381,1159 @@ def init_db():
         )
     ''')
     
-    # Insert demo data if table is empty
-    cursor.execute('SELECT COUNT(*) as count FROM jobs')
-    if cursor.fetchone()['count'] == 0:
-        for job in DEMO_JOBS:
-            cursor.execute('''
-                INSERT INTO jobs (title, company, location, pay, posting_date, description)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (job['title'], job['company'], job['location'], job['pay'], job['posting_date'], job['description']))
-    
-    conn.commit()
-    conn.close()
-    
-    # Ensure all required columns exist
-    ensure_columns_exist()
-
-def ensure_columns_exist():
-    """Check if all required columns exist in jobs table, add them if not."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Get existing columns
-    cursor.execute("PRAGMA table_info(jobs)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
-    
-    # Define required columns and their definitions
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
     required_columns = {
         'user_id': 'TEXT',
         'created_at': 'TIMESTAMP',
         'updated_at': 'TIMESTAMP',
         'skills': "TEXT DEFAULT 'unknown'"
     }
-    
-    # Add missing columns
     for column_name, column_def in required_columns.items():
         if column_name not in existing_columns:
+            conn.execute(f'ALTER TABLE jobs ADD COLUMN {column_name} {column_def}')
+            print(f"[DB] Added missing column: {column_name}")
+
+def _migration_002_seed_demo_jobs(conn):
+    """Insert the demo jobs into an empty database."""
+    count = conn.execute('SELECT COUNT(*) as count FROM jobs').fetchone()['count']
+    if count == 0:
+        conn.executemany('''
+            INSERT INTO jobs (title, company, location, pay, posting_date, description)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(job['title'], job['company'], job['location'], job['pay'], job['posting_date'], job['description'])
+              for job in DEMO_JOBS])
+
+def _migration_003_posting_date_index(conn):
+    """Index posting_date so newest-first listings can stop after LIMIT rows."""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posting_date ON jobs(posting_date DESC, id DESC)')
+
+def _migration_004_user_created_index(conn):
+    """Index a user's jobs by creation time for /my-jobs."""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user_created ON jobs(user_id, created_at DESC, id DESC)')
+
+def _migration_005_search_index(conn):
+    """Create the FTS5 index over jobs and the triggers that keep it in sync."""
+    # External-content table: the text lives in jobs, FTS only stores the index.
+    # '+' and '#' are token characters so C++ and C# stay searchable.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, location, description, skills,
+            content='jobs', content_rowid='id',
+            tokenize="unicode61 tokenchars '+#'"
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, company, location, description, skills)
+            VALUES (new.id, new.title, new.company, new.location, new.description, new.skills);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description, skills)
+            VALUES ('delete', old.id, old.title, old.company, old.location, old.description, old.skills);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au
+        AFTER UPDATE OF title, company, location, description, skills ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description, skills)
+            VALUES ('delete', old.id, old.title, old.company, old.location, old.description, old.skills);
+            INSERT INTO jobs_fts(rowid, title, company, location, description, skills)
+            VALUES (new.id, new.title, new.company, new.location, new.description, new.skills);
+        END
+    ''')
+    # Index rows that were written before the triggers existed
+    conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+def _migration_006_backfill_sort_keys(conn):
+    """Fill NULL posting_date/created_at so keyset pagination never skips rows."""
+    conn.execute('''
+        UPDATE jobs SET created_at = COALESCE(posting_date, CURRENT_TIMESTAMP)
+        WHERE created_at IS NULL
+    ''')
+    conn.execute('''
+        UPDATE jobs SET posting_date = substr(created_at, 1, 10)
+        WHERE posting_date IS NULL
+    ''')
+
+def _migration_007_numeric_salary(conn):
+    """Add pay_min/pay_max, backfill them from the free-text pay column and index them."""
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+    for column_name in ('pay_min', 'pay_max'):
+        if column_name not in existing_columns:
+            conn.execute(f'ALTER TABLE jobs ADD COLUMN {column_name} INTEGER')
+    
+    rows = conn.execute('SELECT id, pay FROM jobs WHERE pay IS NOT NULL').fetchall()
+    conn.executemany(
+        'UPDATE jobs SET pay_min = ?, pay_max = ? WHERE id = ?',
+        [(*normalize_pay(row['pay']), row['id']) for row in rows]
+    )
+    
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_pay_min ON jobs(pay_min, pay_max)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_pay_max ON jobs(pay_max)')
+
+def _migration_008_job_skills(conn):
+    """Normalize skills into skills/job_skills with a maintained per-location count."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_skills (
+            job_id INTEGER NOT NULL REFERENCES jobs(id),
+            skill_id INTEGER NOT NULL REFERENCES skills(id),
+            PRIMARY KEY (job_id, skill_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills(skill_id, job_id)')
+    
+    # Jobs per skill, per normalized location; location '' holds the totals
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS skill_counts (
+            location TEXT NOT NULL,
+            skill_id INTEGER NOT NULL,
+            job_count INTEGER NOT NULL,
+            PRIMARY KEY (location, skill_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_skill_counts_rank ON skill_counts(location, job_count DESC)')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS job_skills_count_ai AFTER INSERT ON job_skills BEGIN
+            INSERT INTO skill_counts (location, skill_id, job_count) VALUES ('', new.skill_id, 1)
+                ON CONFLICT (location, skill_id) DO UPDATE SET job_count = job_count + 1;
+            INSERT INTO skill_counts (location, skill_id, job_count)
+                SELECT lower(trim(location)), new.skill_id, 1 FROM jobs WHERE id = new.job_id
+                ON CONFLICT (location, skill_id) DO UPDATE SET job_count = job_count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS job_skills_count_ad AFTER DELETE ON job_skills BEGIN
+            UPDATE skill_counts SET job_count = job_count - 1
+                WHERE skill_id = old.skill_id
+                  AND (location = '' OR location = (SELECT lower(trim(location)) FROM jobs WHERE id = old.job_id));
+            DELETE FROM skill_counts WHERE skill_id = old.skill_id AND job_count <= 0;
+        END
+    ''')
+    # Remove a job's skills while the job row (and its location) still exists
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_skills_bd BEFORE DELETE ON jobs BEGIN
+            DELETE FROM job_skills WHERE job_id = old.id;
+        END
+    ''')
+    
+    rows = conn.execute('SELECT id, title, description, skills FROM jobs').fetchall()
+    for row in rows:
+        names = skills_for_job(row['skills'], row['title'], row['description'])
+        _insert_job_skills(conn, row['id'], names)
+        if names and (row['skills'] or UNKNOWN_SKILLS) == UNKNOWN_SKILLS:
+            conn.execute('UPDATE jobs SET skills = ? WHERE id = ?', (', '.join(names), row['id']))
+
+def _migration_009_change_counter(conn):
+    """Add a jobs change counter so every worker can tell when its cache is stale."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS db_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO db_meta (key, value) VALUES ('jobs_version', 0)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS jobs_version_{event.lower()} AFTER {event} ON jobs BEGIN
+                UPDATE db_meta SET value = value + 1 WHERE key = 'jobs_version';
+            END
+        ''')
+
+def _migration_010_kv_cache(conn):
+    """Shared key/value cache table used by cache.TieredCache."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS kv_cache (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_kv_cache_age ON kv_cache(namespace, created_at)')
+
+def _migration_011_leases(conn):
+    """Short-lived named leases, used by singleflight to coalesce work across workers."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS leases (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        ) WITHOUT ROWID
+    ''')
+
+def _migration_012_parse_tasks(conn):
+    """Background job-posting parse queue, worked by ``python -m task_queue worker``."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS parse_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            lease_expires_at REAL,
+            worker TEXT,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_parse_tasks_ready ON parse_tasks(status, run_after)')
+
+def _migration_013_relink_skills(conn):
+    """Re-derive job_skills now that prose words ("express", "rest", "node") are no longer read as skills."""
+    rows = conn.execute('SELECT id, title, description, skills FROM jobs').fetchall()
+    conn.execute('DELETE FROM job_skills')
+    for row in rows:
+        _insert_job_skills(conn, row['id'], skills_for_job(row['skills'], row['title'], row['description']))
+
+def _migration_014_job_changes(conn):
+    """Log the id of every inserted, updated or deleted job, so derived indexes can sync only what changed."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL
+        )
+    ''')
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS job_changes_{event.lower()} AFTER {event} ON jobs BEGIN
+                INSERT INTO job_changes (job_id) VALUES ({row}.id);
+            END
+        ''')
+    # Trim the log every 1000 entries
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS job_changes_prune AFTER INSERT ON job_changes
+        WHEN NEW.seq % 1000 = 0 BEGIN
+            DELETE FROM job_changes WHERE seq <= NEW.seq - {JOB_CHANGES_RETAIN};
+        END
+    ''')
+
+MIGRATIONS = [
+    (1, 'create jobs table', _migration_001_create_jobs),
+    (2, 'seed demo jobs', _migration_002_seed_demo_jobs),
+    (3, 'index jobs by posting_date', _migration_003_posting_date_index),
+    (4, 'index jobs by user_id, created_at', _migration_004_user_created_index),
+    (5, 'full-text search index', _migration_005_search_index),
+    (6, 'backfill sort keys for keyset pagination', _migration_006_backfill_sort_keys),
+    (7, 'numeric salary columns', _migration_007_numeric_salary),
+    (8, 'normalized job skills', _migration_008_job_skills),
+    (9, 'jobs change counter', _migration_009_change_counter),
+    (10, 'shared key/value cache', _migration_010_kv_cache),
+    (11, 'leases', _migration_011_leases),
+    (12, 'parse task queue', _migration_012_parse_tasks),
+    (13, 'relink job skills', _migration_013_relink_skills),
+    (14, 'job change log', _migration_014_job_changes),
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+@contextmanager
+def _migration_lock():
+    """Hold an exclusive file lock so only one process migrates at a time."""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    with open(DB_PATH + '.migrate.lock', 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def get_schema_version():
+    """
+    Return the schema version of the database.
+    
+    Returns:
+        int: Highest applied migration number, 0 for a database never migrated
+    """
+    try:
+        row = get_connection().execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+def migrate():
+    """
+    Apply all pending migrations in order.
+    
+    Safe to call from several processes at once: the file lock serializes
+    them and later callers find nothing left to do.
+    
+    Returns:
+        list: Version numbers of the migrations applied by this call
+    """
+    applied = []
+    with _migration_lock():
+        conn = get_connection()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        
+        current = get_schema_version()
+        for version, name, apply in MIGRATIONS:
+            if version <= current:
+                continue
+            conn.execute('BEGIN IMMEDIATE')
             try:
-                cursor.execute(f'ALTER TABLE jobs ADD COLUMN {column_name} {column_def}')
-                print(f"[DB] Added missing column: {column_name}")
-            except sqlite3.OperationalError as e:
-                print(f"[DB] Error adding column {column_name}: {e}")
+                apply(conn)
+                conn.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)', (version, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                print(f"[DB] Migration {version:03d} ({name}) failed")
+                raise
+            print(f"[DB] Applied migration {version:03d}: {name}")
+            applied.append(version)
     
-    conn.commit()
-    conn.close()
+    return applied
 
-def get_all_jobs():
-    """Retrieve all jobs from database."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def init_db():
+    """
+    Make sure the database schema is current.
+    
+    In the normal case this is a single version check; migrations only run
+    if the database is behind (e.g. first start in local development).
+    Deployments should run ``python -m db migrate`` before starting workers.
+    """
+    if get_schema_version() < LATEST_SCHEMA_VERSION:
+        migrate()
+
+def _like_pattern(value):
+    """Build a LIKE pattern matching ``value`` as a literal substring."""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+def _as_list(value):
+    """Normalize a filter value that may be a list or a comma-separated string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(v).strip() for v in value if v and str(v).strip()]
+
+def _fts_phrase(text):
+    """Quote ``text`` as an FTS5 phrase, or return None if it has no searchable tokens."""
+    if not FTS_TOKEN_RE.search(text):
+        return None
+    return '"' + text.replace('"', '""') + '"'
+
+def build_match_expression(filters):
+    """
+    Build an FTS5 MATCH expression from the text filters in a parsed query.
+    
+    Location must match as a phrase, every word of the job title must appear in
+    the title, and at least one skill must appear in the title, description or
+    skills columns. Matching is on whole tokens, so "go" no longer matches "good".
+    
+    Args:
+        filters: Parsed filters dict from gemini_service.parse_query()
+        
+    Returns:
+        str: MATCH expression, or None if there are no text filters
+    """
+    filters = filters or {}
+    terms = []
+    
+    location = _fts_phrase((filters.get('location') or '').strip())
+    if location:
+        terms.append(f'location : {location}')
     
-    cursor.execute('SELECT * FROM jobs ORDER BY posting_date DESC')
-    jobs = [dict(row) for row in cursor.fetchall()]
+    title_words = [_fts_phrase(w) for w in (filters.get('job_title') or '').split()]
+    title_words = [w for w in title_words if w]
+    if title_words:
+        terms.append('title : (' + ' AND '.join(title_words) + ')')
     
-    conn.close()
-    return jobs
+    skills = [_fts_phrase(s) for s in _as_list(filters.get('skills'))]
+    skills = [s for s in skills if s]
+    if skills:
+        terms.append('{title description skills} : (' + ' OR '.join(skills) + ')')
+    
+    return ' AND '.join(terms) if terms else None
 
-def get_job_by_id(job_id):
-    """Retrieve a specific job by ID."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def _filter_clauses(filters):
+    """
+    Build the FROM clause, WHERE conditions and parameters for parsed filters.
     
-    cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
-    job = cursor.fetchone()
+    Returns:
+        tuple: (from_sql, clauses, params, has_match) where has_match is True
+        when the jobs_fts index is joined in
+    """
+    filters = filters or {}
+    clauses = []
+    params = []
     
-    conn.close()
-    return dict(job) if job else None
+    match = build_match_expression(filters)
+    if match:
+        clauses.append('jobs_fts MATCH ?')
+        params.append(match)
+    
+    seniority = (filters.get('seniority') or '').strip().lower()
+    if seniority in SENIORITY_TITLE_KEYWORDS:
+        keywords = SENIORITY_TITLE_KEYWORDS[seniority]
+        clauses.append('(' + ' OR '.join(["jobs.title LIKE ? ESCAPE '\\'"] * len(keywords)) + ')')
+        params.extend(_like_pattern(k) for k in keywords)
+    elif seniority == 'mid':
+        keywords = [k for level in SENIORITY_TITLE_KEYWORDS.values() for k in level]
+        clauses.append(' AND '.join(["jobs.title NOT LIKE ? ESCAPE '\\'"] * len(keywords)))
+        params.extend(_like_pattern(k) for k in keywords)
+    
+    # Salary ranges overlap: the job's [pay_min, pay_max] meets the asked-for range
+    low, high = parse_salary_range(filters.get('salary_range'))
+    if low is not None:
+        clauses.append('jobs.pay_max >= ?')
+        params.append(low)
+    if high is not None:
+        clauses.append('jobs.pay_min <= ?')
+        params.append(high)
+    
+    if match:
+        from_sql = 'jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid'
+    else:
+        from_sql = 'jobs'
+    return from_sql, clauses, params, bool(match)
 
-def get_user_jobs(user_id):
-    """Retrieve all jobs created by a specific user."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+def build_job_filter_query(filters, limit=None, columns='jobs.*'):
+    """
+    Translate the filter dict returned by gemini_service.parse_query() into SQL.
+    
+    Text filters (location, job_title, skills) go through the jobs_fts index and
+    results are ordered by BM25 relevance; without text filters rows come back
+    newest first.
+    
+    Args:
+        filters: Dict with optional location, job_title, skills, seniority and salary_range
+        limit: Maximum number of rows to return (None for no limit)
+        columns: Select list, e.g. 'jobs.id'
+        
+    Returns:
+        tuple: (sql, params) ready for conn.execute()
+    """
+    from_sql, clauses, params, has_match = _filter_clauses(filters)
+    
+    sql = f'SELECT {columns} FROM {from_sql}'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    if has_match:
+        sql += f' ORDER BY {FTS_RANK}'
+    else:
+        sql += ' ORDER BY jobs.posting_date DESC, jobs.id DESC'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(int(limit))
     
-    cursor.execute('SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC', (user_id,))
-    jobs = [dict(row) for row in cursor.fetchall()]
+    return sql, params
+
+def find_jobs(filters, limit=ANALYZE_ROW_LIMIT):
+    """
+    Retrieve only the jobs matching the parsed query filters.
+    
+    Args:
+        filters: Parsed filters dict from gemini_service.parse_query()
+        limit: Maximum number of rows to return, most relevant first
+        
+    Returns:
+        list: Matching job dicts
+    """
+    sql, params = build_job_filter_query(filters, limit)
+    rows = get_connection().execute(sql, params).fetchall()
+    return [dict(row) for row in rows]
+
+def find_job_ids(filters, limit=None):
+    """
+    Ids of the jobs matching the parsed query filters, most relevant first.
+    
+    Args:
+        filters: Parsed filters dict from gemini_service.parse_query()
+        limit: Maximum number of ids to return (None for no limit)
+        
+    Returns:
+        list: Matching job ids
+    """
+    sql, params = build_job_filter_query(filters, limit, columns='jobs.id')
+    return [row[0] for row in get_connection().execute(sql, params)]
+
+def count_jobs(filters=None):
+    """
+    Count the jobs matching the parsed query filters.
+    
+    Args:
+        filters: Parsed filters dict, or None to count every job
+        
+    Returns:
+        int: Number of matching jobs
+    """
+    from_sql, clauses, params, _ = _filter_clauses(filters)
+    sql = f'SELECT COUNT(*) FROM {from_sql}'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    return get_connection().execute(sql, params).fetchone()[0]
+
+def salary_stats(filters=None, group_by=None, limit=SALARY_STATS_GROUP_LIMIT):
+    """
+    Compute salary aggregates in SQL for the jobs matching ``filters``.
+    
+    Each job contributes the midpoint of its [pay_min, pay_max] range to the
+    median; min is the lowest pay_min and max the highest pay_max. Jobs
+    without a parseable salary are left out.
+    
+    Args:
+        filters: Parsed filters dict, or None for every job
+        group_by: None for one overall row, or one of SALARY_GROUP_COLUMNS
+        limit: Maximum number of groups, highest median first
+        
+    Returns:
+        list: Dicts with group, job_count, min_pay, median_pay, avg_pay, max_pay
+        
+    Raises:
+        ValueError: If group_by is not a supported column
+    """
+    if group_by is not None and group_by not in SALARY_GROUP_COLUMNS:
+        raise ValueError(f"Cannot group salaries by {group_by!r}")
+    
+    from_sql, clauses, params, _ = _filter_clauses(filters)
+    clauses = ['jobs.pay_min IS NOT NULL'] + clauses
+    group_expr = f'jobs.{group_by}' if group_by else 'NULL'
+    
+    sql = f'''
+        WITH matched AS (
+            SELECT {group_expr} AS grp, jobs.pay_min AS pay_min,
+                   COALESCE(jobs.pay_max, jobs.pay_min) AS pay_max,
+                   (jobs.pay_min + COALESCE(jobs.pay_max, jobs.pay_min)) / 2.0 AS pay_mid
+            FROM {from_sql}
+            WHERE {' AND '.join(clauses)}
+        ),
+        ranked AS (
+            SELECT grp, pay_min, pay_max, pay_mid,
+                   ROW_NUMBER() OVER (PARTITION BY grp ORDER BY pay_mid) AS rn,
+                   COUNT(*) OVER (PARTITION BY grp) AS cnt
+            FROM matched
+        )
+        SELECT grp AS "group", cnt AS job_count, MIN(pay_min) AS min_pay, MAX(pay_max) AS max_pay,
+               AVG(pay_mid) AS avg_pay,
+               AVG(CASE WHEN rn IN ((cnt + 1) / 2, (cnt + 2) / 2) THEN pay_mid END) AS median_pay
+        FROM ranked
+        GROUP BY grp
+        ORDER BY median_pay DESC
+        LIMIT ?
+    '''
+    params.append(int(limit))
+    rows = get_connection().execute(sql, params).fetchall()
+    return [dict(row) for row in rows]
+
+# ===== Read-through Job Cache =====
+
+def get_data_version():
+    """
+    Return the jobs change counter.
+    
+    The counter is bumped by triggers on every insert, update or delete of a
+    job, from any process, so equal values mean the jobs table is unchanged.
+    
+    Returns:
+        int: Current jobs_version
+    """
+    row = get_connection().execute("SELECT value FROM db_meta WHERE key = 'jobs_version'").fetchone()
+    return row[0] if row else 0
+
+def _cached(key, loader):
+    """
+    Serve ``key`` from the job cache, calling ``loader`` on a miss.
+    
+    Cached values are shared between requests and must be treated as read-only.
+    """
+    global _job_cache_version, _job_cache_invalidations
+    if JOB_CACHE_SIZE <= 0:
+        return loader()
+    
+    version = get_data_version()
+    with _job_cache_lock:
+        if version != _job_cache_version:
+            if _job_cache_version is not None:
+                _job_cache_invalidations += 1
+            _job_cache.clear()
+            _job_cache_version = version
+    
+    value = _job_cache.get(key)
+    if value is MISSING:
+        value = loader()
+        with _job_cache_lock:
+            # Don't store data read after another write has invalidated the cache
+            if version == _job_cache_version:
+                _job_cache.set(key, value)
+    return value
+
+def _filters_key(filters):
+    """Hashable, order-independent form of a filters dict for cache keys."""
+    return json.dumps(filters or {}, sort_keys=True, default=str)
+
+def cache_stats():
+    """
+    Return job cache counters for sizing JOB_CACHE_SIZE.
+    
+    Returns:
+        dict: LRU counters plus the number of invalidations and the cached version
+    """
+    stats = _job_cache.stats()
+    stats['invalidations'] = _job_cache_invalidations
+    stats['data_version'] = _job_cache_version
+    return stats
+
+def clear_cache():
+    """Drop every cached job query in this worker."""
+    global _job_cache_version
+    with _job_cache_lock:
+        _job_cache.clear()
+        _job_cache_version = None
+
+# ===== Shared Key/Value Cache =====
+#
+# Backing store for cache.TieredCache: JSON values shared by every worker and
+# kept across restarts. Expired rows are ignored on read and removed by kv_prune().
+
+def kv_get(namespace, key):
+    """
+    Read a cached value.
+    
+    Returns:
+        The decoded JSON value, or cache.MISSING if absent or expired
+    """
+    row = get_connection().execute(
+        'SELECT value, expires_at FROM kv_cache WHERE namespace = ? AND key = ?', (namespace, key)
+    ).fetchone()
+    if row is None or (row['expires_at'] is not None and row['expires_at'] <= time.time()):
+        return MISSING
+    return json.loads(row['value'])
+
+def kv_set(namespace, key, value, ttl=None):
+    """Store a JSON-serializable value, replacing any previous one."""
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO kv_cache (namespace, key, value, created_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (namespace, key, json.dumps(value, separators=(',', ':')), now, now + ttl if ttl else None))
+
+def kv_delete(namespace, key=None):
+    """Delete one key, or the whole namespace when ``key`` is None."""
+    conn = get_connection()
+    with conn:
+        if key is None:
+            conn.execute('DELETE FROM kv_cache WHERE namespace = ?', (namespace,))
+        else:
+            conn.execute('DELETE FROM kv_cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+def kv_prune(namespace, max_entries):
+    """
+    Remove expired entries, then the oldest ones beyond ``max_entries``.
+    
+    Returns:
+        int: Number of rows removed
+    """
+    conn = get_connection()
+    with conn:
+        expired = conn.execute(
+            'DELETE FROM kv_cache WHERE namespace = ? AND expires_at <= ?', (namespace, time.time())
+        ).rowcount
+        overflow = conn.execute('''
+            DELETE FROM kv_cache WHERE namespace = ? AND key IN (
+                SELECT key FROM kv_cache WHERE namespace = ?
+                ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (namespace, namespace, int(max_entries))).rowcount
+    return expired + overflow
+
+# ===== Leases =====
+#
+# A lease marks a piece of work as taken by one owner (a worker thread) until
+# it is released or expires, so a crashed owner never blocks others for long.
+
+def lease_acquire(namespace, key, owner, ttl):
+    """
+    Take the lease on ``key`` unless another owner holds an unexpired one.
+    
+    Returns:
+        bool: True if ``owner`` now holds the lease
+    """
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        conn.execute(
+            'DELETE FROM leases WHERE namespace = ? AND key = ? AND expires_at <= ?', (namespace, key, now)
+        )
+        taken = conn.execute(
+            'INSERT OR IGNORE INTO leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)',
+            (namespace, key, owner, now + ttl)
+        ).rowcount
+    return taken == 1
+
+def lease_held(namespace, key):
+    """Return True if anyone holds an unexpired lease on ``key``."""
+    row = get_connection().execute(
+        'SELECT 1 FROM leases WHERE namespace = ? AND key = ? AND expires_at > ?', (namespace, key, time.time())
+    ).fetchone()
+    return row is not None
+
+def lease_release(namespace, key, owner):
+    """Give up a lease held by ``owner``."""
+    conn = get_connection()
+    with conn:
+        conn.execute('DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?', (namespace, key, owner))
+
+# ===== Parse Tasks =====
+#
+# Queue for task_queue.py. A task is 'queued' until a worker claims it
+# ('running', with a lease), then 'done' or 'failed'; a running task whose
+# lease expired (the worker died) can be claimed again.
+
+def _decode_task(row):
+    task = dict(row)
+    task['result'] = json.loads(task['result']) if task['result'] else None
+    return task
+
+def enqueue_task(payload, user_id=None, max_attempts=3):
+    """
+    Add a task to the parse queue.
+    
+    Returns:
+        int: Task id
+    """
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute('''
+            INSERT INTO parse_tasks (user_id, payload, max_attempts, run_after, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, payload, max_attempts, now, now))
+    return cursor.lastrowid
+
+def claim_task(worker, lease_seconds):
+    """
+    Claim the oldest runnable task for ``worker``.
+    
+    Running tasks whose lease expired on their last allowed attempt are
+    marked failed first; others with an expired lease are claimed again.
+    
+    Returns:
+        dict: The claimed task (attempts already incremented), or None
+    """
+    now = time.time()
+    conn = get_connection()
+    with conn:
+        conn.execute('''
+            UPDATE parse_tasks SET status = 'failed', error = 'worker_lost', finished_at = ?
+            WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts
+        ''', (now, now))
+        row = conn.execute('''
+            UPDATE parse_tasks
+            SET status = 'running', attempts = attempts + 1, worker = ?, lease_expires_at = ?
+            WHERE id = (
+                SELECT id FROM parse_tasks
+                WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_expires_at <= ?)
+                ORDER BY id LIMIT 1
+            )
+            RETURNING *
+        ''', (worker, now + lease_seconds, now, now)).fetchone()
+    return _decode_task(row) if row else None
+
+def finish_task(task_id, worker, status, result=None, error=None):
+    """
+    Record the outcome of a claimed task.
+    
+    Returns:
+        bool: False if ``worker`` no longer holds the task (its lease expired and it was re-claimed)
+    """
+    conn = get_connection()
+    with conn:
+        updated = conn.execute('''
+            UPDATE parse_tasks SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires_at = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+        ''', (status, json.dumps(result) if result is not None else None, error, time.time(),
+              task_id, worker)).rowcount
+    return updated == 1
+
+def retry_task(task_id, worker, error, delay):
+    """Put a claimed task back in the queue to run again after ``delay`` seconds."""
+    conn = get_connection()
+    with conn:
+        updated = conn.execute('''
+            UPDATE parse_tasks SET status = 'queued', error = ?, run_after = ?, lease_expires_at = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+        ''', (error, time.time() + delay, task_id, worker)).rowcount
+    return updated == 1
+
+def get_task(task_id):
+    """Return a task by id, or None."""
+    row = get_connection().execute('SELECT * FROM parse_tasks WHERE id = ?', (task_id,)).fetchone()
+    return _decode_task(row) if row else None
+
+def prune_tasks(older_than):
+    """
+    Delete finished tasks, with their posting payloads, that finished more
+    than ``older_than`` seconds ago.
     
-    conn.close()
-    return jobs
+    Returns:
+        int: Number of tasks deleted
+    """
+    conn = get_connection()
+    with conn:
+        deleted = conn.execute('''
+            DELETE FROM parse_tasks WHERE status IN ('done', 'failed') AND finished_at <= ?
+        ''', (time.time() - older_than,)).rowcount
+    return deleted
+
+def task_counts():
+    """
+    Count parse tasks by status.
+    
+    Returns:
+        dict: {status: count}, plus the age in seconds of the oldest queued task
+    """
+    conn = get_connection()
+    counts = dict(conn.execute('SELECT status, COUNT(*) FROM parse_tasks GROUP BY status').fetchall())
+    oldest = conn.execute("SELECT MIN(created_at) FROM parse_tasks WHERE status = 'queued'").fetchone()[0]
+    counts['oldest_queued_seconds'] = round(time.time() - oldest, 1) if oldest else 0.0
+    return counts
+
+# ===== Skills =====
+
+def _get_skill_ids(conn, names):
+    """Map canonical skill names to skills.id, creating missing rows."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    conn.executemany('INSERT OR IGNORE INTO skills (name) VALUES (?)', [(name,) for name in names])
+    placeholders = ','.join('?' * len(names))
+    rows = conn.execute(f'SELECT id, name FROM skills WHERE name IN ({placeholders})', names)
+    return {row['name']: row['id'] for row in rows}
+
+def _insert_job_skills(conn, job_id, names):
+    """Link a job to its skills; the caller owns the transaction."""
+    if not names:
+        return
+    conn.executemany(
+        'INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)',
+        [(job_id, skill_id) for skill_id in _get_skill_ids(conn, names).values()]
+    )
+
+def _location_key(location):
+    """Normalize a location the same way the skill_counts triggers do."""
+    return (location or '').strip().lower()
+
+def top_skills(filters=None, limit=TOP_SKILLS_LIMIT):
+    """
+    Most frequently required skills among the jobs matching ``filters``.
+    
+    With no filters, or only a location, the answer is read from the
+    incrementally maintained skill_counts table (an index range scan over k
+    rows). Any other filter counts job_skills for the matching jobs.
+    
+    Args:
+        filters: Parsed filters dict, or None for every job
+        limit: Number of skills to return
+        
+    Returns:
+        list: Dicts with skill and job_count, most common first
+    """
+    filters = {k: v for k, v in (filters or {}).items()
+               if v and k in ('location', 'job_title', 'skills', 'seniority', 'salary_range')}
+    conn = get_connection()
+    
+    if set(filters) <= {'location'}:
+        location = _location_key(filters.get('location'))
+        rows = conn.execute('''
+            SELECT skills.name AS skill, skill_counts.job_count AS job_count
+            FROM skill_counts JOIN skills ON skills.id = skill_counts.skill_id
+            WHERE skill_counts.location = ?
+            ORDER BY skill_counts.job_count DESC, skills.name
+            LIMIT ?
+        ''', (location, int(limit))).fetchall()
+        if rows or not location:
+            return [dict(row) for row in rows]
+        # Partial location ("Austin" vs "austin, tx"): sum the matching locations
+        rows = conn.execute('''
+            SELECT skills.name AS skill, SUM(skill_counts.job_count) AS job_count
+            FROM skill_counts JOIN skills ON skills.id = skill_counts.skill_id
+            WHERE skill_counts.location != '' AND instr(skill_counts.location, ?) > 0
+            GROUP BY skill_counts.skill_id
+            ORDER BY job_count DESC, skills.name
+            LIMIT ?
+        ''', (location, int(limit))).fetchall()
+        return [dict(row) for row in rows]
+    
+    from_sql, clauses, params, _ = _filter_clauses(filters)
+    sql = f'SELECT jobs.id FROM {from_sql}'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    rows = conn.execute(f'''
+        SELECT skills.name AS skill, COUNT(*) AS job_count
+        FROM job_skills JOIN skills ON skills.id = job_skills.skill_id
+        WHERE job_skills.job_id IN ({sql})
+        GROUP BY job_skills.skill_id
+        ORDER BY job_count DESC, skills.name
+        LIMIT ?
+    ''', (*params, int(limit))).fetchall()
+    return [dict(row) for row in rows]
+
+def job_vocabulary():
+    """
+    Distinct locations, titles and skill names present in the jobs table.
+
+    Used by the local query parser to recognise entities in user queries.
+
+    Returns:
+        dict: Lists under 'locations', 'titles' and 'skills'
+    """
+    def load():
+        conn = get_connection()
+        return {
+            'locations': [row[0] for row in conn.execute(
+                "SELECT DISTINCT location FROM jobs WHERE location IS NOT NULL AND location != ''")],
+            'titles': [row[0] for row in conn.execute(
+                "SELECT DISTINCT title FROM jobs WHERE title IS NOT NULL AND title != ''")],
+            'skills': [row[0] for row in conn.execute('SELECT name FROM skills')],
+        }
+    return _cached(('vocabulary',), load)
+
+# ===== Keyset Pagination =====
+#
+# Pages are addressed by an opaque cursor holding the sort key of the last row
+# on the previous page, so fetching page N costs the same as page 1 (an index
+# seek) instead of OFFSET's scan-and-discard.
+
+def encode_cursor(sort_value, job_id):
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+    
+    Args:
+        sort_value: posting_date or created_at of the last row
+        job_id: id of the last row
+        
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = json.dumps([sort_value, job_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor().
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, job_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(sort_value), int(job_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+
+def _keyset_page(from_sql, clauses, params, sort_column, cursor, page_size):
+    """Fetch one page ordered by (sort_column DESC, id DESC) after ``cursor``."""
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    clauses = list(clauses)
+    params = list(params)
+    
+    if cursor:
+        sort_value, job_id = decode_cursor(cursor)
+        clauses.append(f'(jobs.{sort_column}, jobs.id) < (?, ?)')
+        params.extend([sort_value, job_id])
+    
+    sql = f'SELECT jobs.* FROM {from_sql}'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += f' ORDER BY jobs.{sort_column} DESC, jobs.id DESC LIMIT ?'
+    # One extra row tells us whether there is a next page
+    params.append(page_size + 1)
+    
+    rows = get_connection().execute(sql, params).fetchall()
+    jobs = [dict(row) for row in rows[:page_size]]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = jobs[-1]
+        next_cursor = encode_cursor(last[sort_column], last['id'])
+    return jobs, next_cursor
+
+def get_jobs_page(filters=None, cursor=None, page_size=JOBS_PAGE_SIZE):
+    """
+    Retrieve one page of jobs, newest posting first.
+    
+    Args:
+        filters: Optional parsed filters dict (same shape as find_jobs())
+        cursor: Cursor returned with the previous page, or None for the first page
+        page_size: Number of jobs per page (capped at MAX_PAGE_SIZE)
+        
+    Returns:
+        tuple: (jobs, next_cursor) - next_cursor is None on the last page;
+        cached, so treat the jobs as read-only
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        decode_cursor(cursor)  # reject bad cursors before they reach the cache
+    
+    def load():
+        from_sql, clauses, params, _ = _filter_clauses(filters)
+        return _keyset_page(from_sql, clauses, params, 'posting_date', cursor, page_size)
+    return _cached(('jobs_page', _filters_key(filters), cursor, page_size), load)
+
+def get_user_jobs_page(user_id, cursor=None, page_size=JOBS_PAGE_SIZE):
+    """
+    Retrieve one page of a user's jobs, most recently created first.
+    
+    Args:
+        user_id: Owner of the jobs
+        cursor: Cursor returned with the previous page, or None for the first page
+        page_size: Number of jobs per page (capped at MAX_PAGE_SIZE)
+        
+    Returns:
+        tuple: (jobs, next_cursor) - next_cursor is None on the last page;
+        cached, so treat the jobs as read-only
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        decode_cursor(cursor)  # reject bad cursors before they reach the cache
+    
+    def load():
+        return _keyset_page('jobs', ['jobs.user_id = ?'], [user_id], 'created_at', cursor, page_size)
+    return _cached(('user_jobs_page', user_id, cursor, page_size), load)
+
+def search_jobs(query, limit=ANALYZE_ROW_LIMIT):
+    """
+    Full-text search over job title, company, location, description and skills.
+    
+    Any query word may match; rows are ordered by BM25 so jobs matching more
+    (and rarer) words in the title or skills come first.
+    
+    Args:
+        query: Free-text search string
+        limit: Maximum number of rows to return
+        
+    Returns:
+        list: Matching job dicts, most relevant first
+    """
+    words = [w for w in FTS_TOKEN_RE.findall((query or '').lower()) if w not in FTS_STOPWORDS]
+    if not words:
+        return []
+    
+    match = ' OR '.join(_fts_phrase(w) for w in dict.fromkeys(words))
+    rows = get_connection().execute(f'''
+        SELECT jobs.* FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH ?
+        ORDER BY {FTS_RANK}
+        LIMIT ?
+    ''', (match, int(limit))).fetchall()
+    return [dict(row) for row in rows]
+
+def get_all_jobs():
+    """Retrieve all jobs from database (cached; treat the result as read-only)."""
+    def load():
+        rows = get_connection().execute('SELECT * FROM jobs ORDER BY posting_date DESC').fetchall()
+        return [dict(row) for row in rows]
+    return _cached(('all_jobs',), load)
+
+def get_job_by_id(job_id):
+    """Retrieve a specific job by ID (cached; treat the result as read-only)."""
+    def load():
+        job = get_connection().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(job) if job else None
+    return _cached(('job', job_id), load)
+
+def get_jobs_by_ids(job_ids):
+    """
+    Retrieve several jobs by ID, in the order given.
+
+    Args:
+        job_ids: Job ids; unknown ids are skipped
+
+    Returns:
+        list: Job dicts
+    """
+    job_ids = [int(job_id) for job_id in job_ids]
+    conn = get_connection()
+    rows = {}
+    for start in range(0, len(job_ids), 500):
+        chunk = job_ids[start:start + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(f'SELECT * FROM jobs WHERE id IN ({placeholders})', chunk):
+            rows[row['id']] = dict(row)
+    return [rows[job_id] for job_id in job_ids if job_id in rows]
+
+def get_job_ids():
+    """
+    Ids of every job, for rebuilding derived indexes in full.
+
+    Returns:
+        list: Job ids
+    """
+    return [row[0] for row in get_connection().execute('SELECT id FROM jobs')]
+
+def get_job_change_seq():
+    """
+    Return the sequence number of the latest entry in the job change log.
+
+    Returns:
+        int: Latest seq, or 0 if no job has changed since migration 14
+    """
+    row = get_connection().execute("SELECT seq FROM sqlite_sequence WHERE name = 'job_changes'").fetchone()
+    return row[0] if row else 0
+
+def get_job_changes(since):
+    """
+    Ids of the jobs inserted, updated or deleted after change ``since``.
+    
+    Args:
+        since: A seq from get_job_change_seq() or an earlier call
+        
+    Returns:
+        tuple: (set of job ids, latest seq); the ids are None when the log
+        has been pruned past ``since`` and the caller must rebuild in full
+    """
+    conn = get_connection()
+    oldest = conn.execute('SELECT MIN(seq) FROM job_changes').fetchone()[0]
+    if oldest is not None and oldest > since + 1:
+        return None, get_job_change_seq()
+    rows = conn.execute('SELECT seq, job_id FROM job_changes WHERE seq > ?', (since,)).fetchall()
+    return {row['job_id'] for row in rows}, max((row['seq'] for row in rows), default=since)
+
+def get_user_jobs(user_id):
+    """Retrieve all jobs created by a specific user (cached; treat the result as read-only)."""
+    def load():
+        rows = get_connection().execute(
+            'SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC', (user_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    return _cached(('user_jobs', user_id), load)
 
 def save_job(title, company, location, pay, description, user_id, skills='unknown', posting_date=None):
     """Save a new job to the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = get_connection()
     
     if posting_date is None:
         posting_date = datetime.now().strftime('%Y-%m-%d')
@@ -326,30 +1543,115 @@ def save_job(title, company, location, pay, description, user_id, skills='unknow
         skills = 'unknown'
     
     now = datetime.now().isoformat()
+    pay_min, pay_max = normalize_pay(pay)
+    
+    with conn:
+        cursor = conn.execute('''
+            INSERT INTO jobs (title, company, location, pay, pay_min, pay_max, posting_date, description, skills, user_id, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (title, company, location, pay, pay_min, pay_max, posting_date, description, skills, user_id, now, now))
+        _insert_job_skills(conn, cursor.lastrowid, skills_for_job(skills, title, description))
     
-    cursor.execute('''
-        INSERT INTO jobs (title, company, location, pay, posting_date, description, skills, user_id, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (title, company, location, pay, posting_date, description, skills, user_id, now, now))
+    return cursor.lastrowid
+
+def save_jobs_bulk(jobs, user_id=None, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Insert many jobs with executemany, committing once per chunk.
+    
+    ``jobs`` is consumed lazily, so a generator over a large feed keeps memory
+    flat at one chunk. Each chunk is its own transaction: if a later chunk
+    fails, earlier chunks stay committed.
     
-    conn.commit()
-    job_id = cursor.lastrowid
-    conn.close()
+    Args:
+        jobs: Iterable of dicts with title, company, location and optional
+              pay, posting_date, description, skills
+        user_id: Owner recorded on every imported job
+        chunk_size: Rows per transaction
+        
+    Returns:
+        int: Number of jobs inserted
+    """
+    conn = get_connection()
+    today = datetime.now().strftime('%Y-%m-%d')
+    inserted = 0
     
-    return job_id
+    iterator = iter(jobs)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        
+        now = datetime.now().isoformat()
+        rows = [
+            (job['title'], job['company'], job['location'], job.get('pay'), *normalize_pay(job.get('pay')),
+             job.get('posting_date') or today, job.get('description'),
+             job.get('skills') or 'unknown', user_id, now, now)
+            for job in chunk
+        ]
+        job_skills = [skills_for_job(job.get('skills'), job['title'], job.get('description')) for job in chunk]
+        
+        # IMMEDIATE takes the write lock up front, so the ids above last_id are ours
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM jobs').fetchone()[0]
+            conn.executemany('''
+                INSERT INTO jobs (title, company, location, pay, pay_min, pay_max, posting_date, description, skills, user_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            new_ids = [row[0] for row in conn.execute('SELECT id FROM jobs WHERE id > ? ORDER BY id', (last_id,))]
+            skill_ids = _get_skill_ids(conn, [name for names in job_skills for name in names])
+            conn.executemany(
+                'INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)',
+                [(job_id, skill_ids[name])
+                 for job_id, names in zip(new_ids, job_skills)
+                 for name in names]
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        inserted += len(rows)
+    
+    return inserted
 
-def update_job(job_id, title, company, location, pay, description):
-    """Update an existing job."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def update_job(job_id, title, company, location, pay, description, skills=None):
+    """Update an existing job (skills=None keeps the current skills list)."""
+    conn = get_connection()
     
     now = datetime.now().isoformat()
+    pay_min, pay_max = normalize_pay(pay)
     
-    cursor.execute('''
-        UPDATE jobs 
-        SET title = ?, company = ?, location = ?, pay = ?, description = ?, updated_at = ?
-        WHERE id = ?
-    ''', (title, company, location, pay, description, now, job_id))
+    with conn:
+        if skills is None:
+            row = conn.execute('SELECT skills FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            skills = row['skills'] if row else None
+        
+        # Unlink skills before the location changes so skill_counts decrements the old location
+        conn.execute('DELETE FROM job_skills WHERE job_id = ?', (job_id,))
+        conn.execute('''
+            UPDATE jobs 
+            SET title = ?, company = ?, location = ?, pay = ?, pay_min = ?, pay_max = ?, description = ?,
+                skills = ?, updated_at = ?
+            WHERE id = ?
+        ''', (title, company, location, pay, pay_min, pay_max, description, skills or UNKNOWN_SKILLS, now, job_id))
+        _insert_job_skills(conn, job_id, skills_for_job(skills, title, description))
+
+
+def main(argv=None):
+    """Command-line entry point: ``python -m db <command>``."""
+    parser = argparse.ArgumentParser(prog='python -m db', description='Job database maintenance')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('migrate', help='apply pending schema migrations')
+    subparsers.add_parser('version', help='print the current schema version')
+    args = parser.parse_args(argv)
     
-    conn.commit()
-    conn.close()
+    if args.command == 'migrate':
+        applied = migrate()
+        print(f"[DB] Schema at version {get_schema_version()} ({len(applied)} migration(s) applied)")
+    elif args.command == 'version':
+        print(f"{get_schema_version()} (latest {LATEST_SCHEMA_VERSION})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Field Extractor Module
+Rule-based extraction of job fields from posting text, so job_parser only
+asks Gemini for what the rules cannot find, or skips Gemini entirely.
+
+Each rule fills a field only when the posting states it in a recognisable
+form: a "City, ST" pair in the opening lines, a Remote/Hybrid marker, a
+salary range, known skill names, a title/company header or "Title:" and
+"Company:" labels, and a role-summary section. A field the rules are not
+sure of is left out, never guessed. Values use the same formats as the
+Gemini prompt in job_parser.
+"""
+import os
+import re
+import logging
+
+import posting_cleaner
+from query_parser import TITLE_HEADS
+from skills import extract_skills, display_skill
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to ask Gemini for every field
+LOCAL_EXTRACT_ENABLED = os.getenv('LOCAL_EXTRACT_ENABLED', '1') == '1'
+
+# Set to 1 to skip Gemini when the rules fill every required field, the skills and any stated pay
+# (job_parser.extract_locally); the skills list is then only the skills.py names the posting mentions
+LOCAL_EXTRACT_SKIP_LLM = os.getenv('LOCAL_EXTRACT_SKIP_LLM', '0') == '1'
+
+# Fewest known skills for the skills field to count as found
+LOCAL_EXTRACT_MIN_SKILLS = int(os.getenv('LOCAL_EXTRACT_MIN_SKILLS', '3'))
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois', 'IN': 'Indiana',
+    'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi', 'MO': 'Missouri',
+    'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire', 'NJ': 'New Jersey',
+    'NM': 'New Mexico', 'NY': 'New York', 'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio',
+    'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont',
+    'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming',
+}
+STATE_ABBREVIATIONS = {name.lower(): abbreviation for abbreviation, name in US_STATES.items()}
+
+CITY_STATE_RE = re.compile(
+    r"(?<![\w])(?P<city>[A-Z][A-Za-z.'-]*(?:\s[A-Z][A-Za-z.'-]*){0,3}),\s*"
+    r"(?P<state>" + '|'.join(sorted(US_STATES, key=len, reverse=True)) + '|'
+    + '|'.join(re.escape(name) for name in sorted(US_STATES.values(), key=len, reverse=True)) + r")(?![\w])"
+)
+
+# Work arrangement markers next to a location, and phrases that state one in the body
+HYBRID_RE = re.compile(r'\bhybrid\b', re.I)
+REMOTE_RE = re.compile(r'\bremote\b', re.I)
+ONSITE_RE = re.compile(r'\bon-?site\b|\bin[- ]office\b', re.I)
+BODY_REMOTE_RE = re.compile(r'\b(fully|100%) remote\b|\bremote (position|role|job|team)\b|\bwork remotely\b', re.I)
+
+# Lines at the top of a posting searched for the title, company and location
+HEADER_LINES = 3
+
+# Separators between the parts of a header line ("Acme · Austin, TX · 3 days ago")
+HEADER_SPLIT_RE = re.compile(r'\s+[·•|]\s+|\s+[-–—]\s+|\s*[·•|]\s*')
+
+LABEL_RE = re.compile(r'^(?P<label>job title|title|position|role|company( name)?|employer|location|'
+                      r'salary|pay( range)?|compensation)\s*:\s*(?P<value>.+)$', re.I)
+
+LOCATION_LABEL_RE = re.compile(r'^(work )?location\s*:', re.I)
+
+# Words that end a job title, beyond those query_parser knows
+TITLE_WORDS = set(TITLE_HEADS) | {
+    'lead', 'director', 'head', 'coordinator', 'representative', 'technician', 'associate',
+    'accountant', 'nurse', 'recruiter', 'writer', 'editor', 'officer', 'intern', 'owner', 'ii', 'iii',
+}
+
+# Header parts that are job-board chrome rather than a company
+CHROME_RE = re.compile(r'\b(ago|applicants?|followers|employees|full-time|part-time|contract|promoted)\b', re.I)
+
+# "$120,000 - $150,000", "$130K/yr - $155K/yr", "$32/hr - $40/hr", "120k-150k"
+PAY_RANGE_RE = re.compile(
+    r'(?P<low>[$£€]\s?\d[\d,]*(?:\.\d+)?\s?[kK]?|\b\d{2,3}(?:,\d{3})?\s?[kK])(?:\s?/\s?\w+)?'
+    r'\s*(?:-|–|to)\s*'
+    r'(?P<high>[$£€]?\s?\d[\d,]*(?:\.\d+)?\s?[kK]?)(?![\w,])'
+)
+# A single labeled figure: "Salary: $120,000", "base salary of $95k"
+PAY_SINGLE_RE = re.compile(
+    r'\b(salary|pay|compensation|wage|rate)\b[^$£€\d]{0,30}(?P<low>[$£€]\s?\d[\d,]*(?:\.\d+)?\s?[kK]?)(?![\w,])',
+    re.I
+)
+# A bare figure right after a pay label: "Pay: 19/hr", "Salary: 95,000" (not "401k")
+PAY_LABELED_RE = re.compile(
+    r'\b(salary|pay( range)?|compensation|wage|(hourly )?rate)\s*:\s*(?!401\s?\(?k)'
+    r'(?P<low>\d[\d,]*(?:\.\d+)?\s?[kK]?)(?![\w,])',
+    re.I
+)
+# Any stated pay figure, whether or not the rules can read it
+PAY_MARKER_RE = re.compile(
+    r'[$£€]\s?\d|\b\d{2,3}(?:,\d{3})?\s?[kK]\b(?!\s*(match|plan))|'
+    r'\b(salary|pay( range)?|compensation|wage|(hourly )?rate)\s*:\s*\d',
+    re.I
+)
+
+# Role-summary sections whose opening sentences serve as the description
+SUMMARY_HEADING_RE = re.compile(
+    r'^(about the (role|position|opportunity)|the role|role (overview|summary)|job (summary|description)|'
+    r'position (overview|summary)|overview|summary)\s*:?$', re.I
+)
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z$£€\d])')
+
+# Sentences of a role summary used as the description, and the shortest summary accepted
+DESCRIPTION_SENTENCES = 3
+DESCRIPTION_MIN_CHARS = 80
+
+
+def _lines(job_text):
+    return posting_cleaner.collapse_whitespace(posting_cleaner.strip_markup(job_text or ''))
+
+
+def _amount(text):
+    """Dollar value of "$130K", "120,000" or "42.50" (cents kept only when present)."""
+    text = text.strip().lstrip('$£€').strip()
+    multiplier = 1000 if text[-1:] in ('k', 'K') else 1
+    value = float(text.rstrip('kK').strip().replace(',', '')) * multiplier
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+def extract_pay(lines):
+    """Lower end of the first stated salary range or labeled salary, as the prompt asks."""
+    for line in lines:
+        match = PAY_RANGE_RE.search(line)
+        if match is None:
+            match = PAY_SINGLE_RE.search(line) or PAY_LABELED_RE.search(line)
+        if match is None:
+            continue
+        low_text, high_text = match.group('low'), match.groupdict().get('high')
+        low = _amount(low_text)
+        if high_text:
+            # "$120-150k": the suffix on the upper end applies to both
+            if high_text.rstrip()[-1:] in ('k', 'K') and low_text.rstrip()[-1:] not in ('k', 'K') and low < 1000:
+                low *= 1000
+            if _amount(high_text) < low:
+                continue
+        if low > 0:
+            return low
+    return None
+
+
+def states_pay(text):
+    """Whether ``text`` states a pay figure, read by extract_pay() or not."""
+    return bool(PAY_MARKER_RE.search(text or ''))
+
+
+def _city_state(text):
+    match = CITY_STATE_RE.search(text)
+    if match is None:
+        return None
+    state = match.group('state')
+    state = STATE_ABBREVIATIONS.get(state.lower(), state)
+    return f"{match.group('city')}, {state}"
+
+
+def _arrangement(text):
+    if HYBRID_RE.search(text):
+        return 'hybrid'
+    if REMOTE_RE.search(text):
+        return 'remote'
+    if ONSITE_RE.search(text):
+        return 'onsite'
+    return None
+
+
+def extract_location(lines):
+    """
+    Location in the prompt's format: "Remote", "City, ST - Hybrid" or "City, ST".
+
+    The city must appear in the opening lines or a "Location:" line. The
+    work arrangement comes from the same line, or else from the body when
+    the body names exactly one arrangement.
+    """
+    candidates = lines[:HEADER_LINES] + [line for line in lines if LOCATION_LABEL_RE.match(line)]
+    city, arrangement = None, None
+    for line in candidates:
+        city = _city_state(line)
+        arrangement = _arrangement(line)
+        if city or arrangement == 'remote':
+            break
+    else:
+        return None
+
+    if arrangement is None:
+        body = '\n'.join(lines)
+        found = {name for name, pattern in (('hybrid', HYBRID_RE), ('remote', BODY_REMOTE_RE), ('onsite', ONSITE_RE))
+                 if pattern.search(body)}
+        if len(found) > 1:
+            return None
+        arrangement = found.pop() if found else 'onsite'
+
+    if arrangement == 'remote':
+        return 'Remote'
+    if city is None:
+        return None
+    return f"{city} - Hybrid" if arrangement == 'hybrid' else city
+
+
+def _is_title(text):
+    words = re.findall(r"[\w+#.'-]+", re.sub(r'\(.*?\)', ' ', text.lower()))
+    return 0 < len(words) <= 8 and any(word in TITLE_WORDS for word in words) and not CHROME_RE.search(text)
+
+
+def _is_location_part(part):
+    return bool(CITY_STATE_RE.search(part)) or bool(re.fullmatch(r'\(?(remote|hybrid|on-?site)\b.*', part, re.I))
+
+
+def extract_title_and_company(lines):
+    """
+    Title and company from "Title:"/"Company:" labels, or from the header.
+
+    A header title is the first line (or its first part) when it names a
+    role. The company is the part right before the location in a header
+    line ("Acme Corp · Austin, TX").
+    """
+    title = company = None
+    for line in lines:
+        match = LABEL_RE.match(line)
+        if match is None:
+            continue
+        label, value = match.group('label').lower(), match.group('value').strip()
+        if label in ('job title', 'title', 'position', 'role') and title is None and _is_title(value):
+            title = value
+        elif label in ('company', 'company name', 'employer') and company is None:
+            company = value
+
+    header = lines[:HEADER_LINES]
+    if title is None and header:
+        first = header[0].rstrip(':').strip()
+        parts = [part for part in HEADER_SPLIT_RE.split(first) if part]
+        if _is_title(first) and not _is_location_part(first):
+            title = first if len(parts) == 1 or not any(_is_location_part(p) for p in parts) else parts[0]
+        elif parts and _is_title(parts[0]):
+            title = parts[0]
+    if company is None:
+        for line in header:
+            parts = [part.strip() for part in HEADER_SPLIT_RE.split(line.rstrip(':')) if part.strip()]
+            for before, after in zip(parts, parts[1:]):
+                if _is_location_part(after) and not _is_location_part(before) and before != title \
+                        and not _is_title(before) and not CHROME_RE.search(before) and len(before) <= 60:
+                    company = before
+                    break
+            if company:
+                break
+    return title, company
+
+
+def extract_description(lines):
+    """
+    Opening sentences of a role-summary section ("About the Role", "The role").
+
+    The summary ends at the first sentence stating pay, which belongs in
+    the pay field rather than the description.
+    """
+    for heading, body in posting_cleaner.split_sections(lines):
+        if heading is None or not SUMMARY_HEADING_RE.match(heading):
+            continue
+        prose = ' '.join(line for line in body if not line.startswith(('-', '•', '*')))
+        sentences = []
+        for sentence in SENTENCE_RE.split(prose)[:DESCRIPTION_SENTENCES]:
+            if states_pay(sentence):
+                break
+            sentences.append(sentence)
+        description = ' '.join(sentences).strip()
+        if len(description) >= DESCRIPTION_MIN_CHARS:
+            return description
+    return None
+
+
+def extract_skills_field(text):
+    """Known skills named in the posting, as a comma-separated string."""
+    found = extract_skills(text)
+    if len(found) < LOCAL_EXTRACT_MIN_SKILLS:
+        return None
+    return ', '.join(display_skill(name) for name in found)
+
+
+def extract_fields(job_text):
+    """
+    Fields the rules can fill with confidence.
+
+    Args:
+        job_text (str): Posting text (raw or cleaned by posting_cleaner)
+
+    Returns:
+        dict: Any of title, company, location, pay, description and skills,
+        in job_parser's formats; fields the rules are unsure of are absent
+    """
+    lines = _lines(job_text)
+    if not lines:
+        return {}
+    title, company = extract_title_and_company(lines)
+    fields = {
+        'title': title,
+        'company': company,
+        'location': extract_location(lines),
+        'pay': extract_pay(lines),
+        'description': extract_description(lines),
+        'skills': extract_skills_field('\n'.join(lines)),
+    }
+    return {field: value for field, value in fields.items() if value}
@@ -0,0 +1,168 @@
+"""
+Gemini Models Module
+Lazy, thread-safe resolution of the Gemini model to use. The result of
+genai.list_models() is cached on disk with a TTL and shared by every
+module and worker, so importing the app never waits on the network.
+"""
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_PATH = os.getenv(
+    'GEMINI_MODEL_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gemini_models.json')
+)
+
+# Seconds before list_models() is called again
+MODEL_CACHE_TTL = int(os.getenv('GEMINI_MODEL_CACHE_TTL', str(24 * 60 * 60)))
+
+# Seconds to wait for list_models() before using a fallback
+MODEL_DISCOVERY_TIMEOUT = float(os.getenv('GEMINI_MODEL_DISCOVERY_TIMEOUT', '10'))
+
+_cache_lock = threading.Lock()
+
+
+def _read_cache():
+    """Return the on-disk model cache, or None if it is missing or unreadable."""
+    try:
+        with open(MODEL_CACHE_PATH, encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached if cached.get('model_name') else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _write_cache(model_name):
+    """Atomically replace the on-disk model cache."""
+    directory = os.path.dirname(MODEL_CACHE_PATH)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.gemini_models.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'model_name': model_name, 'resolved_at': time.time()}, f)
+        os.replace(tmp_path, MODEL_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"Could not write Gemini model cache {MODEL_CACHE_PATH}: {str(e)}")
+
+
+def _list_generative_model_names():
+    """
+    Names of models supporting generateContent, waiting at most MODEL_DISCOVERY_TIMEOUT.
+
+    list_models() takes no timeout in the pinned SDK, so it runs on a
+    throwaway thread that is left behind if Gemini does not answer in time.
+    """
+    result = {}
+
+    def discover():
+        try:
+            result['names'] = [m.name for m in genai.list_models()
+                               if 'generateContent' in m.supported_generation_methods]
+        except Exception as e:
+            result['error'] = e
+
+    # Daemon thread, so a hung call cannot hold up worker shutdown
+    thread = threading.Thread(target=discover, name='gemini-list-models', daemon=True)
+    thread.start()
+    thread.join(MODEL_DISCOVERY_TIMEOUT)
+    if thread.is_alive():
+        raise TimeoutError(f"list_models() did not answer within {MODEL_DISCOVERY_TIMEOUT:g}s")
+    if 'error' in result:
+        raise result['error']
+    return result['names']
+
+
+def resolve_model_name(fallback):
+    """
+    Pick the Gemini model name, from the disk cache when it is fresh.
+
+    Args:
+        fallback: Model name to use if discovery fails and nothing is cached
+
+    Returns:
+        tuple: (model name, source) where source is 'cache', 'list_models',
+        'stale_cache' or 'fallback'
+    """
+    with _cache_lock:
+        cached = _read_cache()
+        if cached and time.time() - cached.get('resolved_at', 0) < MODEL_CACHE_TTL:
+            return cached['model_name'], 'cache'
+
+        try:
+            model_names = _list_generative_model_names()
+            if model_names:
+                model_name = model_names[0]
+                _write_cache(model_name)
+                return model_name, 'list_models'
+            logger.error("No generative models found with generateContent support")
+        except Exception as e:
+            logger.error(f"Error listing Gemini models: {str(e)}")
+
+        if cached:
+            return cached['model_name'], 'stale_cache'
+        return fallback, 'fallback'
+
+
+class LazyModel:
+    """
+    A GenerativeModel created on first use.
+
+    get() resolves the model once per process under a lock; warm_up() does
+    the same on a background thread so the first request does not pay for it.
+    """
+
+    def __init__(self, label, api_key, fallback):
+        self.label = label
+        self.api_key = api_key
+        self.fallback = fallback
+        self.model_name = None
+        self.source = None
+        self.resolve_seconds = None
+        self._model = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the GenerativeModel, resolving it on first call.
+
+        Returns:
+            GenerativeModel, or None if no API key is configured or creation failed
+        """
+        if self._resolved:
+            return self._model
+        with self._lock:
+            if self._resolved:
+                return self._model
+            if self.api_key:
+                started = time.monotonic()
+                self.model_name, self.source = resolve_model_name(self.fallback)
+                try:
+                    self._model = genai.GenerativeModel(self.model_name)
+                    logger.info(f"{self.label} using Gemini model: {self.model_name} (from {self.source})")
+                except Exception as e:
+                    logger.error(f"{self.label}: failed to initialize Gemini model {self.model_name}: {str(e)}")
+                self.resolve_seconds = round(time.monotonic() - started, 3)
+            self._resolved = True
+            return self._model
+
+    def warm_up(self):
+        """Resolve the model on a background thread."""
+        if self._resolved or not self.api_key:
+            return
+        threading.Thread(target=self.get, name=f'{self.label}-warm-up', daemon=True).start()
+
+    def stats(self):
+        return {
+            'ready': self._resolved and self._model is not None,
+            'model': self.model_name,
+            'source': self.source,
+            'resolve_seconds': self.resolve_seconds,
+        }
@@ -1,53 +1,113 @@
 import google.generativeai as genai
 import os
+import re
 import json
+import hashlib
 import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+import db
+import gemini_models
+import llm_client
+import prompt_builder
+import query_parser
+from cache import TieredCache, MISSING
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Initialize Gemini
+# Parsed-query cache: repeated questions skip the Gemini round trip entirely.
+# With persistence on, entries live in SQLite and are shared by all workers.
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', '1024'))
+QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', str(24 * 60 * 60)))
+QUERY_CACHE_PERSIST = os.getenv('QUERY_CACHE_PERSIST', '1') == '1'
+
+query_cache = TieredCache('query_parse', maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL,
+                          persist=QUERY_CACHE_PERSIST)
+
+# Analysis cache: keyed by query, filters and a fingerprint of the matched jobs,
+# so any change to the matched set (new, edited or removed job) is a miss.
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '512'))
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', str(60 * 60)))
+ANALYSIS_CACHE_PERSIST = os.getenv('ANALYSIS_CACHE_PERSIST', '1') == '1'
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv('ANALYSIS_CACHE_MAX_ROWS', '5000'))
+
+analysis_cache = TieredCache('analysis', maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL,
+                             persist=ANALYSIS_CACHE_PERSIST, persist_maxsize=ANALYSIS_CACHE_MAX_ROWS)
+
+# Map-reduce analysis: above MAP_REDUCE_THRESHOLD matched jobs, the jobs are
+# summarized in token-budgeted chunks in parallel and the notes merged by one
+# final call, instead of sampling rows into a single prompt.
+MAP_REDUCE_THRESHOLD = int(os.getenv('MAP_REDUCE_THRESHOLD', '200'))
+MAP_REDUCE_MAX_JOBS = int(os.getenv('MAP_REDUCE_MAX_JOBS', '2000'))
+MAP_REDUCE_PARALLELISM = int(os.getenv('MAP_REDUCE_PARALLELISM', '4'))
+
+# Initialize Gemini. The model itself is resolved lazily (see gemini_models), so
+# importing this module never waits on the network.
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-model = None
 
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
-    
-    try:
-        # List available models and pick the best one
-        available_models = genai.list_models()
-        generative_models = [m for m in available_models if 'generateContent' in m.supported_generation_methods]
-        
-        if generative_models:
-            # Try to use the latest/best model
-            model_name = generative_models[0].name
-            logger.info(f"Using Gemini model: {model_name}")
-            model = genai.GenerativeModel(model_name)
-        else:
-            logger.error("No generative models found with generateContent support")
-    except Exception as e:
-        logger.error(f"Error listing or initializing Gemini models: {str(e)}")
-        logger.info("Attempting to use gemini-2.0-flash as fallback...")
-        try:
-            model = genai.GenerativeModel('gemini-2.0-flash')
-        except:
-            logger.error("Failed to initialize any Gemini model")
 else:
     logger.warning("GEMINI_API_KEY not found in environment variables")
 
+gemini_model = gemini_models.LazyModel('gemini_service', GEMINI_API_KEY, fallback='gemini-2.0-flash')
+
+
+def get_model():
+    """Return the Gemini model for query parsing and analysis, or None if unavailable."""
+    return gemini_model.get()
+
+
+def normalize_query(user_query: str) -> str:
+    """
+    Fold a query into a canonical form for cache keys.
+    
+    Case, whitespace and punctuation are folded, but characters that carry
+    meaning in job searches are kept ("C++", "C#", "$120k", "node.js").
+    
+    Args:
+        user_query: Natural language query from user
+        
+    Returns:
+        Normalized query string
+    """
+    text = (user_query or '').lower()
+    text = re.sub(r"[^\w\s$+#.]", ' ', text)
+    # Keep dots inside tokens (node.js, 1.5) but drop sentence punctuation
+    text = re.sub(r'\.(?!\w)|(?<!\w)\.', ' ', text)
+    return ' '.join(text.split())
+
 
 def parse_query(user_query: str) -> dict:
     """
     Parse natural language query to extract filters and intent.
     
+    Results are cached by normalized query, so repeated questions are
+    answered without calling Gemini. Queries the local rule-based parser
+    understands with high confidence skip Gemini entirely.
+    
     Args:
         user_query: Natural language query from user
         
     Returns:
         Dictionary with extracted filters and analysis intent
     """
+    cache_key = normalize_query(user_query)
+    cached = query_cache.get(cache_key)
+    if cached is not MISSING:
+        logger.info(f"Query parse cache hit: '{cache_key}'")
+        return dict(cached)
+    
+    # Simple, structured queries are parsed by rules without a Gemini call
+    local_filters = query_parser.try_parse(user_query)
+    if local_filters is not None:
+        return local_filters
+    
+    model = get_model()
     if not model:
         logger.error("Gemini model not initialized")
         return {"error": "Gemini API not configured"}
@@ -67,7 +127,7 @@ Return a JSON object with:
 
 Return ONLY valid JSON, no markdown formatting, no code blocks, no extra text."""
 
-        response = model.generate_content(prompt)
+        response = llm_client.generate_content(model, prompt, label='parse_query')
         response_text = response.text.strip()
         
         # Remove markdown code block formatting if present
@@ -85,29 +145,182 @@ Return ONLY valid JSON, no markdown formatting, no code blocks, no extra text.""
         try:
             result = json.loads(response_text)
             logger.info(f"Query parsed successfully: {result}")
+            if isinstance(result, dict) and 'error' not in result:
+                query_cache.set(cache_key, result)
             return result
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Gemini response as JSON: {response_text}")
             logger.error(f"JSON parse error: {str(e)}")
             return {"error": "Failed to parse query"}
+    
+    except llm_client.LLMUnavailableError as e:
+        # Degraded mode: use the local parse even though it is not confident
+        logger.warning(f"{str(e)}; using the local parse for: '{user_query}'")
+        filters, _ = query_parser.parse_locally(user_query)
+        return filters
             
     except Exception as e:
         logger.error(f"Error parsing query with Gemini: {str(e)}", exc_info=True)
         return {"error": str(e)}
 
 
-def analyze_jobs(jobs: list, user_query: str, parsed_filters: dict) -> str:
+def job_set_fingerprint(jobs: list) -> str:
+    """
+    Hash the identity and version of a set of jobs.
+    
+    Args:
+        jobs: Job dictionaries (only id and updated_at are used)
+        
+    Returns:
+        Hex digest that changes whenever a job is added, removed or updated
+    """
+    digest = hashlib.sha256()
+    for job in sorted(jobs, key=lambda j: j.get('id') or 0):
+        digest.update(f"{job.get('id')}:{job.get('updated_at')};".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def analysis_cache_key(user_query: str, parsed_filters: dict, jobs: list, total_count: int = None) -> str:
+    """
+    Build the analysis cache key for a question asked of a specific job set.
+    
+    Args:
+        user_query: Original user query
+        parsed_filters: Parsed filters from parse_query()
+        jobs: Job dictionaries the analysis is based on
+        total_count: Total number of matches when jobs is a capped subset;
+            the prompt states it, so it is part of the key
+        
+    Returns:
+        Hex digest of (normalized query, filters, job-set fingerprint, match count)
+    """
+    match_count = total_count if total_count is not None else len(jobs)
+    material = json.dumps(
+        [normalize_query(user_query), parsed_filters or {}, job_set_fingerprint(jobs), match_count],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def analysis_row_limit(job_count: int) -> int:
+    """
+    Number of matched jobs to load for an analysis.
+    
+    Args:
+        job_count: Total number of jobs matching the query
+        
+    Returns:
+        MAP_REDUCE_MAX_JOBS when the match set is large enough for map-reduce,
+        otherwise db.ANALYZE_ROW_LIMIT
+    """
+    return MAP_REDUCE_MAX_JOBS if job_count > MAP_REDUCE_THRESHOLD else db.ANALYZE_ROW_LIMIT
+
+
+def _map_phase(model, jobs: list, user_query: str, parsed_filters: dict) -> list:
+    """
+    Summarize chunks of jobs concurrently (the map phase of map-reduce analysis).
+    
+    Args:
+        model: Gemini model
+        jobs: Job dictionaries matching the query
+        user_query: Original user query
+        parsed_filters: Parsed filters from parse_query()
+        
+    Returns:
+        List of notes, one per chunk that was summarized successfully
+    """
+    prompts = prompt_builder.build_map_prompts(jobs, user_query, parsed_filters)
+    # Never run more map calls at once than the LLM client allows in flight
+    parallelism = max(1, min(MAP_REDUCE_PARALLELISM, llm_client.LLM_MAX_CONCURRENCY, len(prompts)))
+    
+    def summarize(prompt):
+        # Map calls queue for a slot for as long as their deadline allows
+        response = llm_client.generate_content(model, prompt, label='analyze_jobs_map',
+                                               queue_timeout=llm_client.LLM_TIMEOUT)
+        return _strip_code_fence(response.text)
+    
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='analysis-map') as pool:
+        futures = [pool.submit(summarize, prompt) for prompt in prompts]
+    
+    partials, errors = [], []
+    for future in futures:
+        try:
+            partials.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        logger.warning(f"{len(errors)} of {len(prompts)} map calls failed: {errors[0]}")
+    if not partials:
+        raise errors[0]
+    logger.info(f"Map phase: {len(partials)}/{len(prompts)} chunks summarized, parallelism {parallelism}")
+    return partials
+
+
+def _analysis_prompt(model, jobs: list, user_query: str, parsed_filters: dict, total_count: int = None) -> str:
+    """
+    Build the prompt for the final analysis call.
+    
+    Large match sets go through the map phase first, and the returned prompt
+    is the reduce prompt over its notes.
+    """
+    if len(jobs) > MAP_REDUCE_THRESHOLD:
+        partials = _map_phase(model, jobs, user_query, parsed_filters)
+        return prompt_builder.build_reduce_prompt(jobs, user_query, partials, total_count)
+    prompt, _ = prompt_builder.build_analysis_prompt(jobs, user_query, parsed_filters, total_count)
+    return prompt
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove markdown code block formatting from a model response, if present."""
+    text = text.strip()
+    if text.startswith('```'):
+        # Find the closing ```
+        lines = text.split('\n')
+        if len(lines) > 1:
+            text = '\n'.join(lines[1:-1]) if lines[-1].strip() == '```' else '\n'.join(lines[1:])
+    return text.strip()
+
+
+def degraded_analysis(jobs: list, total_count: int = None) -> str:
+    """
+    Summary shown in place of a Gemini analysis while Gemini is unavailable.
+    
+    Args:
+        jobs: List of job dictionaries matching the query
+        total_count: Total number of matches when jobs is a capped subset
+        
+    Returns:
+        Plain-text counts, salary figures and top skills for the matches
+    """
+    return ("AI analysis is temporarily unavailable. Summary of the matching jobs:\n"
+            + prompt_builder.compute_aggregates(jobs, total_count))
+
+
+def analyze_jobs(jobs: list, user_query: str, parsed_filters: dict, total_count: int = None) -> str:
     """
     Use Gemini to analyze job data and provide insights.
     
+    Successful analyses are memoized by query, filters, the exact set of
+    matched jobs and the match count, so asking the same question of unchanged data is served
+    from the cache.
+    
     Args:
         jobs: List of job dictionaries matching the query
         user_query: Original user query
         parsed_filters: Parsed filters from parse_query()
+        total_count: Total number of matches when jobs is a capped subset
         
     Returns:
         Analysis result string
     """
+    if jobs:
+        cache_key = analysis_cache_key(user_query, parsed_filters, jobs, total_count)
+        cached = analysis_cache.get(cache_key)
+        if cached is not MISSING:
+            logger.info(f"Analysis cache hit for query: '{user_query}'")
+            return cached
+    
+    model = get_model()
     if not model:
         logger.error("Gemini model not initialized")
         return "Gemini API not configured"
@@ -119,73 +332,74 @@ def analyze_jobs(jobs: list, user_query: str, parsed_filters: dict) -> str:
         return f"No jobs found matching your criteria: {criteria if criteria else 'your search'}"
     
     try:
-        jobs_summary = json.dumps(jobs, indent=2)
-        
-        prompt = f"""Analyze these job postings and answer the user's specific question.
-
-User Question: "{user_query}"
-
-Job Postings Data:
-{jobs_summary}
-
-Provide a BRIEF summary (2-3 sentences max) that directly answers their question. Focus on:
-- Key findings
-- Patterns observed
-- Essential insights
-
-Be concise and get straight to the point. No lengthy explanations."""
-
-        response = model.generate_content(prompt)
-        summary = response.text.strip()
-        
-        # Remove markdown code block formatting if present
-        if summary.startswith('```'):
-            # Find the closing ```
-            lines = summary.split('\n')
-            if len(lines) > 1:
-                summary = '\n'.join(lines[1:-1]) if lines[-1].strip() == '```' else '\n'.join(lines[1:])
-        
-        summary = summary.strip()
+        prompt = _analysis_prompt(model, jobs, user_query, parsed_filters, total_count)
+        response = llm_client.generate_content(model, prompt, label='analyze_jobs')
+        summary = _strip_code_fence(response.text)
         logger.info(f"Job analysis summary completed for query: '{user_query}'")
+        if summary:
+            analysis_cache.set(cache_key, summary)
         return summary
+    
+    except llm_client.LLMUnavailableError as e:
+        logger.warning(f"{str(e)}; returning a degraded analysis for: '{user_query}'")
+        return degraded_analysis(jobs, total_count)
         
     except Exception as e:
         logger.error(f"Error analyzing jobs with Gemini: {str(e)}", exc_info=True)
         return f"Error analyzing data: {str(e)}"
 
 
-def filter_jobs(jobs: list, filters: dict) -> list:
+
+def analyze_jobs_stream(jobs: list, user_query: str, parsed_filters: dict, total_count: int = None):
     """
-    Filter jobs based on parsed filters.
+    Stream a Gemini analysis of job data as it is generated.
+    
+    Uses the same prompt and cache as analyze_jobs(); a cached analysis is
+    yielded as a single chunk, and a completed stream is stored in the cache.
     
     Args:
-        jobs: Full list of jobs
-        filters: Parsed filters dict
+        jobs: List of job dictionaries matching the query
+        user_query: Original user query
+        parsed_filters: Parsed filters from parse_query()
+        total_count: Total number of matches when jobs is a capped subset
         
-    Returns:
-        Filtered list of jobs
-    """
-    filtered = jobs
-    
-    # Filter by location (case-insensitive, substring match)
-    if filters.get('location'):
-        location = filters['location'].lower()
-        filtered = [j for j in filtered if location in j['location'].lower()]
-        logger.info(f"Filtered by location '{location}': {len(filtered)} jobs remaining")
-    
-    # Filter by job title (case-insensitive, substring match)
-    if filters.get('job_title'):
-        title = filters['job_title'].lower()
-        filtered = [j for j in filtered if title in j['title'].lower()]
-        logger.info(f"Filtered by title '{title}': {len(filtered)} jobs remaining")
-    
-    # Filter by skills mentioned in description
-    if filters.get('skills') and len(filters['skills']) > 0:
-        skill_keywords = [s.lower() for s in filters['skills']]
-        filtered = [
-            j for j in filtered 
-            if any(skill in j['description'].lower() for skill in skill_keywords)
-        ]
-        logger.info(f"Filtered by skills {skill_keywords}: {len(filtered)} jobs remaining")
-    
-    return filtered
+    Yields:
+        Chunks of analysis text
+    """
+    model = get_model()
+    if not jobs or not model:
+        yield analyze_jobs(jobs, user_query, parsed_filters, total_count)
+        return
+    
+    cache_key = analysis_cache_key(user_query, parsed_filters, jobs, total_count)
+    cached = analysis_cache.get(cache_key)
+    if cached is not MISSING:
+        logger.info(f"Analysis cache hit for query: '{user_query}'")
+        yield cached
+        return
+    
+    parts = []
+    try:
+        prompt = _analysis_prompt(model, jobs, user_query, parsed_filters, total_count)
+        chunks = llm_client.stream_content(model, prompt, label='analyze_jobs_stream')
+        first = next(chunks, None)
+    except llm_client.LLMUnavailableError as e:
+        logger.warning(f"{str(e)}; returning a degraded analysis for: '{user_query}'")
+        yield degraded_analysis(jobs, total_count)
+        return
+    
+    for chunk in itertools.chain([first] if first is not None else [], chunks):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) carry nothing to show
+            continue
+        if text:
+            parts.append(text)
+            yield text
+    
+    summary = _strip_code_fence(''.join(parts))
+    logger.info(f"Streamed job analysis completed for query: '{user_query}'")
+    if summary:
+        analysis_cache.set(cache_key, summary)
+
@@ -0,0 +1,197 @@
+"""
+Job Import Module
+Streams job postings from CSV or NDJSON feeds into the database in batches.
+
+Input is parsed one record at a time and handed to db.save_jobs_bulk(), so
+memory use stays flat regardless of feed size.
+
+Command line:
+    python -m job_import jobs.csv [--format csv|ndjson] [--user-id ID] [--chunk-size N]
+    cat jobs.ndjson | python -m job_import - --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Columns read from each record; anything else is ignored
+JOB_FIELDS = ('title', 'company', 'location', 'pay', 'posting_date', 'description', 'skills')
+REQUIRED_FIELDS = ('title', 'company', 'location', 'description')
+
+FORMATS = ('csv', 'ndjson')
+
+# Content types and file extensions that identify each format
+CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/json-lines': 'ndjson',
+}
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+def detect_format(filename=None, content_type=None):
+    """
+    Work out the feed format from a file name or content type.
+    
+    Args:
+        filename (str): Uploaded or local file name
+        content_type (str): MIME type of the upload
+        
+    Returns:
+        str: 'csv' or 'ndjson', or None if it cannot be determined
+    """
+    if content_type:
+        fmt = CONTENT_TYPES.get(content_type.split(';')[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        return EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    return None
+
+
+def iter_csv_records(lines):
+    """Yield one dict per CSV row; the header row names the columns."""
+    for record in csv.DictReader(lines):
+        yield record
+
+
+def iter_ndjson_records(lines):
+    """
+    Yield one dict per non-blank NDJSON line.
+    
+    Raises:
+        ValueError: If a line is not a JSON object
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        yield record
+
+
+def clean_record(record):
+    """
+    Normalize one feed record into the fields db.save_jobs_bulk() expects.
+    
+    Args:
+        record (dict): Raw CSV/NDJSON record
+        
+    Returns:
+        dict: Cleaned job, or None if a required field is missing
+    """
+    job = {}
+    for field in JOB_FIELDS:
+        value = record.get(field)
+        if value is None:
+            continue
+        # Feeds often carry pay as a number; the column is free text
+        value = str(value).strip()
+        if value:
+            job[field] = value
+    
+    if any(field not in job for field in REQUIRED_FIELDS):
+        return None
+    return job
+
+
+def import_jobs(lines, fmt, user_id=None, chunk_size=db.BULK_CHUNK_SIZE):
+    """
+    Stream a feed into the database.
+    
+    Args:
+        lines: Text stream or iterable of lines
+        fmt (str): 'csv' or 'ndjson'
+        user_id (str): Owner recorded on the imported jobs
+        chunk_size (int): Rows per transaction
+        
+    Returns:
+        dict: Import statistics (rows_read, imported, skipped, seconds, rows_per_sec)
+        
+    Raises:
+        ValueError: If the format is unknown or the feed is malformed
+    """
+    if fmt == 'csv':
+        records = iter_csv_records(lines)
+    elif fmt == 'ndjson':
+        records = iter_ndjson_records(lines)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+    
+    stats = {'rows_read': 0, 'skipped': 0}
+    
+    def valid_jobs():
+        for record in records:
+            stats['rows_read'] += 1
+            job = clean_record(record)
+            if job is None:
+                stats['skipped'] += 1
+                continue
+            yield job
+    
+    started = time.perf_counter()
+    imported = db.save_jobs_bulk(valid_jobs(), user_id=user_id, chunk_size=chunk_size)
+    seconds = time.perf_counter() - started
+    
+    stats.update({
+        'imported': imported,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(imported / seconds, 1) if seconds > 0 else float(imported),
+    })
+    logger.info(f"Imported {imported} jobs ({stats['skipped']} skipped) in {seconds:.2f}s "
+                f"({stats['rows_per_sec']} rows/sec)")
+    return stats
+
+
+def open_text_stream(binary_stream):
+    """Wrap a binary upload stream for line-by-line text parsing."""
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+def main(argv=None):
+    """Command-line entry point: ``python -m job_import <file>``."""
+    parser = argparse.ArgumentParser(prog='python -m job_import', description='Bulk import job postings')
+    parser.add_argument('path', help="CSV or NDJSON file, or '-' for stdin")
+    parser.add_argument('--format', choices=FORMATS, help='feed format (default: from file extension)')
+    parser.add_argument('--user-id', help='owner recorded on the imported jobs')
+    parser.add_argument('--chunk-size', type=int, default=db.BULK_CHUNK_SIZE, help='rows per transaction')
+    args = parser.parse_args(argv)
+    
+    fmt = args.format or detect_format(filename=args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+    
+    db.init_db()
+    if args.path == '-':
+        stats = import_jobs(open_text_stream(sys.stdin.buffer), fmt, args.user_id, args.chunk_size)
+    else:
+        with open(args.path, encoding='utf-8-sig', newline='') as f:
+            stats = import_jobs(f, fmt, args.user_id, args.chunk_size)
+    
+    print(f"[IMPORT] Read {stats['rows_read']} rows, imported {stats['imported']}, "
+          f"skipped {stats['skipped']} in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,73 +4,269 @@ Uses Gemini AI to extract structured job information from job posting text.
 """
 import google.generativeai as genai
 import os
+import re
 import json
+import html
+import time
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+import field_extractor
+import gemini_models
+import llm_client
+import posting_cleaner
+from skills import canonicalize_skill
+from cache import TieredCache, MISSING
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 # Configure Gemini API - Job Parser uses dedicated API key
 GEMINI_JOB_PARSER_API_KEY = os.getenv('GEMINI_JOB_PARSER_API_KEY')
-if not GEMINI_JOB_PARSER_API_KEY:
-    raise ValueError("GEMINI_JOB_PARSER_API_KEY is not set in environment variables")
-
-genai.configure(api_key=GEMINI_JOB_PARSER_API_KEY)
-
-# Initialize model - dynamically select free-tier supported model
-job_parser_model = None
-try:
-    available_models = genai.list_models()
-    generative_models = [m for m in available_models if 'generateContent' in m.supported_generation_methods]
-    
-    if generative_models:
-        model_name = generative_models[0].name
-        logger.info(f"Job Parser using Gemini model: {model_name}")
-        job_parser_model = genai.GenerativeModel(model_name)
-    else:
-        logger.error("No generative models found with generateContent support")
-except Exception as e:
-    logger.error(f"Error listing or initializing Gemini models: {str(e)}")
-    logger.info("Attempting to use gemini-1.5-flash as fallback...")
-    try:
-        job_parser_model = genai.GenerativeModel('gemini-1.5-flash')
-    except:
-        logger.error("Failed to initialize job parser model")
+if GEMINI_JOB_PARSER_API_KEY:
+    genai.configure(api_key=GEMINI_JOB_PARSER_API_KEY)
+else:
+    logger.error("GEMINI_JOB_PARSER_API_KEY is not set in environment variables; job parsing is disabled")
 
-# System prompt for job parsing
-SYSTEM_PROMPT = """You are an expert job posting analyzer. Your task is to extract and normalize structured information from job posting text.
+# Model is resolved on first use (or by a background warm-up), not at import
+job_parser_model = gemini_models.LazyModel('job_parser', GEMINI_JOB_PARSER_API_KEY, fallback='gemini-1.5-flash')
 
-Extract the following fields from the job posting:
-1. title - The job title/position name
-2. company - The company name
-3. location - Format location using these rules:
+# Parse cache: keyed by a hash of the normalized posting text and the prompt
+# version, so re-pasted or syndicated postings skip Gemini. With persistence
+# on, entries live in SQLite and are shared by all workers.
+JOB_PARSE_CACHE_SIZE = int(os.getenv('JOB_PARSE_CACHE_SIZE', '512'))
+JOB_PARSE_CACHE_TTL = int(os.getenv('JOB_PARSE_CACHE_TTL', str(30 * 24 * 60 * 60)))
+JOB_PARSE_CACHE_PERSIST = os.getenv('JOB_PARSE_CACHE_PERSIST', '1') == '1'
+JOB_PARSE_CACHE_MAX_ROWS = int(os.getenv('JOB_PARSE_CACHE_MAX_ROWS', '10000'))
+
+parse_cache = TieredCache('job_parse', maxsize=JOB_PARSE_CACHE_SIZE, ttl=JOB_PARSE_CACHE_TTL,
+                          persist=JOB_PARSE_CACHE_PERSIST, persist_maxsize=JOB_PARSE_CACHE_MAX_ROWS)
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Batch parsing: postings packed into one prompt, and the character budget of a packed prompt
+BATCH_POSTINGS_PER_PROMPT = int(os.getenv('BATCH_POSTINGS_PER_PROMPT', '4'))
+BATCH_PROMPT_MAX_CHARS = int(os.getenv('BATCH_PROMPT_MAX_CHARS', '24000'))
+
+# Packed prompts in flight at once for one batch (further capped by LLM_MAX_CONCURRENCY)
+BATCH_PARSE_PARALLELISM = int(os.getenv('BATCH_PARSE_PARALLELISM', '4'))
+
+# Most postings accepted in one batch
+BATCH_MAX_POSTINGS = int(os.getenv('BATCH_MAX_POSTINGS', '200'))
+
+# Throughput counters for the single-posting and batch paths, prompt size saved by
+# cleanup, and Gemini calls avoided or shrunk by local field extraction
+_stats_lock = threading.Lock()
+_stats = {
+    'single': {'postings': 0, 'seconds': 0.0},
+    'batch': {'postings': 0, 'seconds': 0.0, 'prompts': 0, 'fallbacks': 0},
+    'cleanup': {'postings': 0, 'chars_in': 0, 'chars_out': 0, 'truncated': 0},
+    'local': {'skipped_llm': 0, 'partial_prompts': 0, 'full_prompts': 0, 'fields_filled': 0},
+}
+
+# Fields of a parsed job, with the prompt instruction and example value for each
+FIELDS = ('title', 'company', 'location', 'pay', 'description', 'skills')
+
+FIELD_INSTRUCTIONS = {
+    'title': "title - The job title/position name",
+    'company': "company - The company name",
+    'location': """location - Format location using these rules:
    - If fully remote: return exactly "Remote"
    - If hybrid with location: return "City, St - Hybrid" (e.g., "San Francisco, CA - Hybrid")
-   - If on-site: return "City, St" (e.g., "San Francisco, CA")
-4. pay - Return a single number as the LOWER end of the salary range (as a number, not string). 
-   Examples: if "$100,000-$150,000" return 100000, if "$60k-$80k" return 60000, if "Competitive" return null
-5. description - A concise 2-3 sentence summary of the role and key responsibilities
-6. skills - A comma-separated list of the most important technical skills and keywords required (e.g., "Python, AWS, Docker, Kubernetes")
+   - If on-site: return "City, St" (e.g., "San Francisco, CA")""",
+    'pay': """pay - Return a single number as the LOWER end of the salary range (as a number, not string). 
+   Examples: if "$100,000-$150,000" return 100000, if "$60k-$80k" return 60000, if "Competitive" return null""",
+    'description': "description - A concise 2-3 sentence summary of the role and key responsibilities",
+    'skills': ("skills - A comma-separated list of the most important technical skills and keywords required "
+               "(e.g., \"Python, AWS, Docker, Kubernetes\")"),
+}
+
+FIELD_EXAMPLES = {
+    'title': '"Senior Software Engineer"',
+    'company': '"Tech Company Inc."',
+    'location': '"San Francisco, CA - Hybrid"',
+    'pay': '150000',
+    'description': '"Lead the development of cloud infrastructure. Build scalable systems using Python and AWS."',
+    'skills': '"Python, AWS, Docker, Kubernetes, Cloud Architecture"',
+}
+
+# Fields validate_job_data() requires
+REQUIRED_FIELDS = ('title', 'company', 'location', 'description')
+
+
+def build_system_prompt(fields=FIELDS):
+    """Parsing instructions asking for ``fields`` only (all six by default)."""
+    instructions = '\n'.join(f"{n}. {FIELD_INSTRUCTIONS[field]}" for n, field in enumerate(fields, 1))
+    example = ',\n'.join(f'    "{field}": {FIELD_EXAMPLES[field]}' for field in fields)
+    return f"""You are an expert job posting analyzer. Your task is to extract and normalize structured information from job posting text.
+
+Extract the following fields from the job posting:
+{instructions}
 
 Return ONLY a valid JSON object with these exact keys. If a field is not found, use null.
 Example response format:
-{
-    "title": "Senior Software Engineer",
-    "company": "Tech Company Inc.",
-    "location": "San Francisco, CA - Hybrid",
-    "pay": 150000,
-    "description": "Lead the development of cloud infrastructure. Build scalable systems using Python and AWS.",
-    "skills": "Python, AWS, Docker, Kubernetes, Cloud Architecture"
-}"""
+{{
+{example}
+}}"""
+
+
+# System prompt for job parsing
+SYSTEM_PROMPT = build_system_prompt()
+
+# Added to a prompt that asks for some fields only
+KNOWN_FIELDS_NOTE = "\n\nAlready extracted from this posting (for context; do not return these): {known}"
+
+
+# Changes whenever SYSTEM_PROMPT is edited, so cached parses from an older prompt are not reused
+SYSTEM_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode('utf-8')).hexdigest()[:12]
+
+# Appended to SYSTEM_PROMPT when several postings share one prompt
+BATCH_PROMPT_SUFFIX = """
+
+You will receive {count} job postings, each starting with a line "### Posting <n>".
+Return ONLY a valid JSON array with exactly {count} objects, one per posting in the
+same order, each with the keys above plus "posting" set to the posting's number."""
+
+
+def _count(path, **amounts):
+    with _stats_lock:
+        for key, amount in amounts.items():
+            _stats[path][key] += amount
+
+
+def normalize_posting(job_text):
+    """Posting text with HTML tags and entities removed and whitespace collapsed."""
+    return ' '.join(html.unescape(HTML_TAG_RE.sub(' ', job_text or '')).split())
+
+
+def parse_cache_key(job_text):
+    """Cache key of a posting: sha256 of the prompt version and the normalized text."""
+    return hashlib.sha256(f"{SYSTEM_PROMPT_VERSION}\n{normalize_posting(job_text)}".encode('utf-8')).hexdigest()
+
+
+def _cached_parse(cache_key):
+    """Return a copy of a cached parse, or None."""
+    cached = parse_cache.get(cache_key)
+    return None if cached is MISSING else dict(cached)
+
+
+def cached_parse(job_text):
+    """Return the cached parse of a posting without calling Gemini, or None."""
+    return _cached_parse(parse_cache_key(job_text))
+
+
+def _cache_parse(cache_key, job_data):
+    """Cache a parse if it passes validate_job_data(), so a rejected parse is retried next time."""
+    if isinstance(job_data, dict) and 'error' not in job_data and validate_job_data(job_data):
+        parse_cache.set(cache_key, job_data)
+
+
+def _prepare_posting(job_text):
+    """Clean a posting for the prompt (see posting_cleaner) and log the size reduction."""
+    if not posting_cleaner.POSTING_CLEANUP_ENABLED:
+        return job_text
+    started = time.perf_counter()
+    report = posting_cleaner.clean_posting(job_text)
+    if not report['text']:
+        return job_text
+    saved = 1 - report['chars_out'] / report['chars_in'] if report['chars_in'] else 0.0
+    message = (f"Cleaned posting: {report['chars_in']} -> {report['chars_out']} chars "
+               f"(~{report['tokens_in']} -> ~{report['tokens_out']} tokens, -{saved:.0%}) "
+               f"in {(time.perf_counter() - started) * 1000:.1f}ms")
+    if report['dropped_sections']:
+        message += f"; dropped {', '.join(report['dropped_sections'])}"
+    if report['truncated']:
+        message += f"; truncated to {posting_cleaner.POSTING_TOKEN_BUDGET} tokens"
+    print(f"[JOB_PARSER] {message}")
+    logger.info(message)
+    _count('cleanup', postings=1, chars_in=report['chars_in'], chars_out=report['chars_out'],
+           truncated=int(report['truncated']))
+    return report['text']
+
+
+def extract_locally(prompt_text):
+    """
+    Fields field_extractor finds in a cleaned posting.
+    
+    With LOCAL_EXTRACT_SKIP_LLM set, Gemini can be skipped when the rules
+    fill every required field and the skills, and either read the pay or
+    the posting states no pay figure at all; a figure the rules could not
+    read is left to Gemini. It is off by default because the local skills
+    list misses every skill skills.py does not know.
+    
+    Returns:
+        tuple: (fields dict, True if Gemini can be skipped)
+    """
+    if not field_extractor.LOCAL_EXTRACT_ENABLED:
+        return {}, False
+    local = field_extractor.extract_fields(prompt_text)
+    complete = (field_extractor.LOCAL_EXTRACT_SKIP_LLM
+                and all(local.get(field) for field in REQUIRED_FIELDS + ('skills',))
+                and ('pay' in local or not field_extractor.states_pay(prompt_text)))
+    return local, complete
+
+
+def fields_prompt(local):
+    """
+    System prompt asking Gemini only for the fields not found locally.
+    
+    Skills are always asked for: the rules only know common skill names,
+    so Gemini's list is merged with theirs.
+    """
+    missing = tuple(field for field in FIELDS if field not in local or field == 'skills')
+    if len(missing) == len(FIELDS):
+        return SYSTEM_PROMPT
+    known = {field: value for field, value in local.items() if field not in missing}
+    return build_system_prompt(missing) + KNOWN_FIELDS_NOTE.format(known=json.dumps(known))
+
+
+def _merge_local(local, job_data):
+    """Gemini's fields with the locally extracted ones filled in, and both skill lists combined."""
+    merged = {field: job_data.get(field) for field in FIELDS}
+    for field, value in local.items():
+        if field != 'skills':
+            merged[field] = value
+    skills = [s.strip() for s in f"{job_data.get('skills') or ''},{local.get('skills') or ''}".split(',')]
+    unique = {}
+    for skill in skills:
+        name = canonicalize_skill(skill)
+        if name and name not in unique:
+            unique[name] = skill
+    merged['skills'] = ', '.join(unique.values()) or None
+    return merged
+
 
+def _parse_response_json(response_text):
+    """Strip a markdown code fence from a Gemini response and decode its JSON."""
+    response_text = response_text.strip()
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]  # Remove ```json
+    if response_text.startswith('```'):
+        response_text = response_text[3:]  # Remove ```
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]  # Remove trailing ```
+    return json.loads(response_text.strip())
 
-def parse_job_posting(job_text):
+
+def parse_job_posting(job_text, queue_timeout=None, prompt_text=None):
     """
     Parse job posting text using Gemini AI.
     
+    Gemini parses that pass validate_job_data() are cached by
+    parse_cache_key(), so the same posting pasted again is answered without
+    calling Gemini. Postings field_extractor parses on its own are not
+    cached: re-running the rules costs about a millisecond, and a rule
+    change then takes effect at once.
+    
     Args:
         job_text (str): The raw job posting text
+        queue_timeout (float): Seconds to wait for a Gemini call slot
+            (defaults to llm_client.LLM_QUEUE_TIMEOUT)
+        prompt_text (str): The posting already cleaned by _prepare_posting(),
+            so a batch does not clean it twice
         
     Returns:
         dict: Extracted job information or error dict
@@ -78,31 +274,52 @@ def parse_job_posting(job_text):
     try:
         print(f"\n[JOB_PARSER] Parsing job posting ({len(job_text)} characters)...")
         
+        cache_key = parse_cache_key(job_text)
+        cached = _cached_parse(cache_key)
+        if cached is not None:
+            print(f"[JOB_PARSER] ✓ Parse cache hit: {cached.get('title')}")
+            return cached
+        
+        if prompt_text is None:
+            prompt_text = _prepare_posting(job_text)
+        
+        # Fill what the rules can; skip Gemini if that covers the required fields
+        local, complete = extract_locally(prompt_text)
+        if complete:
+            job_data = {field: local.get(field) for field in FIELDS}
+            _count('local', skipped_llm=1, fields_filled=len(local))
+            print(f"[JOB_PARSER] ✓ Extracted {', '.join(local)} locally, skipped Gemini: {job_data['title']}")
+            return job_data
+        
         # Use the dynamically selected free-tier model
-        if not job_parser_model:
+        model = job_parser_model.get()
+        if not model:
             raise ValueError("Job parser model not initialized")
         
-        # Create the prompt
-        prompt = f"{SYSTEM_PROMPT}\n\nJob Posting:\n{job_text}"
+        # Create the prompt from the cleaned posting, asking only for the missing fields
+        system_prompt = fields_prompt(local)
+        prompt = f"{system_prompt}\n\nJob Posting:\n{prompt_text}"
+        if local:
+            print(f"[JOB_PARSER] Extracted {', '.join(local)} locally; asking Gemini for the rest")
         
         # Generate response
-        response = job_parser_model.generate_content(prompt)
+        started = time.monotonic()
+        response = llm_client.generate_content(model, prompt, label='job_parser', queue_timeout=queue_timeout)
         
         # Parse the JSON response
         response_text = response.text.strip()
         print(f"[JOB_PARSER] Raw response: {response_text[:200]}...")
         
-        # Handle markdown code blocks
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Remove ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Remove ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove trailing ```
-        
-        response_text = response_text.strip()
-        
-        job_data = json.loads(response_text)
+        job_data = _parse_response_json(response_text)
+        _count('single', postings=1, seconds=time.monotonic() - started)
+        if isinstance(job_data, dict):
+            if local:
+                job_data = _merge_local(local, job_data)
+            if system_prompt is SYSTEM_PROMPT:
+                _count('local', full_prompts=1)
+            else:
+                _count('local', partial_prompts=1, fields_filled=len(local))
+            _cache_parse(cache_key, job_data)
         
         print(f"[JOB_PARSER] ✓ Successfully parsed job posting")
         print(f"[JOB_PARSER] Title: {job_data.get('title')}")
@@ -121,6 +338,15 @@ def parse_job_posting(job_text):
             'message': error_msg
         }
         
+    except llm_client.LLMUnavailableError as e:
+        error_msg = f"Job parsing is temporarily unavailable: {str(e)}"
+        print(f"[JOB_PARSER] ❌ {error_msg}")
+        logger.warning(error_msg)
+        return {
+            'error': 'llm_unavailable',
+            'message': 'Job parsing is temporarily unavailable. Please try again shortly.'
+        }
+        
     except Exception as e:
         error_msg = f"Error parsing job posting: {str(e)}"
         print(f"[JOB_PARSER] ❌ {error_msg}")
@@ -131,6 +357,200 @@ def parse_job_posting(job_text):
         }
 
 
+
+def pack_postings(texts, per_prompt=None, max_chars=None):
+    """
+    Group postings into packed prompts, keeping each group within the limits.
+    
+    Args:
+        texts (list): Posting texts
+        per_prompt (int): Most postings in one prompt (defaults to BATCH_POSTINGS_PER_PROMPT)
+        max_chars (int): Character budget of the postings in one prompt
+            (defaults to BATCH_PROMPT_MAX_CHARS)
+        
+    Returns:
+        list: Lists of indices into ``texts``, in order
+    """
+    per_prompt = per_prompt or BATCH_POSTINGS_PER_PROMPT
+    max_chars = max_chars or BATCH_PROMPT_MAX_CHARS
+    groups = []
+    group, size = [], 0
+    for index, text in enumerate(texts):
+        if group and (len(group) >= per_prompt or size + len(text) > max_chars):
+            groups.append(group)
+            group, size = [], 0
+        group.append(index)
+        size += len(text)
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _parse_packed(model, texts):
+    """
+    Parse several postings with one Gemini call.
+    
+    Args:
+        model: Gemini model
+        texts (list): Postings already cleaned by _prepare_posting()
+    
+    Returns:
+        list: One job dict per posting, in order
+    
+    Raises:
+        ValueError: The response is not a JSON array with one object per posting
+    """
+    postings = "\n\n".join(f"### Posting {n}\n{text}" for n, text in enumerate(texts, 1))
+    prompt = f"{SYSTEM_PROMPT}{BATCH_PROMPT_SUFFIX.format(count=len(texts))}\n\n{postings}"
+    response = llm_client.generate_content(model, prompt, label='job_parser_batch',
+                                           queue_timeout=llm_client.LLM_TIMEOUT)
+    jobs = _parse_response_json(response.text)
+    if not isinstance(jobs, list) or len(jobs) != len(texts) or not all(isinstance(j, dict) for j in jobs):
+        raise ValueError(f"Expected a JSON array of {len(texts)} objects")
+    # Trust the posting numbers when they are all present, otherwise the order
+    numbers = [job.pop('posting', None) for job in jobs]
+    if sorted(n for n in numbers if isinstance(n, int)) == list(range(1, len(texts) + 1)):
+        jobs = [job for _, job in sorted(zip(numbers, jobs), key=lambda pair: pair[0])]
+    return jobs
+
+
+def _parse_group(texts, prepared, local_fields, indices):
+    """
+    Parse one group of postings; returns (index, result) pairs.
+    
+    ``prepared`` maps each index to its cleaned text, which goes in the
+    prompt; ``texts`` holds the raw postings the cache is keyed by.
+    ``local_fields`` maps indices to the fields field_extractor found,
+    which override the packed response as they do in parse_job_posting().
+    """
+    def parse_single(i):
+        return parse_job_posting(texts[i], queue_timeout=llm_client.LLM_TIMEOUT, prompt_text=prepared[i])
+    
+    if len(indices) == 1:
+        return [(indices[0], parse_single(indices[0]))]
+    
+    model = job_parser_model.get()
+    if model:
+        try:
+            started = time.monotonic()
+            jobs = _parse_packed(model, [prepared[i] for i in indices])
+            _count('batch', prompts=1)
+            jobs = [_merge_local(local_fields[i], job) if local_fields.get(i) else job
+                    for i, job in zip(indices, jobs)]
+            for i, job in zip(indices, jobs):
+                _cache_parse(parse_cache_key(texts[i]), job)
+            print(f"[JOB_PARSER] ✓ Parsed {len(indices)} postings in one prompt "
+                  f"({time.monotonic() - started:.1f}s)")
+            return list(zip(indices, jobs))
+        except llm_client.LLMUnavailableError:
+            pass  # parse_job_posting() below reports it per posting
+        except Exception as e:
+            # A malformed array is retried one posting at a time
+            logger.warning(f"Packed parse of {len(indices)} postings failed, parsing singly: {str(e)}")
+            _count('batch', fallbacks=1)
+    return [(i, parse_single(i)) for i in indices]
+
+
+def parse_job_postings(texts):
+    """
+    Parse many job postings, yielding each result as soon as it is ready.
+    
+    Postings already in the parse cache are yielded first, then those
+    field_extractor parses on its own (see extract_locally()). The rest are
+    packed several to a prompt (see pack_postings()) and the prompts run on
+    a bounded thread pool. Packed prompts ask for every field, and the
+    fields found locally override Gemini's as in parse_job_posting(). A
+    packed response that is not a valid JSON array is retried one posting
+    at a time.
+    
+    Args:
+        texts (list): Raw job posting texts
+        
+    Yields:
+        tuple: (index into ``texts``, job dict or error dict), in completion order
+    """
+    started = time.monotonic()
+    completed = 0
+    misses = []
+    for index, text in enumerate(texts):
+        cached = _cached_parse(parse_cache_key(text))
+        if cached is None:
+            misses.append(index)
+        else:
+            completed += 1
+            yield index, cached
+    
+    # Each posting is cleaned once; the packed and single-posting paths reuse it
+    cleaned = {i: _prepare_posting(texts[i]) for i in misses}
+    local_fields = {}
+    local_count = 0
+    for index in list(misses):
+        local, complete = extract_locally(cleaned[index])
+        local_fields[index] = local
+        if complete:
+            job_data = {field: local.get(field) for field in FIELDS}
+            _count('local', skipped_llm=1, fields_filled=len(local))
+            misses.remove(index)
+            local_count += 1
+            completed += 1
+            yield index, job_data
+    
+    # Pack by cleaned size, since that is what goes in the prompt. Groups
+    # index into ``misses``; map them back to positions in ``texts``
+    groups = [[misses[i] for i in group] for group in pack_postings([cleaned[i] for i in misses])]
+    parallelism = max(1, min(BATCH_PARSE_PARALLELISM, llm_client.LLM_MAX_CONCURRENCY, len(groups)))
+    print(f"[JOB_PARSER] Parsing {len(texts)} postings ({completed - local_count} cached, {local_count} "
+          f"extracted locally) in {len(groups)} prompts, "
+          f"{parallelism} at a time...")
+    
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='job-parse') as executor:
+        futures = [executor.submit(_parse_group, texts, cleaned, local_fields, group) for group in groups]
+        try:
+            for future in as_completed(futures):
+                for index, result in future.result():
+                    completed += 1
+                    yield index, result
+        finally:
+            # The caller stopped early (e.g. the client went away)
+            for future in futures:
+                future.cancel()
+    
+    elapsed = time.monotonic() - started
+    _count('batch', postings=completed, seconds=elapsed)
+    single = stats()['single']
+    comparison = (f"; single-posting path averages {single['postings_per_sec']} postings/s"
+                  if single['postings'] else '')
+    print(f"[JOB_PARSER] Parsed {completed} postings in {elapsed:.1f}s "
+          f"({completed / elapsed if elapsed else 0:.2f} postings/s{comparison})")
+
+
+def stats():
+    """
+    Return parsing throughput for this worker process.
+    
+    Returns:
+        dict: Postings parsed and postings per second for the single-posting
+        and batch paths, the batch speedup over single postings, the share
+        of posting characters removed by cleanup, and Gemini calls skipped
+        or shrunk by local extraction
+    """
+    with _stats_lock:
+        result = {path: dict(counters) for path, counters in _stats.items()}
+    cleanup = result.pop('cleanup')
+    local = result.pop('local')
+    for counters in result.values():
+        seconds = counters.pop('seconds')
+        counters['postings_per_sec'] = round(counters['postings'] / seconds, 3) if seconds else 0.0
+    single_rate = result['single']['postings_per_sec']
+    result['batch_speedup'] = round(result['batch']['postings_per_sec'] / single_rate, 2) if single_rate else None
+    cleanup['reduction'] = round(1 - cleanup['chars_out'] / cleanup['chars_in'], 4) if cleanup['chars_in'] else 0.0
+    result['cleanup'] = cleanup
+    parses = local['skipped_llm'] + local['partial_prompts'] + local['full_prompts']
+    local['skip_rate'] = round(local['skipped_llm'] / parses, 4) if parses else 0.0
+    result['local_extraction'] = local
+    return result
+
+
 def validate_job_data(job_data):
     """
     Validate the parsed job data.
@@ -141,9 +561,7 @@ def validate_job_data(job_data):
     Returns:
         bool: True if valid, False otherwise
     """
-    required_fields = ['title', 'company', 'location', 'description']
-    
-    for field in required_fields:
+    for field in REQUIRED_FIELDS:
         if not job_data.get(field):
             print(f"[JOB_PARSER] ⚠ Missing required field: {field}")
             return False
@@ -0,0 +1,355 @@
+"""
+LLM Client Module
+Shared guard around Gemini generate_content calls: per-call deadlines,
+jittered retries on transient errors, a process-wide cap on in-flight calls,
+and a circuit breaker that fails fast while Gemini is unhealthy.
+
+The pinned SDK has no per-request timeout, so calls run on a small thread
+pool and the caller stops waiting at its deadline. A call slot stays taken
+until the abandoned request really finishes, which keeps the cap honest.
+"""
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from google.api_core import exceptions as google_exceptions
+
+logger = logging.getLogger(__name__)
+
+# Total seconds a call may take, across all retries
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '20'))
+
+# Retries after the first attempt, for transient errors only
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5'))
+LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '4'))
+
+# In-flight LLM calls per worker process, and how long a call waits for a slot
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '2'))
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '2'))
+
+# Circuit breaker: open when at least this share of the recent calls failed
+CIRCUIT_WINDOW = int(os.getenv('LLM_CIRCUIT_WINDOW', '20'))
+CIRCUIT_MIN_CALLS = int(os.getenv('LLM_CIRCUIT_MIN_CALLS', '5'))
+CIRCUIT_FAILURE_RATE = float(os.getenv('LLM_CIRCUIT_FAILURE_RATE', '0.5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('LLM_CIRCUIT_RESET_SECONDS', '30'))
+
+RETRYABLE_ERRORS = (
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class LLMUnavailableError(Exception):
+    """Raised without calling Gemini: the circuit is open or no call slot is free."""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding window of recent calls.
+
+    Closed: calls pass. Open: calls fail fast until CIRCUIT_RESET_SECONDS
+    have passed. Half-open: a single trial call decides whether to close
+    or re-open the circuit.
+    """
+
+    def __init__(self, window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS,
+                 failure_rate=CIRCUIT_FAILURE_RATE, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_seconds = reset_seconds
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a call may go ahead now."""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record(self, success):
+        """Record the outcome of a call that allow() let through."""
+        with self._lock:
+            if self._opened_at is not None:
+                if not self._trial_in_flight:
+                    # A call that started before the circuit opened
+                    return
+                # Outcome of the half-open trial call
+                self._trial_in_flight = False
+                if success:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                    logger.info("LLM circuit closed")
+                else:
+                    self._opened_at = time.monotonic()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._opened_at = time.monotonic()
+                self._times_opened += 1
+                logger.warning(
+                    f"LLM circuit opened: {failures}/{len(self._outcomes)} recent calls failed; "
+                    f"failing fast for {self.reset_seconds:g}s"
+                )
+
+    def stats(self):
+        with self._lock:
+            total = len(self._outcomes)
+            return {
+                'state': self._state(),
+                'recent_calls': total,
+                'recent_failure_rate': round(self._outcomes.count(False) / total, 4) if total else 0.0,
+                'times_opened': self._times_opened,
+            }
+
+
+circuit_breaker = CircuitBreaker()
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+# One thread per slot: a slot is only freed once its request has finished
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix='llm-call')
+_stats_lock = threading.Lock()
+_stats = {
+    'calls': 0,
+    'successes': 0,
+    'failures': 0,
+    'retries': 0,
+    'timeouts': 0,
+    'rejected_circuit_open': 0,
+    'rejected_no_slot': 0,
+    'in_flight': 0,
+    'abandoned': 0,
+    'total_seconds': 0.0,
+}
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff delay for a retry attempt (1-based)."""
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+def _acquire(label, queue_timeout=None):
+    """Take a call slot and pass the circuit breaker, or raise LLMUnavailableError."""
+    if not _slots.acquire(timeout=queue_timeout if queue_timeout is not None else LLM_QUEUE_TIMEOUT):
+        _count('rejected_no_slot')
+        raise LLMUnavailableError(f"{label}: too many Gemini calls in flight")
+    if not circuit_breaker.allow():
+        _slots.release()
+        _count('rejected_circuit_open')
+        raise LLMUnavailableError(f"{label}: Gemini is temporarily unavailable (circuit open)")
+    _count('in_flight')
+
+
+def _release():
+    _count('in_flight', -1)
+    _slots.release()
+
+
+class _Lease:
+    """
+    A taken call slot. Requests run one at a time on the call executor; if
+    the caller gives up on one, the slot is freed when that request ends.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self._pending = None
+
+    def run(self, fn, timeout):
+        """Run ``fn()`` on the executor and wait at most ``timeout`` seconds for it."""
+        if self._pending is not None:
+            raise google_exceptions.DeadlineExceeded(f"{self.label}: previous request still running")
+        future = _executor.submit(fn)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._pending = future
+            _count('abandoned')
+            raise google_exceptions.DeadlineExceeded(f"{self.label}: no response within {timeout:.1f}s")
+
+    def release(self):
+        if self._pending is not None and not self._pending.done():
+            self._pending.add_done_callback(lambda _: _release())
+        else:
+            _release()
+
+
+def _call_with_retries(call, label, timeout):
+    """
+    Run ``call(remaining_seconds)`` with retries until it succeeds or the deadline passes.
+
+    Args:
+        call: Function taking the seconds left before the deadline
+        label: Caller name for log messages
+        timeout: Overall deadline in seconds
+
+    Returns:
+        Whatever ``call`` returns
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                raise google_exceptions.DeadlineExceeded(f"{label}: deadline of {timeout:.0f}s exceeded")
+            return call(remaining)
+        except RETRYABLE_ERRORS as e:
+            attempt += 1
+            delay = _backoff(attempt)
+            if attempt > LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                if isinstance(e, (google_exceptions.DeadlineExceeded, TimeoutError)):
+                    _count('timeouts')
+                raise
+            _count('retries')
+            logger.warning(f"{label}: transient Gemini error ({e.__class__.__name__}), "
+                           f"retry {attempt}/{LLM_MAX_RETRIES} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def generate_content(model, prompt, label='gemini', timeout=None, queue_timeout=None):
+    """
+    Call ``model.generate_content`` with a deadline, retries and the shared limits.
+
+    Args:
+        model: google.generativeai GenerativeModel
+        prompt: Prompt text
+        label: Caller name for logs
+        timeout: Overall deadline in seconds (defaults to LLM_TIMEOUT)
+        queue_timeout: Seconds to wait for a call slot (defaults to LLM_QUEUE_TIMEOUT)
+
+    Returns:
+        The generate_content response
+
+    Raises:
+        LLMUnavailableError: Circuit open or no call slot free; Gemini was not called
+        Exception: The last Gemini error once retries are exhausted
+    """
+    timeout = timeout or LLM_TIMEOUT
+    _acquire(label, queue_timeout)
+    lease = _Lease(label)
+    _count('calls')
+    started = time.monotonic()
+
+    def call():
+        response = model.generate_content(prompt)
+        # Accessing .text raises if the response was blocked or empty
+        response.text
+        return response
+
+    try:
+        response = _call_with_retries(lambda remaining: lease.run(call, remaining), label, timeout)
+    except Exception:
+        circuit_breaker.record(False)
+        _count('failures')
+        raise
+    else:
+        circuit_breaker.record(True)
+        _count('successes')
+        return response
+    finally:
+        _count('total_seconds', time.monotonic() - started)
+        lease.release()
+
+
+def stream_content(model, prompt, label='gemini', timeout=None):
+    """
+    Stream ``model.generate_content(stream=True)`` chunks under the shared limits.
+
+    Opening the stream is retried like generate_content(); once chunks have
+    been yielded an error is raised to the caller. The call slot is held
+    until the stream is exhausted or closed.
+
+    Args:
+        model: google.generativeai GenerativeModel
+        prompt: Prompt text
+        label: Caller name for logs
+        timeout: Deadline in seconds for the whole stream (defaults to LLM_TIMEOUT)
+
+    Yields:
+        Response chunks
+
+    Raises:
+        LLMUnavailableError: Circuit open or no call slot free; Gemini was not called
+    """
+    timeout = timeout or LLM_TIMEOUT
+    _acquire(label)
+    lease = _Lease(label)
+    _count('calls')
+    started = time.monotonic()
+    deadline = started + timeout
+    failed = False
+    try:
+        def open_stream():
+            chunks = iter(model.generate_content(prompt, stream=True))
+            # The request is only sent when the first chunk is pulled
+            return chunks, next(chunks, None)
+
+        chunks, first = _call_with_retries(lambda remaining: lease.run(open_stream, remaining), label, timeout)
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            chunk = lease.run(lambda: next(chunks, None), max(deadline - time.monotonic(), 0.001))
+    except Exception:
+        failed = True
+        raise
+    finally:
+        # A caller closing the stream early is not a Gemini failure
+        circuit_breaker.record(not failed)
+        _count('failures' if failed else 'successes')
+        _count('total_seconds', time.monotonic() - started)
+        lease.release()
+
+
+def stats():
+    """
+    Return LLM call counters for this worker process.
+
+    Returns:
+        dict: Call, retry, timeout and rejection counts, in-flight calls,
+        mean call latency and the circuit breaker state
+    """
+    with _stats_lock:
+        result = dict(_stats)
+    finished = result['successes'] + result['failures']
+    result['mean_seconds'] = round(result.pop('total_seconds') / finished, 3) if finished else 0.0
+    result['max_concurrency'] = LLM_MAX_CONCURRENCY
+    result['circuit'] = circuit_breaker.stats()
+    return result
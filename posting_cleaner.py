@@ -0,0 +1,317 @@
+"""
+Posting Cleaner Module
+Local cleanup of pasted job postings before they are sent to Gemini.
+
+Pasted postings carry HTML, repeated whitespace, EEO statements, benefits
+lists and job-board chrome, none of which helps extract the job fields but
+all of which costs prompt tokens and latency. clean_posting():
+
+1. strips markup (HTML tags and entities, markdown emphasis),
+2. collapses whitespace,
+3. drops boilerplate sections and sentences matched by a pattern library
+   (BOILERPLATE_SECTION_PATTERNS / BOILERPLATE_SENTENCE_PATTERNS, extended
+   from POSTING_BOILERPLATE_FILE),
+4. truncates to POSTING_TOKEN_BUDGET, giving the budget to the opening
+   lines (title, company, location) and the compensation, location and
+   requirements sections before anything else.
+
+Lines that mention pay are never dropped, so the salary survives even when
+it sits in a benefits section or past the budget.
+"""
+import os
+import re
+import html
+import json
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to send postings to Gemini exactly as pasted
+POSTING_CLEANUP_ENABLED = os.getenv('POSTING_CLEANUP_ENABLED', '1') == '1'
+
+# Estimated prompt tokens a cleaned posting may use
+POSTING_TOKEN_BUDGET = int(os.getenv('POSTING_TOKEN_BUDGET', '1200'))
+
+# Characters per token for the estimate (English prose averages about 4)
+POSTING_CHARS_PER_TOKEN = float(os.getenv('POSTING_CHARS_PER_TOKEN', '4'))
+
+# Optional JSON file {"sections": [...], "sentences": [...]} of extra boilerplate regexes
+POSTING_BOILERPLATE_FILE = os.getenv('POSTING_BOILERPLATE_FILE', '')
+
+# Section headings (lower-cased) whose whole section is boilerplate
+BOILERPLATE_SECTION_PATTERNS = [
+    r'equal (employment )?opportunity', r'\beeo\b', r'\bdiversity\b', r'\binclusion\b',
+    r'\bbenefits\b', r'\bperks\b', r'what we offer', r'why (join|work)\b.*', r'life at\b.*',
+    r'accommodation', r'\bprivacy\b', r'e-verify', r'\blegal\b', r'disclaimer', r'notice to',
+    r'how to apply', r'application process', r'our (values|culture|commitment)',
+]
+
+# Sentences or lines (lower-cased) that are boilerplate wherever they appear
+BOILERPLATE_SENTENCE_PATTERNS = [
+    # Equal opportunity, accommodation and legal notices
+    r'\bis an equal (employment )?opportunity\b', r'\bequal opportunity employer\b',
+    r'without regard to\b', r'\baccommodations?\b', r'\bdisabilit(y|ies)\b', r'\be-verify\b',
+    r'\bfair chance\b', r'\barrest and conviction', r'\bprivacy (policy|notice)\b', r'\bcookies?\b',
+    r'\bbackground check', r'\ball qualified applicants will receive\b',
+    # Recruiting agencies
+    r'\bwe do not accept unsolicited\b', r'\brecruit(ment|ing) agencies\b', r'\bsigned agreement\b',
+    r'\bno fee will be paid\b',
+    # Benefits mentioned outside a benefits section
+    r'^we offer\b', r'\b(medical|dental|vision)(, | and )', r'\b401\(k\)', r'\bparental leave\b',
+    # Job-board page chrome
+    r'\bapply (now|today)\b', r'^(easy )?apply$', r'^(share|report)( this)?( job)?$',
+    r'^save( .{0,80} at .{0,80})?$', r'^(see|show) (more|less)$', r'^follow$', r'^promoted( by hirer)?$',
+    r'\bresponses managed off\b', r'^[\d,.]+k? followers$', r'^[\d,]+(-[\d,]+|\+)? employees$',
+    r'^\d+\+? applicants?$', r'^posted \d+ (minutes?|hours?|days?|weeks?) ago$',
+]
+
+# Sections kept first when truncating, in priority order; the opening lines
+# before the first heading (usually title, company and location) come first
+PRIORITY_SECTIONS = [
+    ('compensation', r'\b(compensation|salary|pay|wages?|base pay)\b'),
+    ('location', r'\b(locations?|where you.ll work|work (arrangement|model|setup)|work location)\b'),
+    ('requirements', r'\b(requirements?|qualifications?|what you.ll need|what we.re looking for|'
+                     r'must[- ]haves?|nice[- ]to[- ]haves?|skills|experience|who you are|about you|'
+                     r'you (have|bring|are)|tech stack)\b'),
+    ('role', r'\b(about the (role|job|position|team|opportunity)|the role|job summary|overview|'
+             r'responsibilities|what you.ll do|duties)\b'),
+]
+
+# Lines stating pay (a salary or rate, not any dollar amount), kept regardless of section or budget
+COMPENSATION_RE = re.compile(
+    r'\bsalary\b|\bpay (range|rate)\b|\bbase pay\b|\bcompensation\b|\bhiring range\b|'
+    r'[$£€]\s?\d[\d,.]*\s?[kK]?(\s?/\s?\w+)?\s*(-|–|to)\s*[$£€]?\s?\d|'
+    r'[$£€]\s?\d[\d,.]*\s?[kK]?\s?(/\s?(hr|hour|yr|year)\b|per (hour|year|annum)\b|an hour\b)', re.I)
+
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.I | re.S)
+HEADING_TAG_RE = re.compile(r'<h[1-6]\b[^>]*>(.*?)</h[1-6]\s*>', re.I | re.S)
+LIST_ITEM_RE = re.compile(r'<li\b[^>]*>', re.I)
+BLOCK_TAG_RE = re.compile(r'</?(p|div|br|ul|ol|li|tr|table|section|article|header|footer|hr)\b[^>]*>', re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+MARKDOWN_HEADING_RE = re.compile(r'^\s*#{1,6}\s*(.+?)\s*#*\s*$', re.M)
+MARKDOWN_BOLD_LINE_RE = re.compile(r'^\s*(\*\*|__)(.+?)\1\s*:?\s*$', re.M)
+MARKDOWN_EMPHASIS_RE = re.compile(r'(\*\*|__)')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"(])')
+
+# Lines at least this long are dropped when they repeat an earlier line
+REPEATED_LINE_MIN_CHARS = 40
+
+# Lines longer than this are split into sentences for filtering and truncation
+LONG_LINE_CHARS = 300
+
+# Headings are short lines that end in a colon, are upper case or name a known section
+HEADING_MAX_CHARS = 60
+HEADING_MAX_WORDS = 8
+
+# Words allowed around a known section name in a heading ("Preferred Qualifications")
+HEADING_QUALIFIER_RE = re.compile(
+    r'^((our|the|your|key|basic|minimum|preferred|required|additional|desired|core|main)\s+)*'
+)
+
+
+def _compile(patterns):
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def _load_pattern_file(path):
+    """Extra boilerplate patterns from POSTING_BOILERPLATE_FILE, if set."""
+    if not path:
+        return [], []
+    try:
+        with open(path, encoding='utf-8') as f:
+            extra = json.load(f)
+        return list(extra.get('sections', [])), list(extra.get('sentences', []))
+    except (OSError, ValueError, re.error) as e:
+        logger.error(f"Could not load boilerplate patterns from {path}: {str(e)}")
+        return [], []
+
+
+_extra_sections, _extra_sentences = _load_pattern_file(POSTING_BOILERPLATE_FILE)
+_section_res = _compile(BOILERPLATE_SECTION_PATTERNS + _extra_sections)
+_sentence_res = _compile(BOILERPLATE_SENTENCE_PATTERNS + _extra_sentences)
+_priority_res = [(name, re.compile(pattern)) for name, pattern in PRIORITY_SECTIONS]
+_known_heading_re = re.compile('|'.join(
+    [pattern for _, pattern in PRIORITY_SECTIONS] + BOILERPLATE_SECTION_PATTERNS + _extra_sections
+))
+
+
+def estimate_tokens(text):
+    """Rough prompt-token count of ``text``."""
+    return math.ceil(len(text) / POSTING_CHARS_PER_TOKEN)
+
+
+def strip_markup(text):
+    """
+    Convert HTML or markdown to plain text, one block per line.
+
+    Headings become lines ending in a colon, so the section split can find them.
+    """
+    text = SCRIPT_STYLE_RE.sub(' ', text)
+    text = HEADING_TAG_RE.sub(lambda m: f"\n{TAG_RE.sub('', m.group(1)).strip().rstrip(':')}:\n", text)
+    text = LIST_ITEM_RE.sub('\n- ', text)
+    text = BLOCK_TAG_RE.sub('\n', text)
+    text = html.unescape(TAG_RE.sub('', text))
+    text = MARKDOWN_HEADING_RE.sub(lambda m: f"{m.group(1).rstrip(':')}:", text)
+    text = MARKDOWN_BOLD_LINE_RE.sub(lambda m: f"{m.group(2).rstrip(':')}:", text)
+    return MARKDOWN_EMPHASIS_RE.sub('', text)
+
+
+def collapse_whitespace(text):
+    """Non-empty lines of ``text`` with runs of whitespace collapsed to one space."""
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return [line for line in lines if line and line not in ('-', '•', '*')]
+
+
+def _is_heading(line):
+    if len(line) > HEADING_MAX_CHARS or len(line.split()) > HEADING_MAX_WORDS:
+        return False
+    if line.endswith(':'):
+        return True
+    if line.endswith(('.', '!', ',')) or line.startswith(('-', '•', '*')):
+        return False
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) > 3 and all(c.isupper() for c in letters):
+        return True
+    name = HEADING_QUALIFIER_RE.sub('', line.lower().rstrip('?'))
+    name = re.sub(r'\s+(&|and)\s+\w+$', '', name)
+    return _known_heading_re.fullmatch(name) is not None
+
+
+def _units(line):
+    """Split a long line into sentences; short lines are one unit."""
+    if len(line) <= LONG_LINE_CHARS:
+        return [line]
+    return SENTENCE_SPLIT_RE.split(line)
+
+
+def _is_boilerplate_sentence(text):
+    lowered = text.lower()
+    return not COMPENSATION_RE.search(text) and any(p.search(lowered) for p in _sentence_res)
+
+
+def split_sections(lines):
+    """
+    Group lines under their headings.
+
+    Returns:
+        list: (heading or None, [lines]) pairs; the first has no heading
+    """
+    sections = [(None, [])]
+    for position, line in enumerate(lines):
+        # The first line is the job title in nearly every paste, whatever it looks like
+        if position and _is_heading(line):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _priority(heading):
+    if heading is None:
+        return 0
+    lowered = heading.lower()
+    for rank, (_, pattern) in enumerate(_priority_res, 1):
+        if pattern.search(lowered):
+            return rank
+    return len(_priority_res) + 1
+
+
+def _is_boilerplate_section(heading):
+    if heading is None or _priority(heading) == 1:
+        return False
+    lowered = heading.lower()
+    return any(p.search(lowered) for p in _section_res)
+
+
+def _truncate(lines, budget):
+    """
+    Keep whole units of ``lines`` while they fit in ``budget`` characters,
+    and every unit mentioning pay.
+
+    Returns:
+        tuple: (kept lines, characters used, whether anything was cut)
+    """
+    kept, used, cut = [], 0, False
+    for line in lines:
+        parts = []
+        for unit in _units(line):
+            if used + len(unit) + 1 <= budget or COMPENSATION_RE.search(unit):
+                parts.append(unit)
+                used += len(unit) + 1
+            else:
+                cut = True
+        if parts:
+            kept.append(' '.join(parts))
+    return kept, used, cut
+
+
+def clean_posting(job_text, token_budget=None):
+    """
+    Clean a pasted posting and fit it to a token budget.
+
+    Args:
+        job_text (str): Raw posting as pasted (plain text, HTML or markdown)
+        token_budget (int): Estimated tokens allowed (defaults to POSTING_TOKEN_BUDGET)
+
+    Returns:
+        dict: 'text' (the cleaned posting), 'chars_in', 'chars_out',
+        'tokens_in', 'tokens_out' (estimates), 'dropped_sections' (headings
+        removed as boilerplate), 'boilerplate_sentences' and 'truncated'
+    """
+    job_text = job_text or ''
+    token_budget = token_budget or POSTING_TOKEN_BUDGET
+    report = {
+        'chars_in': len(job_text),
+        'tokens_in': estimate_tokens(job_text),
+        'dropped_sections': [],
+        'boilerplate_sentences': 0,
+        'truncated': False,
+    }
+
+    lines = collapse_whitespace(strip_markup(job_text))
+    # Job boards repeat the company blurb; keep the first copy of any long line
+    seen = set()
+    lines = [line for line in lines if len(line) < REPEATED_LINE_MIN_CHARS or not (line in seen or seen.add(line))]
+
+    sections = []
+    for heading, lines in split_sections(lines):
+        if _is_boilerplate_section(heading):
+            report['dropped_sections'].append(heading.rstrip(':'))
+            # A benefits section can still state the salary
+            lines = [line for line in lines if COMPENSATION_RE.search(line)]
+            if not lines:
+                continue
+        kept = []
+        for line in lines:
+            units = [unit for unit in _units(line) if not _is_boilerplate_sentence(unit)]
+            report['boilerplate_sentences'] += len(_units(line)) - len(units)
+            if units:
+                kept.append(' '.join(units))
+        if heading is not None and _is_boilerplate_sentence(heading):
+            heading = None
+        if kept or heading is not None:
+            sections.append((heading, kept))
+
+    # Spend the budget on sections in priority order, then put them back in posting order
+    budget = int(token_budget * POSTING_CHARS_PER_TOKEN)
+    order = sorted(range(len(sections)), key=lambda i: (_priority(sections[i][0]), i))
+    fitted = {}
+    for i in order:
+        heading, lines = sections[i]
+        head = [heading] if heading else []
+        heading_chars = len(heading) + 1 if heading else 0
+        kept, used, cut = _truncate(lines, budget - heading_chars)
+        report['truncated'] = report['truncated'] or cut
+        # A heading is kept with some of its lines, or alone if it has none and fits
+        if kept or (not lines and heading_chars <= budget):
+            fitted[i] = head + kept
+            budget -= heading_chars + used
+        elif head:
+            report['truncated'] = True
+
+    text = '\n'.join(line for i in sorted(fitted) for line in fitted[i])
+    report['text'] = text
+    report['chars_out'] = len(text)
+    report['tokens_out'] = estimate_tokens(text)
+    return report
@@ -0,0 +1,341 @@
+"""
+Prompt Builder Module
+Builds compact, token-budgeted analysis prompts from matched job rows.
+Only fields relevant to the question are sent, rows are encoded as CSV, and
+aggregates computed locally replace rows that do not fit the budget.
+"""
+import io
+import os
+import re
+import csv
+import json
+import logging
+from collections import Counter
+from statistics import median
+
+import analytics
+from skills import parse_skills, UNKNOWN_SKILLS
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the job data part of an analysis prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '6000'))
+
+# Rough characters-per-token ratio used to estimate prompt size
+CHARS_PER_TOKEN = 4
+
+# Descriptions are cut to this many characters when they are included
+DESCRIPTION_CHARS = int(os.getenv('PROMPT_DESCRIPTION_CHARS', '280'))
+
+# Number of entries listed for each frequency aggregate
+TOP_VALUES = 8
+
+BASE_FIELDS = ['title', 'company', 'location']
+
+# Questions that need the posting text rather than just its metadata
+DESCRIPTION_QUESTION_RE = re.compile(
+    r'\b(describ\w*|responsibilit\w*|duties|requirements?|qualifications?|benefits?|'
+    r'remote|hybrid|on-?site|culture|experience|education|degree|visa|tools?)\b',
+    re.IGNORECASE
+)
+COMPARE_QUESTION_RE = re.compile(r'\b(compar\w*|versus|vs\.?|differ\w*|best|recommend\w*)\b', re.IGNORECASE)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def estimate_tokens(text):
+    """Estimate the token count of a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def select_fields(user_query, parsed_filters):
+    """
+    Choose the job fields worth sending for a question.
+
+    Args:
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+
+    Returns:
+        List of job dictionary keys, in column order
+    """
+    parsed_filters = parsed_filters or {}
+    text = f"{user_query or ''} {parsed_filters.get('intent') or ''}"
+    fields = list(BASE_FIELDS)
+    if analytics.is_salary_question(user_query, parsed_filters) or COMPARE_QUESTION_RE.search(text):
+        fields.append('pay')
+    if (analytics.is_skills_question(user_query, parsed_filters) or parsed_filters.get('skills')
+            or COMPARE_QUESTION_RE.search(text)):
+        fields.append('skills')
+    if DESCRIPTION_QUESTION_RE.search(text):
+        fields.append('description')
+    return fields
+
+
+def _cell(job, field):
+    """Render one job field as a single-line CSV cell."""
+    value = job.get(field)
+    if value is None:
+        return ''
+    value = WHITESPACE_RE.sub(' ', str(value)).strip()
+    if field == 'skills' and value.lower() == UNKNOWN_SKILLS:
+        return ''
+    if field == 'description' and len(value) > DESCRIPTION_CHARS:
+        value = value[:DESCRIPTION_CHARS].rsplit(' ', 1)[0] + '...'
+    return value
+
+
+def encode_rows(jobs, fields):
+    """
+    Encode jobs as CSV lines, one string per row.
+
+    Args:
+        jobs: Job dictionaries
+        fields: Columns to include
+
+    Returns:
+        Tuple of (header line, list of row lines)
+    """
+    def line(values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='').writerow(values)
+        return buffer.getvalue()
+
+    return line(fields), [line([_cell(job, field) for field in fields]) for job in jobs]
+
+
+def compute_aggregates(jobs, total_count=None):
+    """
+    Summarize the matched jobs so the model does not need every row.
+
+    Args:
+        jobs: Job dictionaries
+        total_count: Total number of matches, if more than len(jobs)
+
+    Returns:
+        Multi-line text block of counts, salary figures and skill frequencies
+    """
+    lines = [f"Matching jobs: {total_count if total_count is not None else len(jobs)}"]
+    if total_count is not None and total_count > len(jobs):
+        lines.append(f"Figures below cover the {len(jobs)} matches most relevant to the question.")
+
+    for field, label in (('location', 'Top locations'), ('company', 'Top companies'), ('title', 'Top titles')):
+        counts = Counter(_cell(job, field) for job in jobs if _cell(job, field))
+        if counts:
+            lines.append(f"{label}: " + ', '.join(f"{name} ({n})" for name, n in counts.most_common(TOP_VALUES)))
+
+    pay_mins = [job['pay_min'] for job in jobs if job.get('pay_min') is not None]
+    pay_maxs = [job['pay_max'] for job in jobs if job.get('pay_max') is not None]
+    if pay_mins and pay_maxs:
+        midpoints = [(job['pay_min'] + job['pay_max']) / 2 for job in jobs
+                     if job.get('pay_min') is not None and job.get('pay_max') is not None]
+        lines.append(
+            f"Salary (annual USD, {len(midpoints)} jobs with pay): min ${min(pay_mins):,.0f}, "
+            f"median ${median(midpoints):,.0f}, max ${max(pay_maxs):,.0f}"
+        )
+
+    skill_counts = Counter()
+    for job in jobs:
+        skill_counts.update(set(parse_skills(job.get('skills'))))
+    if skill_counts:
+        lines.append("Top skills: " + ', '.join(f"{name} ({n})" for name, n in skill_counts.most_common(TOP_VALUES)))
+    return '\n'.join(lines)
+
+
+def _sample_indices(count, keep):
+    """Pick `keep` evenly spaced indices out of `count`, preserving order."""
+    if keep >= count:
+        return list(range(count))
+    if keep <= 0:
+        return []
+    step = count / keep
+    return [int(i * step) for i in range(keep)]
+
+
+def fit_rows(rows, budget_chars):
+    """
+    Choose which encoded rows fit within a character budget.
+
+    Rows are sampled evenly across the list (which is ordered newest first)
+    rather than cut from the end, so the sample stays representative.
+
+    Args:
+        rows: Encoded row lines
+        budget_chars: Characters available for rows
+
+    Returns:
+        List of the selected row lines
+    """
+    total = sum(len(row) + 1 for row in rows)
+    if total <= budget_chars:
+        return rows
+    average = total / len(rows)
+    keep = int(budget_chars / average)
+    selected = [rows[i] for i in _sample_indices(len(rows), keep)]
+    while selected and sum(len(row) + 1 for row in selected) > budget_chars:
+        selected.pop()
+    return selected
+
+
+def build_analysis_prompt(jobs, user_query, parsed_filters, total_count=None, token_budget=None):
+    """
+    Build the analyze_jobs prompt within a token budget.
+
+    Args:
+        jobs: Job dictionaries matching the query
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+        total_count: Total number of matches, if more than len(jobs)
+        token_budget: Token budget for the job data (defaults to PROMPT_TOKEN_BUDGET)
+
+    Returns:
+        Tuple of (prompt text, stats dict with rows_sent, rows_total,
+        prompt_tokens, baseline_tokens and tokens_saved); the last two
+        compare against the jobs as raw JSON and are None unless DEBUG
+        logging is on, since serializing every job costs more than the prompt
+    """
+    token_budget = token_budget or PROMPT_TOKEN_BUDGET
+    fields = select_fields(user_query, parsed_filters)
+    aggregates = compute_aggregates(jobs, total_count)
+    header, rows = encode_rows(jobs, fields)
+
+    budget_chars = token_budget * CHARS_PER_TOKEN - len(aggregates) - len(header)
+    selected = fit_rows(rows, max(budget_chars, 0))
+
+    if len(selected) < len(rows):
+        row_note = f"Sample of {len(selected)} of {len(rows)} job postings (CSV):"
+    else:
+        row_note = "Job postings (CSV):"
+    data = '\n'.join([header] + selected)
+
+    prompt = f"""Analyze these job postings and answer the user's specific question.
+
+User Question: "{user_query}"
+
+Summary of matching jobs:
+{aggregates}
+
+{row_note}
+{data}
+
+Provide a BRIEF summary (2-3 sentences max) that directly answers their question. Focus on:
+- Key findings
+- Patterns observed
+- Essential insights
+
+Be concise and get straight to the point. No lengthy explanations."""
+
+    prompt_tokens = estimate_tokens(prompt)
+    stats = {
+        'fields': fields,
+        'rows_sent': len(selected),
+        'rows_total': len(rows),
+        'prompt_tokens': prompt_tokens,
+        'baseline_tokens': None,
+        'tokens_saved': None,
+    }
+    logger.info(
+        f"Analysis prompt: {len(prompt)} chars (~{prompt_tokens} tokens), "
+        f"{len(selected)}/{len(rows)} rows, fields={fields}"
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        stats['baseline_tokens'] = estimate_tokens(json.dumps(jobs, indent=2, default=str))
+        stats['tokens_saved'] = max(stats['baseline_tokens'] - prompt_tokens, 0)
+        logger.debug(f"Analysis prompt: ~{stats['tokens_saved']} tokens saved vs raw JSON")
+    return prompt, stats
+
+
+def chunk_rows(rows, budget_chars):
+    """
+    Split encoded rows into consecutive chunks that each fit a character budget.
+
+    Args:
+        rows: Encoded row lines
+        budget_chars: Characters available for rows in one chunk
+
+    Returns:
+        List of row lists; a row longer than the budget gets a chunk of its own
+    """
+    chunks, current, size = [], [], 0
+    for row in rows:
+        if current and size + len(row) + 1 > budget_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(row)
+        size += len(row) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_map_prompts(jobs, user_query, parsed_filters, token_budget=None):
+    """
+    Build one map-phase prompt per chunk of jobs, each within the token budget.
+
+    Args:
+        jobs: Job dictionaries matching the query
+        user_query: Original user query
+        parsed_filters: Parsed filters from gemini_service.parse_query()
+        token_budget: Token budget for the job data of each chunk
+
+    Returns:
+        List of prompt strings
+    """
+    token_budget = token_budget or PROMPT_TOKEN_BUDGET
+    fields = select_fields(user_query, parsed_filters)
+    header, rows = encode_rows(jobs, fields)
+    chunks = chunk_rows(rows, max(token_budget * CHARS_PER_TOKEN - len(header), 1))
+
+    prompts = []
+    for index, chunk in enumerate(chunks, start=1):
+        data = '\n'.join([header] + chunk)
+        prompts.append(f"""You are reading part {index} of {len(chunks)} of the job postings that match a user's question.
+
+User Question: "{user_query}"
+
+Job postings in this part (CSV, {len(chunk)} rows):
+{data}
+
+List up to 5 short bullet points with the facts from THIS part that help answer the question
+(counts, notable companies, titles, salaries, skills, patterns). Use only the data above.
+No introduction or conclusion.""")
+    logger.info(
+        f"Map prompts: {len(prompts)} chunks for {len(rows)} rows, "
+        f"~{sum(estimate_tokens(p) for p in prompts)} tokens total"
+    )
+    return prompts
+
+
+def build_reduce_prompt(jobs, user_query, partials, total_count=None):
+    """
+    Build the reduce-phase prompt that merges map-phase notes into one answer.
+
+    Args:
+        jobs: Job dictionaries matching the query (for exact aggregates)
+        user_query: Original user query
+        partials: Notes returned by the map-phase prompts
+        total_count: Total number of matches, if more than len(jobs)
+
+    Returns:
+        Prompt text
+    """
+    notes = '\n\n'.join(f"Part {i}:\n{note.strip()}" for i, note in enumerate(partials, start=1))
+    prompt = f"""Answer the user's question about job postings using the summary and the notes below.
+The notes were taken from separate parts of the matching postings.
+
+User Question: "{user_query}"
+
+Summary of matching jobs:
+{compute_aggregates(jobs, total_count)}
+
+Notes:
+{notes}
+
+Provide a BRIEF summary (2-3 sentences max) that directly answers their question. Focus on:
+- Key findings
+- Patterns observed
+- Essential insights
+
+Be concise and get straight to the point. No lengthy explanations."""
+    logger.info(f"Reduce prompt: {len(partials)} notes, ~{estimate_tokens(prompt)} tokens")
+    return prompt
@@ -0,0 +1,312 @@
+"""
+Query Parser Module
+Rule-based parsing of simple job search queries, so structured questions
+like "senior devops in Austin, TX" are answered without a Gemini call.
+Produces the same filter dict as gemini_service.parse_query() plus a
+confidence score; callers fall back to Gemini when confidence is low.
+"""
+import os
+import re
+import logging
+import threading
+
+import db
+from skills import KNOWN_SKILLS, SKILL_ALIASES, CASE_SENSITIVE_SKILLS, canonicalize_skill
+
+logger = logging.getLogger(__name__)
+
+# Minimum share of query words the rules must account for to skip Gemini
+LOCAL_PARSE_MIN_CONFIDENCE = float(os.getenv('LOCAL_PARSE_MIN_CONFIDENCE', '0.85'))
+
+# Set to 0 to send every query to Gemini
+LOCAL_PARSE_ENABLED = os.getenv('LOCAL_PARSE_ENABLED', '1') == '1'
+
+SENIORITY_TERMS = {
+    'junior': 'junior', 'jr': 'junior', 'entry level': 'junior', 'entry-level': 'junior',
+    'graduate': 'junior', 'intern': 'junior', 'internship': 'junior',
+    'mid': 'mid', 'mid-level': 'mid', 'mid level': 'mid', 'intermediate': 'mid',
+    'senior': 'senior', 'sr': 'senior', 'lead': 'senior', 'principal': 'senior', 'staff': 'senior',
+}
+
+# Checked in order; the first match names the intent
+INTENT_PATTERNS = [
+    (re.compile(r'\b(salar(y|ies)|pay(s|ing)?|paid|compensation|earn\w*|wages?|make)\b'), 'salary analysis'),
+    (re.compile(r'\b(skills?|technolog(y|ies)|tech stack|stack|requirements?)\b'), 'find top skills'),
+    (re.compile(r'\b(compar\w*|versus|vs|differen\w*)\b'), 'compare jobs'),
+    (re.compile(r'\b(how many|count|number of)\b'), 'count jobs'),
+]
+DEFAULT_INTENT = 'find jobs'
+
+# Words that end a job title ("data engineer", "devops")
+TITLE_HEADS = {
+    'developer': 'Developer', 'developers': 'Developer', 'dev': 'Developer', 'devs': 'Developer',
+    'engineer': 'Engineer', 'engineers': 'Engineer', 'scientist': 'Scientist', 'scientists': 'Scientist',
+    'analyst': 'Analyst', 'analysts': 'Analyst', 'architect': 'Architect', 'architects': 'Architect',
+    'designer': 'Designer', 'designers': 'Designer', 'manager': 'Manager', 'managers': 'Manager',
+    'administrator': 'Administrator', 'administrators': 'Administrator', 'admin': 'Administrator',
+    'programmer': 'Programmer', 'programmers': 'Programmer', 'consultant': 'Consultant',
+    'specialist': 'Specialist', 'tester': 'Tester', 'testers': 'Tester',
+    'devops': 'DevOps', 'sre': 'SRE',
+}
+
+# Title words beyond those found in the jobs table
+TITLE_MODIFIERS = {
+    'backend', 'back-end', 'frontend', 'front-end', 'full stack', 'full-stack', 'fullstack', 'web',
+    'software', 'data', 'cloud', 'security', 'mobile', 'qa', 'test', 'automation', 'systems',
+    'platform', 'infrastructure', 'site reliability', 'game', 'product', 'database', 'network',
+    'embedded', 'solutions', 'ux', 'ui', 'ml', 'ai', 'machine learning', 'devops',
+}
+
+MAX_TITLE_MODIFIERS = 3
+
+# Display form of title words that are not simply capitalized
+TITLE_WORD_CASING = {
+    'ml': 'ML', 'ai': 'AI', 'qa': 'QA', 'ui': 'UI', 'ux': 'UX', 'sre': 'SRE', 'ios': 'iOS',
+    'aws': 'AWS', 'gcp': 'GCP', 'sql': 'SQL', 'devops': 'DevOps', 'full-stack': 'Full-Stack',
+}
+
+# Words that carry no filter information in a search query
+QUERY_STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'in', 'at', 'on', 'to', 'with', 'near', 'around', 'based',
+    'from', 'by', 'me', 'my', 'i', 'we', 'us', 'you', 'show', 'find', 'list', 'get', 'give', 'search',
+    'looking', 'look', 'want', 'need', 'any', 'all', 'some', 'there', 'is', 'are', 'what', 'whats',
+    "what's", 'which', 'where', 'who', 'do', 'does', 'can', 'could', 'please', 'jobs', 'job', 'roles',
+    'role', 'positions', 'position', 'openings', 'opening', 'listings', 'postings', 'posting',
+    'opportunities', 'work', 'hire', 'hires', 'hiring', 'available', 'open', 'level', 'typical',
+    'average', 'avg', 'median', 'range', 'ranges', 'top', 'most', 'common', 'popular', 'required',
+    'in-demand', 'demand', 'best', 'highest', 'lowest', 'about', 'tell', 'these', 'those', 'this',
+    'that', 'it', 'they', 'them', 'their', 'per', 'each', 'across', 'location', 'locations', 'city',
+    'cities', 'title', 'titles', 'company', 'companies', 'year', 'yearly', 'annual', 'hour',
+    'hourly', 'how', 'much', 'many', 'be', 'like', 'between', 'experience',
+}
+
+TOKEN_RE = re.compile(r"[\w+#./'-]+")
+
+SALARY_PHRASE_RE = re.compile(
+    r'(?:(?:over|above|more than|greater than|at least|minimum|min|from|starting at|under|below|'
+    r'less than|at most|maximum|max|up to|no more than|around|about|approximately|roughly|'
+    r'between)\s+)?'
+    r'(?P<amount>\$\s*\d[\d,]*(?:\.\d+)?\s*[km]?|\d[\d,]*(?:\.\d+)?\s*[km]\b|\d{1,3}(?:,\d{3})+|\d{5,})'
+    r'(?:\s*\+)?'
+    r'(?:\s*(?:-|to|and)\s*\$?\s*\d[\d,]*(?:\.\d+)?\s*[km]?)?'
+    r'(?:\s*(?:/\s*h(?:ou)?r|per hour|an hour|/\s*yr|per year|a year))?'
+)
+
+_vocabulary_lock = threading.Lock()
+_vocabulary_version = None
+_matchers = None
+_stats_lock = threading.Lock()
+_stats = {'local': 0, 'fallback': 0}
+
+
+def _phrase_pattern(phrases):
+    """Match any of ``phrases`` as whole words, longest first."""
+    alternatives = '|'.join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf'(?<![\w+#.])({alternatives})(?![\w+#]|\.\w)')
+
+
+def _build_matchers(vocabulary):
+    """
+    Compile entity matchers from the jobs table vocabulary.
+
+    Args:
+        vocabulary: Dict from db.job_vocabulary()
+
+    Returns:
+        dict: Compiled patterns plus lookup tables from lowercase phrase to value
+    """
+    locations = {'remote': 'Remote'}
+    for location in vocabulary['locations']:
+        canonical = location.strip()
+        key = canonical.lower()
+        locations[key] = canonical
+        locations[key.replace(',', '')] = canonical
+        city = canonical.split(',')[0].strip()
+        if city and city.lower() not in locations:
+            locations[city.lower()] = city
+
+    skills = {}
+    for name in set(vocabulary['skills']) | KNOWN_SKILLS | set(SKILL_ALIASES):
+        canonical = canonicalize_skill(name)
+        if canonical and name.lower() not in CASE_SENSITIVE_SKILLS:
+            skills[name.lower()] = canonical
+
+    # Casing of title words as they appear in real titles ("DevOps", "iOS")
+    title_casing = {}
+    for title in vocabulary['titles']:
+        for word in re.findall(r'[\w+#.-]+', re.sub(r'\(.*?\)', ' ', title)):
+            lower = word.lower()
+            if lower in SENIORITY_TERMS or lower in QUERY_STOPWORDS:
+                continue
+            if lower not in title_casing or word != word.lower():
+                title_casing[lower] = word
+    modifiers = (set(title_casing) | TITLE_MODIFIERS | set(skills)
+                 | {v.lower() for v in CASE_SENSITIVE_SKILLS.values()}) - set(TITLE_HEADS)
+    modifier_alt = '|'.join(re.escape(m) for m in sorted(modifiers, key=len, reverse=True))
+    head_alt = '|'.join(re.escape(h) for h in sorted(TITLE_HEADS, key=len, reverse=True))
+    title_pattern = re.compile(
+        rf'(?<![\w+#.])((?:(?:{modifier_alt})\s+){{0,{MAX_TITLE_MODIFIERS}}}(?:{head_alt}))(?![\w+#])'
+    )
+
+    return {
+        'locations': locations,
+        'location_re': _phrase_pattern(locations),
+        'skills': skills,
+        'skill_re': _phrase_pattern(skills),
+        'title_casing': title_casing,
+        'title_re': title_pattern,
+        'seniority_re': _phrase_pattern(SENIORITY_TERMS),
+    }
+
+
+def _get_matchers():
+    """Return matchers for the current jobs data, rebuilding them after writes."""
+    global _vocabulary_version, _matchers
+    version = db.get_data_version()
+    with _vocabulary_lock:
+        if _matchers is None or version != _vocabulary_version:
+            _matchers = _build_matchers(db.job_vocabulary())
+            _vocabulary_version = version
+        return _matchers
+
+
+def _format_title(phrase, matchers):
+    """Turn a matched title phrase into display form ("python devs" -> "Python Developer")."""
+    words = phrase.split()
+    head = TITLE_HEADS[words[-1]]
+    casing = matchers['title_casing']
+    named = [casing.get(w) or TITLE_WORD_CASING.get(w) or CASE_SENSITIVE_SKILLS.get(w) or w.capitalize()
+             for w in words[:-1]]
+    return ' '.join(named + [head])
+
+
+def parse_locally(user_query):
+    """
+    Parse a query with dictionaries and keyword grammars.
+
+    Confidence is the share of query words accounted for by a recognised
+    entity, grammar keyword or filler word. An unrecognised word may be a
+    filter the rules missed, so it lowers confidence.
+
+    Args:
+        user_query: Natural language query from user
+
+    Returns:
+        tuple: (filters dict in parse_query() form, confidence from 0 to 1)
+    """
+    text = re.sub(r'\s+', ' ', user_query or '').strip()
+    lower = text.lower()
+    matchers = _get_matchers()
+    covered = [False] * len(lower)
+
+    def claim(match, group=0):
+        for i in range(match.start(group), match.end(group)):
+            covered[i] = True
+
+    def is_free(match, group=0):
+        return not any(covered[match.start(group):match.end(group)])
+
+    filters = {
+        'job_title': None,
+        'location': None,
+        'skills': [],
+        'seniority': None,
+        'intent': DEFAULT_INTENT,
+        'salary_range': None,
+    }
+
+    for match in SALARY_PHRASE_RE.finditer(lower):
+        if filters['salary_range'] is None:
+            filters['salary_range'] = text[match.start():match.end()].strip()
+        claim(match)
+
+    for match in matchers['location_re'].finditer(lower):
+        if is_free(match, 1):
+            if filters['location'] is None:
+                filters['location'] = matchers['locations'][match.group(1)]
+            claim(match, 1)
+
+    for match in matchers['seniority_re'].finditer(lower):
+        if is_free(match, 1):
+            if filters['seniority'] is None:
+                filters['seniority'] = SENIORITY_TERMS[match.group(1)]
+            claim(match, 1)
+
+    for match in matchers['title_re'].finditer(lower):
+        if is_free(match, 1) and filters['job_title'] is None:
+            filters['job_title'] = _format_title(match.group(1), matchers)
+            claim(match, 1)
+
+    # Skills are also picked out of the title ("python developer" -> python)
+    for match in matchers['skill_re'].finditer(lower):
+        skill = matchers['skills'][match.group(1)]
+        if skill not in filters['skills']:
+            filters['skills'].append(skill)
+        claim(match, 1)
+    for canonical, written in CASE_SENSITIVE_SKILLS.items():
+        for match in re.finditer(rf'(?<![\w+#.]){re.escape(written)}(?![\w+#])', text):
+            if canonical not in filters['skills']:
+                filters['skills'].append(canonical)
+            claim(match, 0)
+
+    for pattern, intent in INTENT_PATTERNS:
+        matches = list(pattern.finditer(lower))
+        if matches and filters['intent'] == DEFAULT_INTENT:
+            filters['intent'] = intent
+        for match in matches:
+            claim(match)
+
+    tokens = list(TOKEN_RE.finditer(lower))
+    if not tokens:
+        return filters, 0.0
+    known = sum(
+        1 for token in tokens
+        if covered[token.start()] or token.group().strip("'.-") in QUERY_STOPWORDS
+    )
+    return filters, known / len(tokens)
+
+
+def try_parse(user_query):
+    """
+    Parse a query locally if the rules are confident enough.
+
+    Args:
+        user_query: Natural language query from user
+
+    Returns:
+        dict: Filters in parse_query() form, or None to fall back to Gemini
+    """
+    if not LOCAL_PARSE_ENABLED:
+        return None
+    try:
+        filters, confidence = parse_locally(user_query)
+    except Exception as e:
+        logger.error(f"Local query parse failed: {str(e)}", exc_info=True)
+        filters, confidence = None, 0.0
+
+    accepted = filters is not None and confidence >= LOCAL_PARSE_MIN_CONFIDENCE
+    with _stats_lock:
+        _stats['local' if accepted else 'fallback'] += 1
+    if accepted:
+        logger.info(f"Query parsed locally (confidence {confidence:.2f}): {filters}")
+        return filters
+    logger.info(f"Local parse confidence {confidence:.2f} too low for: '{user_query}'")
+    return None
+
+
+def stats():
+    """
+    Return local parser counters.
+
+    Returns:
+        dict: Queries parsed locally, sent to Gemini, and the local fraction
+    """
+    with _stats_lock:
+        local, fallback = _stats['local'], _stats['fallback']
+    total = local + fallback
+    return {
+        'local': local,
+        'fallback': fallback,
+        'local_fraction': round(local / total, 4) if total else 0.0,
+        'min_confidence': LOCAL_PARSE_MIN_CONFIDENCE,
+    }
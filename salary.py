@@ -0,0 +1,105 @@
+"""
+Salary Parsing Module
+Turns free-text pay strings and salary questions into numeric annual ranges.
+"""
+import re
+
+# Annualization factor for hourly rates (40 hours x 52 weeks)
+HOURS_PER_YEAR = 2080
+
+# Amounts below this are treated as hourly rates when no unit is given
+HOURLY_THRESHOLD = 500
+
+# "$120,000", "120k", "$1.2M", "$95.50"
+AMOUNT_RE = re.compile(r'(\$)?\s*(\d[\d,]*(?:\.\d+)?)\s*([kKmM])?(?![\w])')
+HOURLY_RE = re.compile(r'(/\s*h(ou)?r\b|\bper\s+hour\b|\ban\s+hour\b|\bhourly\b)', re.IGNORECASE)
+
+LOWER_BOUND_RE = re.compile(r'\b(over|above|more than|greater than|at least|minimum|min|from|starting at)\b|\+', re.IGNORECASE)
+UPPER_BOUND_RE = re.compile(r'\b(under|below|less than|at most|maximum|max|up to|no more than)\b', re.IGNORECASE)
+APPROX_RE = re.compile(r'\b(around|about|approximately|roughly|near|~)', re.IGNORECASE)
+
+# Relative width of the window used for "around $X" questions
+APPROX_TOLERANCE = 0.1
+
+
+def _amounts(text):
+    """Extract annualized dollar amounts from ``text`` in the order they appear."""
+    hourly = bool(HOURLY_RE.search(text))
+    amounts = []
+    for dollar, number, suffix in AMOUNT_RE.findall(text):
+        value = float(number.replace(',', ''))
+        if suffix in ('k', 'K'):
+            value *= 1_000
+        elif suffix in ('m', 'M'):
+            value *= 1_000_000
+        elif value < HOURLY_THRESHOLD:
+            # Small bare numbers ("5+ years") are not pay unless marked as money
+            if not (dollar or hourly):
+                continue
+            value *= HOURS_PER_YEAR
+        amounts.append(int(round(value)))
+    return amounts
+
+
+def normalize_pay(pay):
+    """
+    Convert a stored pay value into an annual (min, max) range.
+    
+    Handles ranges ("$120,000 - $160,000", "$60k-$80k"), single figures
+    (job_parser returns the lower end as a bare number, stored as min = max)
+    and hourly rates ("$45/hr" is annualized).
+    
+    Args:
+        pay: Pay as stored in jobs.pay (string, number or None)
+        
+    Returns:
+        tuple: (pay_min, pay_max) as ints, or (None, None) if no amount is found
+    """
+    if pay is None or isinstance(pay, bool):
+        return None, None
+    if isinstance(pay, (int, float)):
+        value = int(round(pay))
+        if value < HOURLY_THRESHOLD:
+            value *= HOURS_PER_YEAR
+        return (value, value) if value > 0 else (None, None)
+    
+    amounts = [a for a in _amounts(str(pay)) if a > 0]
+    if not amounts:
+        return None, None
+    return min(amounts[:2]), max(amounts[:2])
+
+
+def parse_salary_range(text):
+    """
+    Interpret the salary_range string from parse_query() as numeric bounds.
+    
+    Examples: "over $100k" -> (100000, None), "under 90,000" -> (None, 90000),
+    "$100k-$150k" -> (100000, 150000), "around 120k" -> (108000, 132000).
+    
+    Args:
+        text: Salary phrase extracted from the user's query
+        
+    Returns:
+        tuple: (low, high) - either may be None; (None, None) if unparseable
+    """
+    if not text:
+        return None, None
+    if isinstance(text, (int, float)):
+        return int(text), None
+    
+    text = str(text)
+    amounts = _amounts(text)
+    if not amounts:
+        return None, None
+    if len(amounts) >= 2:
+        return min(amounts[:2]), max(amounts[:2])
+    
+    value = amounts[0]
+    if UPPER_BOUND_RE.search(text):
+        return None, value
+    if APPROX_RE.search(text):
+        return int(value * (1 - APPROX_TOLERANCE)), int(value * (1 + APPROX_TOLERANCE))
+    if LOWER_BOUND_RE.search(text):
+        return value, None
+    # A bare figure ("100k jobs") reads as a minimum
+    return value, None
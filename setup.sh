@@ -43,9 +43,9 @@ pip install -r requirements.txt
 # Create data directory
 mkdir -p data
 
-# Initialize database with demo data
-echo "💾 Initializing database..."
-python3 -c "import db; db.init_db()"
+# Apply database migrations (creates and seeds the database on first run)
+echo "💾 Migrating database..."
+python3 -m db migrate
 
 # Configure Nginx as reverse proxy
 echo "🔧 Configuring Nginx..."
@@ -88,19 +88,30 @@ echo "🔧 Configuring Supervisor for Gunicorn..."
 cat > /etc/supervisor/conf.d/resume_webapp.conf << 'EOF'
 [program:resume_webapp]
 directory=/opt/resume_webapp
-command=/opt/resume_webapp/venv/bin/gunicorn -w 4 -b 127.0.0.1:8000 wsgi:app
+command=/opt/resume_webapp/venv/bin/gunicorn -w 4 -k gthread --threads 4 --timeout 60 -b 127.0.0.1:8000 wsgi:app
 autostart=true
 autorestart=true
 redirect_stderr=true
 stdout_logfile=/var/log/resume_webapp.log
 environment=FLASK_ENV=production
 user=www-data
+
+[program:resume_webapp_worker]
+directory=/opt/resume_webapp
+command=/opt/resume_webapp/venv/bin/python -m task_queue worker --concurrency 2
+autostart=true
+autorestart=true
+redirect_stderr=true
+stdout_logfile=/var/log/resume_webapp_worker.log
+environment=FLASK_ENV=production
+user=www-data
 EOF
 
 # Update Supervisor
 supervisorctl reread
 supervisorctl update
 supervisorctl start resume_webapp
+supervisorctl start resume_webapp_worker
 
 # Verify services
 echo ""
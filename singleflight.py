@@ -0,0 +1,194 @@
+"""
+Single-flight Module
+Coalesces identical concurrent work. The first caller for a key runs the
+function; callers arriving while it is in flight wait for its result
+instead of repeating the work.
+
+Within a worker, waiters block on the leader's thread. Across gunicorn
+workers, the leader holds a lease in the shared SQLite database and
+publishes its result in the kv_cache table, which other workers poll;
+expired results are pruned whenever a new one is published.
+If the leader fails or takes too long, a waiter does the work itself, so
+coalescing never makes a request fail that would otherwise succeed.
+"""
+import os
+import time
+import logging
+import sqlite3
+import threading
+
+import db
+from cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+# Share in-flight work between gunicorn workers, not only between threads
+SINGLEFLIGHT_SHARED = os.getenv('SINGLEFLIGHT_SHARED', 'true').lower() == 'true'
+
+# Seconds a leader's lease lasts; must outlive the slowest call it guards
+SINGLEFLIGHT_LEASE_SECONDS = float(os.getenv('SINGLEFLIGHT_LEASE_SECONDS', '90'))
+
+# Seconds a duplicate waits for the leader before doing the work itself
+SINGLEFLIGHT_WAIT_TIMEOUT = float(os.getenv('SINGLEFLIGHT_WAIT_TIMEOUT', '60'))
+
+# Seconds between checks for another worker's result
+SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv('SINGLEFLIGHT_POLL_INTERVAL', '0.1'))
+
+# Seconds a published result stays readable by waiting workers
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv('SINGLEFLIGHT_RESULT_TTL', '10'))
+
+# Most published results kept per namespace; expired ones are pruned on each publish
+SINGLEFLIGHT_MAX_RESULTS = int(os.getenv('SINGLEFLIGHT_MAX_RESULTS', '1000'))
+
+
+class _Call:
+    """One in-flight call in this worker."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run a function once per key among concurrent callers.
+
+    Results shared between workers must be JSON-serializable.
+    """
+
+    def __init__(self, namespace, shared=SINGLEFLIGHT_SHARED):
+        self.namespace = namespace
+        self.shared = shared
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'leaders': 0,
+            'coalesced_local': 0,
+            'coalesced_remote': 0,
+            'wait_timeouts': 0,
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def do(self, key, fn, share=None):
+        """
+        Return ``fn()``, or the result of an identical call already in flight.
+
+        Args:
+            key: Identifies equivalent work (e.g. normalized query plus data version)
+            fn: Function taking no arguments
+            share: Optional predicate; a result it rejects (e.g. an error
+                response) goes to the leader only, and waiters run ``fn`` themselves
+
+        Returns:
+            The value returned by ``fn``, possibly from another caller's run
+
+        Raises:
+            Whatever ``fn`` raised, for the leader and for callers waiting on it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(SINGLEFLIGHT_WAIT_TIMEOUT):
+                self._count('wait_timeouts')
+                logger.warning(f"singleflight {self.namespace}: gave up waiting after "
+                               f"{SINGLEFLIGHT_WAIT_TIMEOUT:g}s, running the call itself")
+                return fn()
+            if call.error is not None:
+                self._count('coalesced_local')
+                raise call.error
+            if call.result is MISSING:
+                return fn()
+            self._count('coalesced_local')
+            return call.result
+
+        try:
+            result = self._run_shared(key, fn, share) if self.shared else self._run(fn)
+            call.result = result if share is None or share(result) else MISSING
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run(self, fn):
+        self._count('leaders')
+        return fn()
+
+    def _wait_for_remote(self, key):
+        """Poll for another worker's result while it holds the lease; MISSING if none arrives."""
+        deadline = time.monotonic() + SINGLEFLIGHT_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+            result = db.kv_get(self.namespace, key)
+            if result is not MISSING:
+                return result
+            if not db.lease_held(self.namespace, key):
+                # The leader finished; its result may have landed just before the lease went
+                return db.kv_get(self.namespace, key)
+        self._count('wait_timeouts')
+        return MISSING
+
+    def _run_shared(self, key, fn, share=None):
+        """Run ``fn`` under the shared lease, or wait for the worker holding it."""
+        owner = f'{os.getpid()}:{threading.get_ident()}'
+        try:
+            result = db.kv_get(self.namespace, key)
+            if result is not MISSING:
+                self._count('coalesced_remote')
+                return result
+            leased = db.lease_acquire(self.namespace, key, owner, SINGLEFLIGHT_LEASE_SECONDS)
+            if not leased:
+                result = self._wait_for_remote(key)
+                if result is not MISSING:
+                    self._count('coalesced_remote')
+                    return result
+                leased = db.lease_acquire(self.namespace, key, owner, SINGLEFLIGHT_LEASE_SECONDS)
+        except sqlite3.Error as e:
+            logger.warning(f"singleflight {self.namespace}: shared coordination failed: {str(e)}")
+            return self._run(fn)
+
+        try:
+            result = self._run(fn)
+            if share is None or share(result):
+                try:
+                    db.kv_set(self.namespace, key, result, ttl=SINGLEFLIGHT_RESULT_TTL)
+                    db.kv_prune(self.namespace, SINGLEFLIGHT_MAX_RESULTS)
+                except sqlite3.Error as e:
+                    logger.warning(f"singleflight {self.namespace}: could not publish result: {str(e)}")
+            return result
+        finally:
+            if leased:
+                try:
+                    db.lease_release(self.namespace, key, owner)
+                except sqlite3.Error as e:
+                    logger.warning(f"singleflight {self.namespace}: could not release lease: {str(e)}")
+
+    def stats(self):
+        """
+        Return coalescing counters for this worker.
+
+        Returns:
+            dict: leaders (calls that ran), coalesced_local and coalesced_remote
+            (duplicates served by another thread or worker), wait_timeouts,
+            in_flight keys and the coalesced share of all calls
+        """
+        with self._lock:
+            result = dict(self._stats)
+            result['in_flight'] = len(self._calls)
+        coalesced = result['coalesced_local'] + result['coalesced_remote']
+        total = coalesced + result['leaders']
+        result['coalesced'] = coalesced
+        result['coalesced_rate'] = round(coalesced / total, 4) if total else 0.0
+        result['shared'] = self.shared
+        return result
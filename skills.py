@@ -0,0 +1,192 @@
+"""
+Skills Module
+Canonical skill names, plus extraction of known skills from free text.
+"""
+import re
+
+# Alternative spellings mapped to one canonical (lowercase) name
+SKILL_ALIASES = {
+    'golang': 'go',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'express': 'express.js',
+    'expressjs': 'express.js',
+    'nestjs': 'nest.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vue': 'vue.js',
+    'vuejs': 'vue.js',
+    'vue.js 3': 'vue.js',
+    'angularjs': 'angular',
+    'py': 'python',
+    'python3': 'python',
+    'cpp': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ml': 'machine learning',
+    'sklearn': 'scikit-learn',
+    'tf': 'tensorflow',
+    'ci/cd pipelines': 'ci/cd',
+    'cicd': 'ci/cd',
+    'spring': 'spring boot',
+    'rest': 'rest apis',
+    'rest api': 'rest apis',
+    'restful apis': 'rest apis',
+}
+
+# Skills recognised in job titles and descriptions
+KNOWN_SKILLS = {
+    'python', 'java', 'go', 'rust', 'c++', 'c#', 'javascript', 'typescript', 'kotlin', 'swift',
+    'ruby', 'php', 'scala', 'sql', 'solidity', 'bash',
+    'react', 'angular', 'vue.js', 'vuex', 'pinia', 'node.js', 'express.js', 'nest.js', 'django',
+    'flask', 'fastapi', 'spring boot', 'graphql', 'apollo', 'hasura', 'rest apis',
+    'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'kafka', 'spark', 'airflow', 'etl',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'cloudformation', 'ansible',
+    'ci/cd', 'linux', 'microservices',
+    'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'machine learning', 'computer vision',
+    'selenium', 'cypress', 'unity', 'ethereum', 'web3', 'ios', 'android',
+    'cissp', 'penetration testing',
+}
+
+# Short or common-word skills only counted when written with this exact casing
+CASE_SENSITIVE_SKILLS = {'go': 'Go'}
+
+# Aliases that are ordinary words or abbreviations in prose ("express interest",
+# "the rest of the team", "a node in the graph"). They canonicalize a skills
+# list but are never looked for in titles and descriptions.
+AMBIGUOUS_ALIASES = {'express', 'rest', 'spring', 'node', 'js', 'ts', 'py', 'ml', 'tf'}
+
+# Skills, and abbreviations of skills, that are also common words: found in
+# free text only with this casing and not as the first word of a sentence
+# ("Unity" the engine, not "team unity"; not "Go beyond the basics.")
+PROSE_CASED_SKILLS = {
+    'Go': 'go',
+    'Swift': 'swift',
+    'Unity': 'unity',
+    'Spark': 'spark',
+    'Rust': 'rust',
+    'Node': 'node.js',
+    'REST': 'rest apis',
+    'ML': 'machine learning',
+}
+
+# Display form of canonical names that are not simply capitalized word by word
+SKILL_DISPLAY_NAMES = {
+    'sql': 'SQL', 'php': 'PHP', 'javascript': 'JavaScript', 'typescript': 'TypeScript',
+    'vue.js': 'Vue.js', 'node.js': 'Node.js', 'express.js': 'Express.js', 'nest.js': 'NestJS',
+    'fastapi': 'FastAPI', 'graphql': 'GraphQL', 'rest apis': 'REST APIs', 'postgresql': 'PostgreSQL',
+    'mysql': 'MySQL', 'mongodb': 'MongoDB', 'etl': 'ETL', 'aws': 'AWS', 'gcp': 'GCP',
+    'cloudformation': 'CloudFormation', 'ci/cd': 'CI/CD', 'tensorflow': 'TensorFlow', 'pytorch': 'PyTorch',
+    'scikit-learn': 'scikit-learn', 'pandas': 'pandas', 'ios': 'iOS', 'cissp': 'CISSP',
+}
+
+# Placeholder stored in jobs.skills when nothing was extracted
+UNKNOWN_SKILLS = 'unknown'
+
+
+def canonicalize_skill(name):
+    """
+    Normalize a skill name to its canonical lowercase form.
+    
+    Args:
+        name (str): Skill as written, e.g. "Golang", " Node.JS "
+        
+    Returns:
+        str: Canonical name, or None if nothing is left after cleaning
+    """
+    if not name:
+        return None
+    cleaned = re.sub(r'\s+', ' ', str(name)).strip().strip('.,;:()[]"\'').strip().lower()
+    if not cleaned or cleaned == UNKNOWN_SKILLS:
+        return None
+    return SKILL_ALIASES.get(cleaned, cleaned)
+
+
+def display_skill(name):
+    """Display form of a canonical skill name ("aws" -> "AWS", "spring boot" -> "Spring Boot")."""
+    return SKILL_DISPLAY_NAMES.get(name) or ' '.join(word[:1].upper() + word[1:] for word in name.split())
+
+
+def parse_skills(skills_text):
+    """
+    Split a comma-separated skills string into canonical, de-duplicated names.
+    
+    Args:
+        skills_text (str): Value of jobs.skills, e.g. "Python, AWS, Docker"
+        
+    Returns:
+        list: Canonical skill names in their original order
+    """
+    if not skills_text:
+        return []
+    names = (canonicalize_skill(part) for part in re.split(r'[,;\n]', str(skills_text)))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def _build_skill_pattern(names):
+    """Match any of ``names`` as a whole token, longest first."""
+    alternatives = '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return re.compile(rf'(?<![\w+#.])({alternatives})(?![\w+#]|\.\w)', re.IGNORECASE)
+
+
+_SKILL_PATTERN = _build_skill_pattern(
+    (KNOWN_SKILLS | set(SKILL_ALIASES)) - AMBIGUOUS_ALIASES - {w.lower() for w in PROSE_CASED_SKILLS}
+)
+_PROSE_CASED_PATTERN = re.compile(
+    r'(?<![\w+#.])(' + '|'.join(re.escape(w) for w in PROSE_CASED_SKILLS) + r')(?![\w+#]|\.\w)'
+)
+
+
+def _starts_sentence(text, start):
+    """Whether the word at ``start`` opens the text, a line or a sentence."""
+    before = text[:start].rstrip(' \t')
+    return not before or before[-1] in '\n.!?'
+
+
+def extract_skills(text):
+    """
+    Find known skills mentioned in free text.
+    
+    Ambiguous aliases are ignored, and skills that are also common words
+    must be written with their usual casing (see PROSE_CASED_SKILLS), so
+    ordinary prose does not produce skills.
+    
+    Args:
+        text (str): Job title and/or description
+        
+    Returns:
+        list: Canonical skill names in order of first mention
+    """
+    if not text:
+        return []
+    found = [(m.start(), canonicalize_skill(m.group(1))) for m in _SKILL_PATTERN.finditer(text)]
+    found += [(m.start(), PROSE_CASED_SKILLS[m.group(1)]) for m in _PROSE_CASED_PATTERN.finditer(text)
+              if not _starts_sentence(text, m.start())]
+    return list(dict.fromkeys(name for _, name in sorted(found) if name))
+
+
+def skills_for_job(skills_text=None, title=None, description=None):
+    """
+    All canonical skills for a job: its listed skills plus those named in the text.
+    
+    Args:
+        skills_text (str): Value of jobs.skills
+        title (str): Job title
+        description (str): Job description
+        
+    Returns:
+        list: Canonical skill names, listed skills first
+    """
+    listed = parse_skills(skills_text)
+    mentioned = extract_skills(f"{title or ''}\n{description or ''}")
+    return list(dict.fromkeys(listed + mentioned))
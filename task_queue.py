@@ -0,0 +1,216 @@
+"""
+Task Queue Module
+Background parsing of job postings, so /jobs/parse answers immediately
+instead of holding a gunicorn worker for the whole Gemini call.
+
+Tasks live in the parse_tasks table of the shared SQLite database. Any
+number of worker processes (``python -m task_queue worker``) claim them
+one at a time under a lease; a task whose worker dies is claimed again
+once its lease expires. Transient failures (Gemini unavailable, an
+unreadable response) are retried with exponential backoff up to
+TASK_MAX_ATTEMPTS; a posting that parses but fails validation is not.
+Idle workers delete finished tasks after TASK_RETENTION_SECONDS.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+
+import db
+import job_parser
+
+logger = logging.getLogger(__name__)
+
+# Tasks each worker process runs at once (Gemini calls are further capped by LLM_MAX_CONCURRENCY)
+TASK_QUEUE_CONCURRENCY = int(os.getenv('TASK_QUEUE_CONCURRENCY', '2'))
+
+# Attempts per task before it is marked failed
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '3'))
+
+# Retry backoff: base delay doubles with each attempt, up to the max (seconds)
+TASK_RETRY_BASE_DELAY = float(os.getenv('TASK_RETRY_BASE_DELAY', '5'))
+TASK_RETRY_MAX_DELAY = float(os.getenv('TASK_RETRY_MAX_DELAY', '300'))
+
+# Seconds a claimed task stays with its worker; must outlive the slowest parse
+TASK_LEASE_SECONDS = float(os.getenv('TASK_LEASE_SECONDS', '120'))
+
+# Seconds an idle worker waits before checking the queue again
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', '0.5'))
+
+# Seconds a finished task (and its posting) is kept for status polling before it is deleted
+TASK_RETENTION_SECONDS = float(os.getenv('TASK_RETENTION_SECONDS', '86400'))
+
+# Seconds between sweeps for finished tasks past their retention
+TASK_PRUNE_INTERVAL = float(os.getenv('TASK_PRUNE_INTERVAL', '600'))
+
+# Parser errors worth another attempt; anything else fails the task at once
+RETRYABLE_ERRORS = ('llm_unavailable', 'parse_error', 'parsing_error')
+
+_prune_lock = threading.Lock()
+_last_prune = None
+
+VALIDATION_FAILED = {
+    'error': 'validation_failed',
+    'message': 'Could not extract all required job fields. Please try a more detailed posting.'
+}
+
+
+def enqueue_parse(job_text, user_id=None):
+    """
+    Queue a job posting for parsing.
+
+    Returns:
+        int: Task id, for get_status()
+    """
+    task_id = db.enqueue_task(json.dumps({'job_text': job_text}), user_id=user_id,
+                              max_attempts=TASK_MAX_ATTEMPTS)
+    logger.info(f"Queued parse task {task_id} ({len(job_text)} chars) for user: {user_id}")
+    return task_id
+
+
+def get_status(task_id, user_id=None):
+    """
+    Status of a parse task, as returned to the client.
+
+    Args:
+        task_id: Task id from enqueue_parse()
+        user_id: Only tasks queued by this user are visible
+
+    Returns:
+        dict: {'task_id', 'status', 'attempts'} plus 'job' when done, or
+        'error' and 'message' when failed; None if there is no such task
+    """
+    task = db.get_task(task_id)
+    if task is None or task['user_id'] != user_id:
+        return None
+    status = {'task_id': task['id'], 'status': task['status'], 'attempts': task['attempts']}
+    if task['status'] == 'done':
+        status['job'] = task['result']
+    elif task['status'] == 'failed':
+        error = task['result'] or {'error': task['error'] or 'parsing_error',
+                                   'message': 'Failed to parse job posting'}
+        status.update(error)
+    return status
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt, after ``attempts`` attempts."""
+    return min(TASK_RETRY_BASE_DELAY * 2 ** (attempts - 1), TASK_RETRY_MAX_DELAY)
+
+
+def run_task(task, worker):
+    """Parse one claimed task and record the outcome."""
+    job_text = json.loads(task['payload'])['job_text']
+    started = time.monotonic()
+    try:
+        parsed_job = job_parser.parse_job_posting(job_text)
+    except Exception as e:
+        logger.error(f"Parse task {task['id']} raised: {str(e)}", exc_info=True)
+        parsed_job = {'error': 'parsing_error', 'message': 'Failed to parse job posting'}
+
+    if 'error' not in parsed_job and not job_parser.validate_job_data(parsed_job):
+        parsed_job = VALIDATION_FAILED
+
+    elapsed = time.monotonic() - started
+    error = parsed_job.get('error')
+    if error is None:
+        db.finish_task(task['id'], worker, 'done', result=parsed_job)
+        logger.info(f"Parse task {task['id']} done in {elapsed:.1f}s: {parsed_job.get('title')}")
+    elif error in RETRYABLE_ERRORS and task['attempts'] < task['max_attempts']:
+        delay = retry_delay(task['attempts'])
+        db.retry_task(task['id'], worker, error, delay)
+        logger.warning(f"Parse task {task['id']} attempt {task['attempts']} failed ({error}), "
+                       f"retrying in {delay:g}s")
+    else:
+        db.finish_task(task['id'], worker, 'failed', result=parsed_job, error=error)
+        logger.warning(f"Parse task {task['id']} failed after {task['attempts']} attempt(s): {error}")
+
+
+def prune_finished():
+    """Delete finished tasks past TASK_RETENTION_SECONDS, at most once per TASK_PRUNE_INTERVAL."""
+    global _last_prune
+    with _prune_lock:
+        if _last_prune is not None and time.monotonic() - _last_prune < TASK_PRUNE_INTERVAL:
+            return
+        _last_prune = time.monotonic()
+    try:
+        deleted = db.prune_tasks(TASK_RETENTION_SECONDS)
+    except Exception as e:
+        logger.error(f"Could not prune finished parse tasks: {str(e)}")
+        return
+    if deleted:
+        logger.info(f"Pruned {deleted} finished parse task(s)")
+
+
+def _work(stop, name):
+    """Claim and run tasks until ``stop`` is set."""
+    worker = f'{socket.gethostname()}:{os.getpid()}:{name}'
+    while not stop.is_set():
+        try:
+            task = db.claim_task(worker, TASK_LEASE_SECONDS)
+        except Exception as e:
+            logger.error(f"Could not claim a parse task: {str(e)}")
+            task = None
+        if task is None:
+            prune_finished()
+            stop.wait(TASK_POLL_INTERVAL)
+            continue
+        try:
+            run_task(task, worker)
+        except Exception as e:
+            # The lease expires and another attempt picks the task up
+            logger.error(f"Parse task {task['id']} could not be recorded: {str(e)}", exc_info=True)
+
+
+def start_worker_threads(concurrency=None):
+    """
+    Start daemon threads working the queue in this process.
+
+    Used by the development server; production runs ``python -m task_queue worker``.
+
+    Returns:
+        threading.Event: Set it to stop the threads after their current task
+    """
+    concurrency = concurrency or TASK_QUEUE_CONCURRENCY
+    stop = threading.Event()
+    for n in range(concurrency):
+        threading.Thread(target=_work, args=(stop, f'w{n}'), name=f'parse-worker-{n}', daemon=True).start()
+    logger.info(f"Started {concurrency} parse worker thread(s)")
+    return stop
+
+
+def run_worker(concurrency=None):
+    """Work the queue until interrupted."""
+    db.init_db()
+    stop = start_worker_threads(concurrency)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        logger.info("Stopping parse workers after their current task")
+        stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Background job-posting parse queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker_parser = subparsers.add_parser('worker', help='Run parse workers')
+    worker_parser.add_argument('--concurrency', type=int, default=TASK_QUEUE_CONCURRENCY,
+                               help='Tasks run at once (default: TASK_QUEUE_CONCURRENCY)')
+    subparsers.add_parser('stats', help='Print task counts by status')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        run_worker(args.concurrency)
+    elif args.command == 'stats':
+        print(json.dumps(db.task_counts(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Vector Index Module
+In-process relevance ranking of jobs for analysis queries. Every job is a
+hashed TF-IDF vector in a NumPy matrix; a query is scored against all of
+them with one matrix-vector product, so ranking runs on the CPU with no
+external service.
+
+The index follows the jobs_version change counter: a job saved or edited
+in any worker is picked up by the next search in every worker. A sync
+reads the ids that changed from the job_changes log, so it costs time
+proportional to the jobs that changed; IDF weights are only recomputed
+over the whole matrix once enough jobs have changed.
+"""
+import os
+import time
+import zlib
+import logging
+import threading
+
+import numpy as np
+
+import db
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature dimensions; the matrix takes VECTOR_DIM * 4 bytes per job
+VECTOR_DIM = int(os.getenv('VECTOR_DIM', '1024'))
+
+# How many times each field's tokens count towards a job's vector
+FIELD_WEIGHTS = {
+    'title': 3,
+    'skills': 2,
+    'company': 1,
+    'location': 1,
+    'description': 1,
+}
+
+# Weight of each parsed skill relative to a word of the query text
+QUERY_SKILL_WEIGHT = 2
+
+# Cosine similarity below which a job is not considered similar to the query
+VECTOR_MIN_SCORE = float(os.getenv('VECTOR_MIN_SCORE', '0.05'))
+
+# Jobs sent for analysis when nothing matches the filters
+SIMILAR_JOBS_LIMIT = int(os.getenv('SIMILAR_JOBS_LIMIT', '25'))
+
+# Matching job ids re-ranked by similarity for one analysis
+VECTOR_CANDIDATE_LIMIT = int(os.getenv('VECTOR_CANDIDATE_LIMIT', '20000'))
+
+# Share of indexed jobs that must change before IDF weights and all row
+# norms are recomputed; smaller changes reuse the current weights
+VECTOR_REWEIGHT_FRACTION = float(os.getenv('VECTOR_REWEIGHT_FRACTION', '0.1'))
+
+# Rows per block when recomputing row norms, to bound temporary memory
+_NORM_BLOCK_ROWS = 4096
+
+
+def tokenize(text):
+    """Lower-cased word tokens of ``text`` as the search index sees them, minus stopwords."""
+    return [t for t in db.FTS_TOKEN_RE.findall((text or '').lower())
+            if t not in db.FTS_STOPWORDS]
+
+
+def _feature(token):
+    """Hashed feature column of a token, stable across processes."""
+    return zlib.crc32(token.encode('utf-8')) % VECTOR_DIM
+
+
+def _add_tokens(vector, tokens, weight):
+    for token in tokens:
+        vector[_feature(token)] += weight
+
+
+def job_vector(job):
+    """
+    Raw term-frequency vector of a job, weighted by field.
+
+    Args:
+        job: Job dict with title, company, location, description and skills
+
+    Returns:
+        np.ndarray: float32 vector of VECTOR_DIM sublinear term frequencies
+    """
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for field, weight in FIELD_WEIGHTS.items():
+        value = job.get(field) or ''
+        if field == 'skills' and value.strip().lower() == 'unknown':
+            continue
+        _add_tokens(vector, tokenize(value), weight)
+    # Sublinear tf, so a word repeated in a long description does not dominate
+    np.log1p(vector, out=vector)
+    return vector
+
+
+class VectorIndex:
+    """
+    Hashed TF-IDF vectors of every job, kept in sync with the jobs table.
+
+    Rows hold raw term frequencies. Document frequencies are kept up to
+    date on every change, and each new or edited row is normed with the
+    current IDF weights; the weights and every norm are recomputed once
+    VECTOR_REWEIGHT_FRACTION of the jobs changed since the last time. A
+    search is one matrix-vector product.
+    """
+
+    def __init__(self):
+        self.dim = VECTOR_DIM
+        self._tf = np.zeros((0, self.dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._rows = {}
+        self._change_seq = None
+        self._df = np.zeros(self.dim, dtype=np.int64)
+        self._idf = np.ones(self.dim, dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._changed_since_reweight = 0
+        self._data_version = None
+        self._lock = threading.Lock()
+        self._stats = {'syncs': 0, 'searches': 0, 'last_sync_seconds': None, 'vectorized': 0, 'reweights': 0}
+
+    def _ensure_capacity(self, rows):
+        if rows <= self._tf.shape[0]:
+            return
+        # Grow by a quarter: each spare row costs VECTOR_DIM * 4 bytes in every worker
+        capacity = max(rows, self._tf.shape[0] + self._tf.shape[0] // 4, 256)
+        tf = np.zeros((capacity, self.dim), dtype=np.float32)
+        tf[:self._size] = self._tf[:self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        norms = np.ones(capacity, dtype=np.float32)
+        norms[:self._size] = self._norms[:self._size]
+        self._tf, self._ids, self._norms = tf, ids, norms
+
+    def _remove(self, job_id):
+        """Drop a job's row by moving the last row into its place."""
+        row = self._rows.pop(job_id)
+        self._df -= self._tf[row] > 0
+        last = self._size - 1
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._tf[row] = self._tf[last]
+            self._ids[row] = moved_id
+            self._norms[row] = self._norms[last]
+            self._rows[moved_id] = row
+        self._tf[last] = 0
+        self._size = last
+
+    def _set_row(self, row, vector):
+        """Store a job's vector, updating document frequencies and its norm under the current IDF."""
+        self._df += (vector > 0).astype(np.int64) - (self._tf[row] > 0)
+        self._tf[row] = vector
+        norm = float(np.linalg.norm(vector * self._idf))
+        self._norms[row] = norm or 1.0
+
+    def _reweight(self):
+        """Recompute IDF weights from the document frequencies, and the TF-IDF norm of every row."""
+        tf = self._tf[:self._size]
+        self._idf = (np.log((1 + self._size) / (1 + self._df)) + 1).astype(np.float32)
+        norms = self._norms[:self._size]
+        for start in range(0, self._size, _NORM_BLOCK_ROWS):
+            block = tf[start:start + _NORM_BLOCK_ROWS] * self._idf
+            norms[start:start + len(block)] = np.sqrt(np.einsum('ij,ij->i', block, block))
+        norms[norms == 0] = 1.0
+        self._changed_since_reweight = 0
+        self._stats['reweights'] += 1
+
+    def sync(self):
+        """
+        Bring the index up to date with the jobs table, if it changed.
+
+        Returns:
+            bool: True if anything was re-indexed
+        """
+        version = db.get_data_version()
+        if version == self._data_version:
+            return False
+        with self._lock:
+            if version == self._data_version:
+                return False
+            started = time.perf_counter()
+            changed = None
+            if self._change_seq is not None:
+                changed, change_seq = db.get_job_changes(self._change_seq)
+            if changed is None:
+                # First build, or the change log no longer reaches back to the last sync
+                change_seq = db.get_job_change_seq()
+                changed = db.get_job_ids()
+                removed = set(self._rows).difference(changed)
+            else:
+                changed = list(changed)
+                removed = set()
+
+            vectorized = 0
+            for start in range(0, len(changed), db.BULK_CHUNK_SIZE):
+                chunk = changed[start:start + db.BULK_CHUNK_SIZE]
+                jobs = db.get_jobs_by_ids(chunk)
+                removed.update(set(chunk).difference(job['id'] for job in jobs))
+                self._ensure_capacity(self._size + len(jobs))
+                for job in jobs:
+                    row = self._rows.get(job['id'])
+                    if row is None:
+                        row = self._size
+                        self._size += 1
+                        self._rows[job['id']] = row
+                        self._ids[row] = job['id']
+                    self._set_row(row, job_vector(job))
+                vectorized += len(jobs)
+            removed &= self._rows.keys()
+            for job_id in removed:
+                self._remove(job_id)
+            self._changed_since_reweight += vectorized + len(removed)
+            if self._changed_since_reweight > VECTOR_REWEIGHT_FRACTION * self._size:
+                self._reweight()
+
+            self._change_seq = change_seq
+            self._data_version = version
+            elapsed = time.perf_counter() - started
+            self._stats['syncs'] += 1
+            self._stats['vectorized'] += vectorized
+            self._stats['last_sync_seconds'] = round(elapsed, 4)
+            logger.info(f"Vector index synced: {vectorized} jobs vectorized, {len(removed)} removed, "
+                        f"{self._size} indexed in {elapsed * 1000:.0f}ms")
+            return True
+
+    def query_vector(self, text, skills=None):
+        """Unnormalized TF-IDF vector for a query and its parsed skills."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        _add_tokens(vector, tokenize(text), 1)
+        for skill in skills or []:
+            _add_tokens(vector, tokenize(skill), QUERY_SKILL_WEIGHT)
+        np.log1p(vector, out=vector)
+        return vector * self._idf
+
+    def search(self, text, skills=None, k=10, candidate_ids=None, min_score=0.0):
+        """
+        Rank jobs by cosine similarity to a query.
+
+        Args:
+            text: Free-text query
+            skills: Parsed skill names, weighted above plain query words
+            k: Maximum number of results
+            candidate_ids: Only rank these job ids (None for every job)
+            min_score: Drop results scoring below this
+
+        Returns:
+            list: (job_id, score) tuples, most similar first
+        """
+        self.sync()
+        with self._lock:
+            self._stats['searches'] += 1
+            query = self.query_vector(text, skills)
+            query_norm = float(np.linalg.norm(query))
+            if not self._size or k <= 0 or query_norm == 0:
+                return []
+            ids = self._ids[:self._size]
+            scores = (self._tf[:self._size] @ query) / (self._norms[:self._size] * query_norm)
+            if candidate_ids is not None:
+                mask = np.isin(ids, np.fromiter(candidate_ids, dtype=np.int64))
+                scores = np.where(mask, scores, -1.0)
+            if k < len(scores):
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0 and scores[i] >= min_score]
+
+    def stats(self):
+        result = dict(self._stats)
+        result['jobs'] = self._size
+        result['dim'] = self.dim
+        result['matrix_mb'] = round(self._tf.nbytes / 2 ** 20, 2)
+        result['data_version'] = self._data_version
+        return result
+
+
+index = VectorIndex()
+
+
+def _build():
+    try:
+        index.sync()
+    finally:
+        db.close_connection()
+
+
+def warm_up():
+    """Build the index on a background thread so the first analysis does not wait."""
+    threading.Thread(target=_build, name='vector-index-warm-up', daemon=True).start()
+
+
+def jobs_for_analysis(user_query, parsed_filters, job_count, limit):
+    """
+    Pick the jobs sent to Gemini for one analysis.
+
+    Jobs matching the filters are re-ranked by similarity to the query and
+    only the ``limit`` most relevant are kept. When nothing matches, the
+    jobs most similar to the query are used instead.
+
+    Args:
+        user_query: Original natural language query
+        parsed_filters: Filters from gemini_service.parse_query()
+        job_count: Number of jobs matching the filters
+        limit: Maximum number of jobs to return
+
+    Returns:
+        tuple: (jobs, similar) where similar is True if the jobs are
+        nearest neighbours rather than filter matches
+    """
+    skills = db._as_list(parsed_filters.get('skills'))
+    if job_count:
+        candidate_ids = db.find_job_ids(parsed_filters, limit=VECTOR_CANDIDATE_LIMIT)
+        ranked_ids = [job_id for job_id, _ in index.search(user_query, skills, k=limit,
+                                                           candidate_ids=candidate_ids)]
+        # Top up with matches the query shares no terms with, in BM25 order
+        seen = set(ranked_ids)
+        ranked_ids += [job_id for job_id in candidate_ids if job_id not in seen][:limit - len(ranked_ids)]
+        return db.get_jobs_by_ids(ranked_ids), False
+
+    ranked = index.search(user_query, skills, k=min(limit, SIMILAR_JOBS_LIMIT), min_score=VECTOR_MIN_SCORE)
+    return db.get_jobs_by_ids(job_id for job_id, _ in ranked), True